@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import re
 import sys
 from pathlib import Path
 
@@ -6,7 +7,15 @@ import requests
 
 from morelia.config import TOMLConfig
 from morelia.formatters import ColorTextFormatter, PlainTextFormatter
-from morelia.parser import Parser, execute_script
+from morelia.grammar import Scenario
+from morelia.parser import (
+    Parser,
+    ScenarioFilter,
+    aexecute_script,
+    dry_run_script,
+    execute_script,
+)
+from morelia.tags import compile_tag_expression
 
 __version__ = "0.9.2"
 
@@ -50,13 +59,44 @@ def run(
     return execute_script(feature, suite, scenario=scenario, **kwargs)
 
 
-def verify(script, suite, scenario: str = ".*", config: str = "default") -> None:
+def verify(
+    script,
+    suite,
+    scenario: str = ".*",
+    config: str = "default",
+    workers: int = None,
+    suite_factory=None,
+    executor: str = None,
+    lazy: bool = False,
+    tags: str = None,
+    dry_run: bool = None,
+    fail_fast: bool = None,
+    max_failures: int = None,
+    continue_on_failure: bool = None,
+):
     """Verifies script with steps from suite.
 
     :param script: feature script
     :param suite: object with steps defined
     :param str scenario: regex pattern for selecting single scenarios
     :param str config: section from configuration to apply
+    :param int workers: number of processes running scenarios (see :py:mod:`morelia.parallel`)
+    :param suite_factory: callable creating suite instances in workers
+    :param str executor: "process" (default) or "thread" pool running scenarios
+        or "fork" running shared steps once
+    :param bool lazy: read and parse scenarios as they are run; steps missing
+        in suite are then reported when scenario using them is reached
+    :param str tags: tag expression selecting scenarios by labels
+        (see :py:mod:`morelia.tags`); overrides one from configuration
+    :param bool dry_run: only match steps without running any hooks or steps;
+        overrides "dry_run" from configuration
+    :param bool fail_fast: stop on first failed scenario (default)
+    :param int max_failures: stop after that many failed scenarios
+    :param bool continue_on_failure: run all scenarios even if some fail
+    :returns: :py:class:`morelia.visitors.DryRunReport` in dry run mode
+
+    Failure controls override ones from configuration. When more scenarios
+    fail, first failure is raised with report of all of them.
 
     Script can be passed directly to verify method as first argument.
 
@@ -112,11 +152,161 @@ def verify(script, suite, scenario: str = ".*", config: str = "default") -> None
         ...    test_case_with_steps,
         )
 
+    Only scenarios at given lines of file are parsed and run when path
+    is followed by line numbers:
+
+    .. code-block:: python
+
+        >>> verify('calculator.feature:12:30', test_case_with_steps)
+
+    In dry run steps are only matched, so missing or ambiguous steps
+    are found without running any hooks or steps:
+
+    .. code-block:: python
+
+        >>> report = verify('calculator.feature', test_case_with_steps, dry_run=True)
+        >>> report.scenarios
+        12
+
     """
     conf = TOMLConfig(config)
+    script, lines = _split_line_numbers(script)
     script = _coerce_type(script)
-    feature = Parser().parse_features(script)
-    execute_script(feature, suite, scenario=scenario, config=conf)
+    tag_expression = _get_tags(tags, conf)
+    parser = Parser(
+        cache=conf.get_feature_cache(),
+        scenario_filter=_create_scenario_filter(scenario, lines, tag_expression),
+    )
+    feature = parser.parse_features(script, lazy=lazy)
+    if _get_dry_run(dry_run, conf):
+        return dry_run_script(feature, suite, scenario=scenario, config=conf)
+    if tag_expression is not None and not _has_scenarios(feature):
+        return
+    execute_script(
+        feature,
+        suite,
+        scenario=scenario,
+        config=conf,
+        workers=workers,
+        suite_factory=suite_factory,
+        executor=executor,
+        max_failures=_get_max_failures(fail_fast, max_failures, continue_on_failure),
+    )
+
+
+async def averify(
+    script,
+    suite,
+    scenario: str = ".*",
+    config: str = "default",
+    concurrency: int = None,
+    suite_factory=None,
+    tags: str = None,
+    dry_run: bool = None,
+    fail_fast: bool = None,
+    max_failures: int = None,
+    continue_on_failure: bool = None,
+):
+    """Verifies script with steps from suite on running event loop.
+
+    Works like :py:func:`verify` but awaits coroutine step methods and hooks
+    (see :py:mod:`morelia.asynchronous`).
+
+    :param script: feature script
+    :param suite: object with steps defined
+    :param str scenario: regex pattern for selecting single scenarios
+    :param str config: section from configuration to apply
+    :param int concurrency: number of scenarios run at the same time as tasks
+    :param suite_factory: callable creating suite instances for concurrent scenarios
+    :param str tags: tag expression selecting scenarios by labels
+        (see :py:mod:`morelia.tags`); overrides one from configuration
+    :param bool dry_run: only match steps without running any hooks or steps;
+        overrides "dry_run" from configuration
+    :param bool fail_fast: stop on first failed scenario (default)
+    :param int max_failures: stop after that many failed scenarios
+    :param bool continue_on_failure: run all scenarios even if some fail
+    :returns: :py:class:`morelia.visitors.DryRunReport` in dry run mode
+
+    .. code-block:: python
+
+        >>> from morelia import averify
+        >>> await averify('calculator.feature', test_case_with_steps)
+
+    """
+    conf = TOMLConfig(config)
+    script, lines = _split_line_numbers(script)
+    script = _coerce_type(script)
+    tag_expression = _get_tags(tags, conf)
+    parser = Parser(
+        cache=conf.get_feature_cache(),
+        scenario_filter=_create_scenario_filter(scenario, lines, tag_expression),
+    )
+    feature = parser.parse_features(script)
+    if _get_dry_run(dry_run, conf):
+        return dry_run_script(feature, suite, scenario=scenario, config=conf)
+    if tag_expression is not None and not _has_scenarios(feature):
+        return
+    await aexecute_script(
+        feature,
+        suite,
+        scenario=scenario,
+        config=conf,
+        concurrency=concurrency,
+        suite_factory=suite_factory,
+        max_failures=_get_max_failures(fail_fast, max_failures, continue_on_failure),
+    )
+
+
+LINE_NUMBERS_RE = re.compile(r"^(.+\.feature)((?::\d+)+)$")
+
+
+def _split_line_numbers(script):
+    """Split "path.feature:line[:line...]" into path and line numbers."""
+    if isinstance(script, Source):
+        return script, []
+    match = LINE_NUMBERS_RE.match(str(script))
+    if match is None:
+        return script, []
+    path, numbers = match.groups()
+    return path, [int(number) for number in numbers[1:].split(":")]
+
+
+def _get_tags(tags, conf):
+    if tags is None:
+        return conf.get_tags()
+    if not tags:
+        return None
+    return compile_tag_expression(tags)
+
+
+def _create_scenario_filter(scenario, lines, tags=None):
+    if scenario == ".*" and not lines and tags is None:
+        return None
+    return ScenarioFilter(name=scenario, lines=lines, labels=tags)
+
+
+def _get_dry_run(dry_run, conf):
+    if dry_run is None:
+        return conf.get_dry_run()
+    return dry_run
+
+
+def _get_max_failures(fail_fast, max_failures, continue_on_failure):
+    """Return limit of failures given by parameters (None to use configuration)."""
+    if fail_fast:
+        return 1
+    if max_failures is not None:
+        return max_failures
+    if continue_on_failure:
+        return 0
+    return None
+
+
+def _has_scenarios(feature):
+    """Return False if parser skipped all scenarios of feature."""
+    if not feature.parsed:
+        return True
+    return any(isinstance(node, Scenario) for node in feature.steps)
 
 
 def _coerce_type(script):
@@ -134,7 +324,9 @@ def _coerce_type(script):
 
 
 class Source:
-    pass
+    def iter_lines(self):
+        """Return iterator over lines of source."""
+        return iter(str(self).split("\n"))
 
 
 class Text(Source):
@@ -166,6 +358,11 @@ class File(Source):
             self.__text = self.__path.read_text()
             return self.__text
 
+    def iter_lines(self):
+        """Return iterator reading lines from file as they are needed."""
+        with self.__path.open() as lines:
+            yield from lines
+
 
 class Url(Source):
     """Marks string as an url endpoint."""
@@ -181,5 +378,10 @@ class Url(Source):
             self.__text = requests.get(self.__url).text
             return self.__text
 
+    def iter_lines(self):
+        """Return iterator downloading lines as they are needed."""
+        with requests.get(self.__url, stream=True) as response:
+            yield from response.iter_lines(decode_unicode=True)
+
 
-__all__ = ("Parser", "run", "verify", "File", "Url")
+__all__ = ("Parser", "run", "verify", "averify", "File", "Url")
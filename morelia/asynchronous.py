@@ -0,0 +1,240 @@
+"""
+Asynchronous steps
+------------------
+
+Step methods and "setUp"/"tearDown" hooks can be coroutines:
+
+.. code-block:: python
+
+    class CalculatorTestCase(unittest.IsolatedAsyncioTestCase):
+
+        async def test_addition(self):
+            await averify(filename, self)
+
+        async def step_I_press_add(self):
+            self.result = await self.calculator.add()
+
+:py:func:`morelia.averify` runs them on caller's event loop.
+:py:func:`morelia.verify` runs them on its own event loop, created once
+for whole feature.
+
+Independent scenarios can be run concurrently as tasks:
+
+.. code-block:: python
+
+    await averify(filename, self, concurrency=10)
+
+or with configuration:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    concurrency=10
+
+Then "setUpFeature" and "tearDownFeature" are run once on given suite
+and every scenario is run on its own deep copy of it (or on suite created
+by "suite_factory" if given). Results are reported in the same order
+as they would be when run one by one.
+
+Failure controls ("fail_fast", "max_failures") are respected: scenarios
+waiting for their turn are not started once run is stopped. Scenarios
+already running are finished, but only ones preceding failure which
+stopped run are reported.
+"""
+import asyncio
+import inspect
+
+from morelia.breadcrumbs import Breadcrumbs
+from morelia.exceptions import MissingStepError
+from morelia.grammar import Feature, Scenario, Step
+from morelia.parallel import EventRecorder, copy_suite, format_exception, replay_events
+from morelia.visitors import TestVisitor
+
+
+class AsyncTestVisitor(TestVisitor):
+    """Visits all steps awaiting coroutine step methods and hooks.
+
+    :param int concurrency: maximal number of scenarios run at the same time
+    :param suite_factory: callable returning new suite instance
+        for concurrent scenarios (copy of suite is used when not given)
+    :param create_matchers: callable creating matchers chain for suite
+    """
+
+    def __init__(
+        self,
+        suite,
+        matcher,
+        scenario_re,
+        plan=None,
+        concurrency=1,
+        suite_factory=None,
+        create_matchers=None,
+    ):
+        super().__init__(suite, matcher, scenario_re, plan)
+        self.__suite = suite
+        self.__scenario_re = scenario_re
+        self.__concurrency = concurrency
+        self.__suite_factory = suite_factory
+        self.__create_matchers = create_matchers
+        self.__failed = False
+
+    async def avisit(self, node) -> None:
+        if isinstance(node, Feature):
+            await self.avisit_feature(node)
+        elif isinstance(node, Scenario):
+            node.prepare()
+            for instance in node.get_instances():
+                await self.avisit_scenario(instance)
+        elif isinstance(node, Step):
+            await self.avisit_step(node)
+        else:
+            node.accept(self)
+
+    async def avisit_feature(self, node: Feature) -> None:
+        self.feature_started(node)
+        await _call_hook(self.setUpFeature)
+        try:
+            if self.__concurrency > 1:
+                await self.__avisit_concurrently(node.steps)
+            else:
+                for child in node.iter_steps():
+                    await self.avisit(child)
+        finally:
+            try:
+                await _call_hook(self.tearDownFeature)
+            finally:
+                self.close_fixtures()
+                self.feature_finished(node)
+
+    async def avisit_scenario(self, node: Scenario) -> None:
+        if self.stopped or not self.matches_scenario(node):
+            return
+        try:
+            await self.__avisit_scenario(node)
+        except Exception as exc:
+            if self.on_failure is None:
+                raise
+            self.stopped = not self.on_failure(node, exc)
+
+    async def __avisit_scenario(self, node: Scenario) -> None:
+        self.scenario_started(node)
+        self.open_fixture_scope()
+        await _call_hook(self.setUpScenario)
+        try:
+            for child in node.steps:
+                await self.avisit(child)
+        finally:
+            try:
+                await _call_hook(self.tearDownScenario)
+            finally:
+                self.close_fixture_scope()
+                self.scenario_finished(node)
+
+    async def avisit_step(self, node: Step) -> None:
+        self.step_started(node)
+        await _call_hook(self.setUpStep)
+        try:
+            await self.__aexecute_step(node)
+            self.visit_children(node.steps)
+        except (MissingStepError, AssertionError):
+            self.step_failed(node)
+            raise
+        except (SystemExit, Exception):
+            self.step_errored(node)
+            raise
+        finally:
+            await _call_hook(self.tearDownStep)
+            self.step_finished(node)
+
+    async def __aexecute_step(self, node: Step) -> None:
+        __tracebackhide__ = True
+        method, args, kwargs = self.prepare_step(node)
+        result = method(*args, **kwargs)
+        if inspect.isawaitable(result):
+            await result
+
+    async def __avisit_concurrently(self, children) -> None:
+        semaphore = asyncio.Semaphore(self.__concurrency)
+        scheduled = []
+        for child in children:
+            instances = []
+            if isinstance(child, Scenario) and self.matches_scenario(child):
+                child.prepare()
+                instances = list(child.get_instances())
+            tasks = [
+                asyncio.ensure_future(self.__arun_isolated(instance, semaphore))
+                for instance in instances
+            ]
+            scheduled.append((child, list(zip(instances, tasks))))
+        try:
+            await self.__areplay(scheduled)
+        except BaseException:
+            self.stopped = True
+            raise
+        finally:
+            await asyncio.gather(
+                *(task for _, runs in scheduled for _, task in runs),
+                return_exceptions=True
+            )
+
+    async def __areplay(self, scheduled) -> None:
+        """Replay results in serial order until failure stops run."""
+        for child, runs in scheduled:
+            if self.stopped:
+                return
+            if not isinstance(child, Scenario):
+                child.accept(self)
+            for instance, task in runs:
+                events, failure = await task
+                replay_events(self, instance, events)
+                if failure is None:
+                    continue
+                if self.on_failure is None:
+                    raise failure[0]
+                self.stopped = not self.on_failure(instance, failure[0])
+                if self.stopped:
+                    return
+
+    async def __arun_isolated(self, scenario, semaphore):
+        async with semaphore:
+            if self.stopped or (self.__failed and self.on_failure is None):
+                return [], None
+            if self.__suite_factory is None:
+                suite = copy_suite(self.__suite)
+            else:
+                suite = self.__suite_factory()
+            visitor = AsyncTestVisitor(
+                suite, self.__create_matchers(suite), self.__scenario_re
+            )
+            visitor.fixtures = self.fixtures
+            events, failure = await arun_scenario(visitor, scenario)
+            self.__failed = self.__failed or failure is not None
+            return events, failure
+
+
+async def arun_scenario(visitor, scenario):
+    """Run scenario instance recording events of visitor.
+
+    :returns: (events, failure) tuple where failure is None or
+        (exception, breadcrumbs, formatted traceback) tuple
+    """
+    recorder = EventRecorder()
+    breadcrumbs = Breadcrumbs()
+    breadcrumbs.feature = scenario.parent
+    visitor.register(recorder)
+    visitor.register(breadcrumbs)
+    failure = None
+    try:
+        await visitor.avisit_scenario(scenario)
+    except (SystemExit, Exception) as exc:
+        failure = (exc, str(breadcrumbs), format_exception(exc))
+    finally:
+        visitor.unregister(recorder)
+        visitor.unregister(breadcrumbs)
+    return recorder.pop_events(), failure
+
+
+async def _call_hook(hook):
+    result = hook()
+    if inspect.isawaitable(result):
+        await result
@@ -0,0 +1,156 @@
+"""
+Feature cache
+-------------
+
+Features verified many times (e.g. by many test processes) don't have
+to be parsed every time. Parsed features can be cached in process
+and stored on disk:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    feature_cache=".morelia_cache"
+
+With "feature_cache=true" features are cached only in process.
+
+Features are stored in pickled form under key made of hash of their text,
+their language and version of Morelia's grammar, so cached feature is not
+used when text changes or when new version of Morelia parses it differently.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from morelia.grammar import GRAMMAR_VERSION
+
+
+class FeatureCache:
+    """Parsed features cached in process and optionally on disk.
+
+    Cache returns new copy of feature on every hit, so verifications
+    never share nodes.
+
+    :param str directory: directory with cache files (None to cache in process only)
+    :param int maxsize: maximum number of features cached in process
+    """
+
+    __instances = {}  # type: dict
+
+    def __init__(self, directory=None, maxsize=256):
+        self.__directory = None if directory is None else Path(directory)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()  # type: OrderedDict
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, directory=None):
+        """Return cache shared by all parsers using given directory.
+
+        :param str directory: directory with cache files (None to cache in process only)
+        :rtype: FeatureCache
+        """
+        if directory is not None:
+            directory = str(directory)
+        try:
+            return cls.__instances[directory]
+        except KeyError:
+            cache = cls.__instances[directory] = cls(directory)
+            return cache
+
+    @staticmethod
+    def make_key(text, language):
+        """Return key of feature's text in given language.
+
+        :param str text: source of feature
+        :param str language: language of feature
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update("{}\0{}\0".format(GRAMMAR_VERSION, language).encode("utf-8"))
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, text, language):
+        """Return copy of cached feature.
+
+        :param str text: source of feature
+        :param str language: language of feature
+        :returns: feature or None if not cached
+        """
+        key = self.make_key(text, language)
+        with self.__lock:
+            data = self.__entries.get(key)
+            if data is not None:
+                self.__entries.move_to_end(key)
+        if data is None:
+            data = self.__load(key)
+        if data is None:
+            self.misses += 1
+            return None
+        try:
+            feature = pickle.loads(data)
+        except Exception:
+            self.misses += 1
+            return None
+        self.__remember(key, data)
+        self.hits += 1
+        return feature
+
+    def put(self, text, language, feature):
+        """Store parsed feature.
+
+        :param str text: source of feature
+        :param str language: language of feature
+        :param Feature feature: parsed feature
+        """
+        key = self.make_key(text, language)
+        data = pickle.dumps(feature, pickle.HIGHEST_PROTOCOL)
+        self.__remember(key, data)
+        self.__store(key, data)
+
+    def clear(self):
+        """Remove features cached in process and reset counters."""
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __remember(self, key, data):
+        with self.__lock:
+            self.__entries[key] = data
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def __get_path(self, key):
+        return self.__directory / "{}.feature.pickle".format(key)
+
+    def __load(self, key):
+        if self.__directory is None:
+            return None
+        try:
+            return self.__get_path(key).read_bytes()
+        except OSError:
+            return None
+
+    def __store(self, key, data):
+        if self.__directory is None:
+            return
+        try:
+            self.__directory.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(dir=str(self.__directory))
+            with os.fdopen(fd, "wb") as output:
+                output.write(data)
+            os.replace(name, str(self.__get_path(key)))
+        except OSError:
+            pass
@@ -0,0 +1,201 @@
+"""
+Combinations
+------------
+
+When scenario has many tables Morelia runs it once for every combination
+of their rows. With several big tables number of runs grows quickly,
+so scenario can choose other strategy with label:
+
+* "all_combinations" - every combination of rows (default),
+* "pairwise" - every pair of rows from any two tables is run at least once,
+* "random_combinations" - random subset of combinations.
+
+.. code-block:: cucumber
+
+    @pairwise
+    Scenario: checking compatibility
+        Given browser <browser>
+            | browser |
+            | firefox |
+            | chrome  |
+        And system <system>
+            | system  |
+            | linux   |
+            | windows |
+        ...
+
+Strategy for scenarios without such label can be changed in configuration:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    combinations="pairwise"
+    combinations_sample=10
+    combinations_seed=0
+
+"combinations_sample" and "combinations_seed" control how many combinations
+"random_combinations" strategy runs and which ones. The same seed always
+selects the same combinations.
+"""
+import functools
+import itertools
+import operator
+import random
+
+LABELS = {
+    "all_combinations": "all",
+    "pairwise": "pairwise",
+    "random_combinations": "random",
+}
+
+
+class Combinations:
+    """Choose row indices run for scenario with tables.
+
+    :param str default: strategy used by scenarios without strategy label
+    :param int sample: number of combinations chosen by "random" strategy
+    :param int seed: seed of random generator used by "random" strategy
+    """
+
+    def __init__(self, default="all", sample=10, seed=0):
+        self.__strategies = {
+            "all": all_combinations,
+            "pairwise": pairwise_combinations,
+            "random": functools.partial(random_combinations, sample=sample, seed=seed),
+        }
+        if default not in self.__strategies:
+            raise ValueError(
+                'Unknown combinations strategy "{}", expected one of: {}'.format(
+                    default, ", ".join(sorted(self.__strategies))
+                )
+            )
+        self.__default = default
+        self.__sample = sample
+
+    def get_strategy_name(self, labels=()):
+        """Return name of strategy selected by first strategy label."""
+        for label in labels:
+            if label in LABELS:
+                return LABELS[label]
+        return self.__default
+
+    def schedule(self, dims, labels=()):
+        """Return iterator over row indices for given table dimensions.
+
+        :param list dims: numbers of rows in every table (0 for steps without table)
+        :param list labels: labels of scenario
+        """
+        sizes = [max(dim, 1) for dim in dims]
+        strategy = self.__strategies[self.get_strategy_name(labels)]
+        return strategy(sizes)
+
+    def count(self, dims, labels=()):
+        """Return number of combinations :py:meth:`schedule` returns.
+
+        Combinations are counted without enumerating them.
+
+        :param list dims: numbers of rows in every table (0 for steps without table)
+        :param list labels: labels of scenario
+        """
+        sizes = [max(dim, 1) for dim in dims]
+        total = functools.reduce(operator.mul, sizes, 1)
+        name = self.get_strategy_name(labels)
+        if name == "random":
+            return min(self.__sample, total)
+        if name == "pairwise":
+            tests = _pairwise_tests(sizes)
+            if tests is not None:
+                return len(tests)
+        return total
+
+
+def all_combinations(sizes):
+    """Return lazy iterator over all combinations of indices."""
+    return itertools.product(*(range(size) for size in sizes))
+
+
+def pairwise_combinations(sizes):
+    """Return indices covering every pair of values from any two positions.
+
+    Covering array is built with in-parameter-order strategy: it starts
+    with all pairs of first two tables and adds tables one by one,
+    first extending existing combinations and then appending new ones
+    for pairs that are still not covered.
+    """
+    tests = _pairwise_tests(sizes)
+    if tests is None:
+        return all_combinations(sizes)
+    axes = [position for position, size in enumerate(sizes) if size > 1]
+    return (_expand(sizes, axes, test) for test in tests)
+
+
+def _pairwise_tests(sizes):
+    """Return values of tables with many rows or None if there are less than 3."""
+    axes = [position for position, size in enumerate(sizes) if size > 1]
+    if len(axes) < 3:
+        return None
+    axis_sizes = [sizes[position] for position in axes]
+    tests = [list(pair) for pair in all_combinations(axis_sizes[:2])]
+    for axis in range(2, len(axes)):
+        size = axis_sizes[axis]
+        uncovered = {
+            (other, other_value, value)
+            for other in range(axis)
+            for other_value in range(axis_sizes[other])
+            for value in range(size)
+        }
+        for test_idx, test in enumerate(tests):
+            if test_idx < size:
+                value = test_idx
+            else:
+                value = max(
+                    range(size),
+                    key=lambda value: sum(
+                        (other, test[other], value) in uncovered
+                        for other in range(axis)
+                    ),
+                )
+            test.append(value)
+            uncovered.difference_update(
+                (other, test[other], value) for other in range(axis)
+            )
+        new_tests = []
+        for other, other_value, value in sorted(uncovered):
+            for test in new_tests:
+                if test[axis] == value and test[other] is None:
+                    test[other] = other_value
+                    break
+            else:
+                test = [None] * (axis + 1)
+                test[other] = other_value
+                test[axis] = value
+                new_tests.append(test)
+        tests.extend(new_tests)
+    return tests
+
+
+def random_combinations(sizes, sample=10, seed=0):
+    """Return indices of random subset of all combinations.
+
+    Combinations are chosen without enumerating all of them
+    and are returned in the same order as in :py:func:`all_combinations`.
+    """
+    total = functools.reduce(operator.mul, sizes, 1)
+    generator = random.Random(seed)
+    numbers = sorted(generator.sample(range(total), min(sample, total)))
+    return (_unrank(sizes, number) for number in numbers)
+
+
+def _expand(sizes, axes, test):
+    indices = [0] * len(sizes)
+    for position, value in zip(axes, test):
+        indices[position] = value or 0
+    return tuple(indices)
+
+
+def _unrank(sizes, number):
+    indices = []
+    for size in reversed(sizes):
+        number, index = divmod(number, size)
+        indices.append(index)
+    return tuple(reversed(indices))
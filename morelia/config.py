@@ -29,6 +29,94 @@ and call "verify" as:
 Then it would be run with wip (work in progress) mode active.
 
 If no config is passed, then "default" is assumed.
+
+Steps resolved by matchers can be stored on disk, so next runs don't
+have to match them again:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    step_cache=".morelia_cache"
+
+Cache is invalidated automatically when names, docstrings or sources
+of step methods change. Parsed features can be cached the same way
+(see :py:mod:`morelia.cache`):
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    feature_cache=".morelia_cache"
+
+Background can be run only once per feature instead of before every scenario:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    background_once=true
+
+Then background is run in first scenario (after its "setUpScenario")
+and attributes it sets on suite are saved after it finishes and restored
+(as deep copies) before "setUpScenario" of every other scenario. Suite can control
+that itself defining "snapshot" method returning saved state
+and "restore" method accepting it. Background with placeholders
+filled from scenarios' tables is still run before every scenario.
+Option is used only when scenarios are run one by one on given suite;
+parallel runners (see :py:mod:`morelia.parallel`) and :py:func:`morelia.averify`
+run Background before every scenario and warn when it is set.
+
+Scenarios with many tables can run only part of combinations of their rows
+(see :py:mod:`morelia.combinations`):
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    combinations="pairwise"
+
+Only scenarios with labels matching tag expression can be run
+(see :py:mod:`morelia.tags`):
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    tags="@smoke and not @slow"
+
+Steps of features can be checked without running them (e.g. in pre-commit hook):
+
+.. code-block:: toml
+
+    [tool.morelia.precommit]
+    dry_run=true
+
+Then features are parsed and their steps (also of every Scenario Outline row)
+are matched, but no hooks or steps are run. Verification fails if some steps
+are missing or matched by more than one method.
+
+By default first failed scenario stops verification ("fail_fast").
+All scenarios can be run instead with their failures reported together:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    continue_on_failure=true
+
+or run can be stopped after given number of failed scenarios:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    max_failures=5
+
+Then first failure is raised with report of all failures, each with
+feature, scenario and step where it happened.
+
+Scenario instances can be split between machines running the same tests
+(see :py:mod:`morelia.sharding`):
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    shard_index=0
+    shard_count=12
 """
 
 import os
@@ -36,6 +124,8 @@ from pathlib import Path
 
 import toml
 
+from morelia.cache import FeatureCache
+from morelia.combinations import Combinations
 from morelia.formatters import (
     Buffered,
     FileOutput,
@@ -43,7 +133,14 @@ from morelia.formatters import (
     TerminalOutput,
     TextFormat,
 )
-from morelia.matchers import MethodNameStepMatcher, ParseStepMatcher, RegexpStepMatcher
+from morelia.matchers import (
+    MethodNameStepMatcher,
+    ParseStepMatcher,
+    PersistentStepCache,
+    RegexpStepMatcher,
+)
+from morelia.sharding import Sharding
+from morelia.tags import compile_tag_expression
 
 MATCHERS = {
     "parse": ParseStepMatcher,
@@ -88,6 +185,71 @@ class TOMLConfig:
     def get_matchers(self):
         return [MATCHERS[matcher] for matcher in self.__data["matchers"]]
 
+    def get_step_cache(self):
+        directory = self.__data.get("step_cache")
+        if not directory:
+            return None
+        return PersistentStepCache.for_directory(directory)
+
+    def get_feature_cache(self):
+        setting = self.__data.get("feature_cache")
+        if not setting:
+            return None
+        if setting is True:
+            return FeatureCache.for_directory(None)
+        return FeatureCache.for_directory(setting)
+
+    def get_tags(self):
+        expression = self.__data.get("tags")
+        if not expression:
+            return None
+        return compile_tag_expression(expression)
+
+    def get_combinations(self):
+        return Combinations(
+            self.__data.get("combinations", "all"),
+            sample=self.__data.get("combinations_sample", 10),
+            seed=self.__data.get("combinations_seed", 0),
+        )
+
+    def get_sharding(self):
+        count = int(
+            os.environ.get("MORELIA_SHARD_COUNT", self.__data.get("shard_count", 1))
+        )
+        if count <= 1:
+            return None
+        index = int(
+            os.environ.get("MORELIA_SHARD_INDEX", self.__data.get("shard_index", 0))
+        )
+        timings = os.environ.get(
+            "MORELIA_SHARD_TIMINGS", self.__data.get("shard_timings")
+        )
+        return Sharding(index, count, Sharding.load_timings(timings))
+
+    def get_workers(self):
+        return self.__data.get("workers", 1)
+
+    def get_executor(self):
+        return self.__data.get("executor", "process")
+
+    def get_concurrency(self):
+        return self.__data.get("concurrency", 1)
+
+    def get_max_failures(self):
+        if self.__data.get("fail_fast", False):
+            return 1
+        if "max_failures" in self.__data:
+            return self.__data["max_failures"]
+        if self.__data.get("continue_on_failure", False):
+            return 0
+        return 1
+
+    def get_dry_run(self):
+        return self.__data.get("dry_run", False)
+
+    def get_background_once(self):
+        return self.__data.get("background_once", False)
+
     def get_writers(self):
         writers = []
         for writer_conf in self.__data.get("output", []):
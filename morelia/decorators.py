@@ -73,29 +73,60 @@ And run tests only for selected features:
     Ran 3 test in 0.022s
 
     OK (skipped=2)
+
+Tags are matched with the same expressions as scenarios' labels
+(see :py:mod:`morelia.tags`):
+
+.. code-block:: console
+
+    $ MORELIA_TAGS="basic or (advanced and not slow)" python -m unittest test_acceptance
+
+    ..s
+    ----------------------------------------------------------------------
+    Ran 3 test in 0.028s
+
+    OK (skipped=1)
+
+Patterns made only of space separated tags keep their old meaning: when
+any "-tag" is given only tests with excluded tags are skipped and other
+tags are ignored, so "advanced -slow" is the same as "-slow".
 """
 
+import functools
 import os
+import re
 import unittest
 
+from morelia.tags import OPERATORS, compile_tag_expression
+
+LEGACY_WORD_RE = re.compile(r"-?\w[\w-]*")
+
 
 def should_skip(tags_list, pattern):
-    tags_list = set(tags_list)
-    matching_tags = pattern.split()
-    negative_tags = [tag[1:] for tag in matching_tags if tag.startswith("-")]
-    positive_tags = [tag for tag in matching_tags if not tag.startswith("-")]
-    if negative_tags:
-        return bool(set(negative_tags) & tags_list)
-    if positive_tags:
-        return not set(positive_tags).issubset(tags_list)
-    return False
+    """Return True if tags don't match tag expression.
+
+    :param list tags_list: list of tags for test
+    :param str pattern: tag expression (see :py:mod:`morelia.tags`)
+    """
+    return not _compile_pattern(pattern)(tags_list)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_pattern(pattern):
+    """Compile pattern keeping old meaning of space separated tags."""
+    words = pattern.split()
+    legacy = all(LEGACY_WORD_RE.fullmatch(word) for word in words)
+    if legacy and not set(words) & set(OPERATORS):
+        negative_tags = [word for word in words if word.startswith("-")]
+        if negative_tags:
+            pattern = " ".join(negative_tags)
+    return compile_tag_expression(pattern)
 
 
 def tags(tags_list):
     """Skip decorated test methods or classes if tags matches.
 
     :param list tags_list: list of tags for test
-    :param morelia.config.Config config: optional configuration object
     """
     pattern = os.environ.get("MORELIA_TAGS", "")
     return unittest.skipIf(should_skip(tags_list, pattern), "Tags not matched")
@@ -13,3 +13,23 @@ class MissingStepError(MoreliaError):
 
 class InvalidScenarioMatchingPattern(MoreliaError):
     pass
+
+
+class InvalidTagExpression(MoreliaError):
+    pass
+
+
+class FeatureSyntaxErrors(MoreliaError):
+    """Syntax errors found in many features.
+
+    :param list errors: syntax errors with filenames set
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "\n".join(
+                "{}:{}: {}".format(error.filename, error.lineno, error.msg)
+                for error in errors
+            )
+        )
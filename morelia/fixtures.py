@@ -0,0 +1,321 @@
+"""
+Fixtures
+--------
+
+Resources expensive to create (database schemas, browser sessions, service
+containers) can be declared on suite as fixtures:
+
+.. code-block:: python
+
+    from morelia.fixtures import fixture
+
+    class CalculatorTestCase(unittest.TestCase):
+
+        @fixture(scope="feature")
+        def database(self):
+            database = create_database()
+            yield database
+            database.drop()
+
+        def step_I_have_user_named(self, name, database):
+            r'I have user named "([^"]+)"'
+            database.add_user(name)
+
+Fixture is created when first step asking for it (by parameter name) runs.
+Code after "yield" tears it down. Fixture can ask for other fixtures
+with the same or wider scope the same way steps do. Scopes are:
+
+* "scenario" - created for every scenario using it (default),
+* "feature" - shared by scenarios of one feature,
+* "session" - shared by all features until interpreter exits.
+
+"feature" and "session" fixtures are pooled. Scenario checks fixture out
+of pool and returns it back when finished, so scenarios run at the same
+time (see :py:mod:`morelia.parallel`) never share one instance and new
+instance is created only when all others are in use. Pooled fixture keeps
+instances of pooled fixtures it was created with for its whole life.
+
+Scenario fixtures are torn down after "tearDownScenario" in reverse order
+of their creation, feature fixtures after "tearDownFeature". Worker
+processes tear down session fixtures they created when their scenarios
+are finished.
+"""
+
+import atexit
+import functools
+import inspect
+import os
+import threading
+import weakref
+
+from morelia.exceptions import MoreliaError
+
+SCOPES = ("scenario", "feature", "session")
+
+_FIXTURE_ATTRIBUTE = "morelia_fixture_scope"
+
+
+def fixture(function=None, scope="scenario"):
+    """Mark suite method as fixture.
+
+    Can be used with or without arguments.
+
+    :param function: generator method yielding fixture or method returning it
+    :param str scope: one of "scenario", "feature" or "session"
+    """
+    if scope not in SCOPES:
+        raise ValueError(
+            'Unknown fixture scope "{}", expected one of: {}'.format(
+                scope, ", ".join(SCOPES)
+            )
+        )
+
+    def decorator(function):
+        setattr(function, _FIXTURE_ATTRIBUTE, scope)
+        return function
+
+    if function is None:
+        return decorator
+    return decorator(function)
+
+
+_definitions = weakref.WeakKeyDictionary()  # type: ignore
+_parameters = weakref.WeakKeyDictionary()  # type: ignore
+
+
+def get_fixtures(suite_class):
+    """Return fixtures declared on suite class.
+
+    :returns: dictionary mapping fixture names to (function, scope) tuples
+    :rtype: dict
+    """
+    try:
+        return _definitions[suite_class]
+    except KeyError:
+        fixtures = {}
+        for name in dir(suite_class):
+            function = getattr(suite_class, name, None)
+            scope = getattr(function, _FIXTURE_ATTRIBUTE, None)
+            if scope is not None:
+                fixtures[name] = (function, scope)
+        _definitions[suite_class] = fixtures
+        return fixtures
+
+
+def get_fixture_parameters(method):
+    """Return parameters of bound method naming fixtures of its suite.
+
+    :returns: (position, name) tuples of parameters
+    :rtype: tuple
+    """
+    if not inspect.ismethod(method):
+        return ()
+    suite_class = type(method.__self__)
+    function = method.__func__
+    cache = _parameters.setdefault(suite_class, {})
+    try:
+        return cache[function]
+    except KeyError:
+        fixtures = get_fixtures(suite_class)
+        parameters = list(inspect.signature(method).parameters)
+        result = tuple(
+            (position, name)
+            for position, name in enumerate(parameters)
+            if name in fixtures
+        )
+        cache[function] = result
+        return result
+
+
+class Resource:
+    """Fixture value with its teardown.
+
+    :param function: fixture function
+    :param suite: suite fixture is created for
+    :param dict arguments: other fixtures requested by fixture function
+    :param dict dependencies: pooled resources of arguments kept checked out
+        as long as this resource exists
+    """
+
+    def __init__(self, function, suite, arguments, dependencies=None):
+        self.name = function.__name__
+        self.pid = os.getpid()
+        self.dependencies = dependencies or {}
+        result = function(suite, **arguments)
+        if inspect.isgenerator(result):
+            self.__generator = result
+            self.value = next(result)
+        else:
+            self.__generator = None
+            self.value = result
+
+    def close(self) -> None:
+        """Run fixture code following "yield"."""
+        if self.__generator is None:
+            return
+        generator, self.__generator = self.__generator, None
+        try:
+            next(generator)
+        except StopIteration:
+            return
+        generator.close()
+        raise MoreliaError('Fixture "{}" yielded more than once'.format(self.name))
+
+
+class FixturePool:
+    """Pooled instances of "feature" or "session" fixtures.
+
+    Pool is thread safe and can be shared by visitors running
+    scenarios concurrently.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__idle = {}
+        self.__created = []
+
+    def checkout(self, function, create):
+        """Return idle instance of fixture creating new one if none is idle.
+
+        :param function: fixture function
+        :param create: callable returning new resource of fixture
+        :returns: resource which should be returned with :py:meth:`checkin`
+        :rtype: Resource
+        """
+        with self.__lock:
+            idle = self.__idle.get(function)
+            if idle:
+                return idle.pop()
+        resource = create()
+        with self.__lock:
+            self.__created.append(resource)
+        return resource
+
+    def checkin(self, function, resource) -> None:
+        """Return fixture instance to pool."""
+        with self.__lock:
+            self.__idle.setdefault(function, []).append(resource)
+
+    def close(self) -> None:
+        """Tear down fixtures created by current process in reverse order."""
+        with self.__lock:
+            created, self.__created = self.__created, []
+            self.__idle = {}
+        pid = os.getpid()
+        _close_all(resource for resource in created if resource.pid == pid)
+
+
+SESSION = FixturePool()
+atexit.register(SESSION.close)
+
+
+class FixtureScope:
+    """Fixtures used by one scenario.
+
+    Every fixture is created (or checked out of pool) once per scope.
+
+    :param suite: suite running scenario
+    :param FixturePool pool: pool of "feature" fixtures
+    :param FixturePool session: pool of "session" fixtures
+    """
+
+    def __init__(self, suite, pool, session=SESSION):
+        self.__suite = suite
+        self.__pools = {"feature": pool, "session": session}
+        self.__values = {}
+        self.__created = []
+        self.__checked_out = []
+
+    def get(self, name, requested_by=None):
+        """Return value of fixture creating it on first use.
+
+        Pooled fixture is checked out together with fixtures it was
+        created with, so they are never shared with other scopes.
+
+        :param str name: name of fixture
+        :param str requested_by: scope of fixture asking for this one
+        :raises MoreliaError: if fixture has narrower scope than fixture asking for it
+        """
+        function, scope = self.__find(name, requested_by)
+        try:
+            return self.__values[name]
+        except KeyError:
+            pass
+        if scope == "scenario":
+            arguments = {
+                parameter: self.get(parameter, scope)
+                for parameter in _get_function_parameters(function)
+            }
+            resource = Resource(function, self.__suite, arguments)
+            self.__created.append(resource)
+        else:
+            pool = self.__pools[scope]
+            resource = self.__checkout(function, scope)
+            self.__checked_out.append((pool, function, resource))
+            self.__adopt_dependencies(resource)
+        value = self.__values[name] = resource.value
+        return value
+
+    def __find(self, name, requested_by):
+        try:
+            function, scope = get_fixtures(type(self.__suite))[name]
+        except KeyError:
+            raise MoreliaError('Fixture "{}" not found'.format(name))
+        if requested_by is not None and SCOPES.index(scope) < SCOPES.index(
+            requested_by
+        ):
+            raise MoreliaError(
+                'Fixture "{}" with "{}" scope can\'t be used by "{}" fixture'.format(
+                    name, scope, requested_by
+                )
+            )
+        return function, scope
+
+    def __checkout(self, function, scope):
+        """Check out pooled fixture creating it with its own dependencies."""
+        return self.__pools[scope].checkout(
+            function, functools.partial(self.__create_pooled, function, scope)
+        )
+
+    def __create_pooled(self, function, scope):
+        dependencies = {}
+        for parameter in _get_function_parameters(function):
+            dependency, dependency_scope = self.__find(parameter, scope)
+            dependencies[parameter] = self.__checkout(dependency, dependency_scope)
+        arguments = {name: resource.value for name, resource in dependencies.items()}
+        return Resource(function, self.__suite, arguments, dependencies)
+
+    def __adopt_dependencies(self, resource):
+        """Use fixtures pooled resource was created with in this scope."""
+        for name, dependency in resource.dependencies.items():
+            if name not in self.__values:
+                self.__values[name] = dependency.value
+                self.__adopt_dependencies(dependency)
+
+    def close(self) -> None:
+        """Tear down scenario fixtures and return pooled ones."""
+        self.__values = {}
+        created, self.__created = self.__created, []
+        checked_out, self.__checked_out = self.__checked_out, []
+        try:
+            _close_all(created)
+        finally:
+            for pool, function, resource in reversed(checked_out):
+                pool.checkin(function, resource)
+
+
+def _get_function_parameters(function):
+    return list(inspect.signature(function).parameters)[1:]
+
+
+def _close_all(resources) -> None:
+    """Close resources in reverse order raising first error after all are closed."""
+    error = None
+    for resource in reversed(list(resources)):
+        try:
+            resource.close()
+        except (SystemExit, Exception) as exc:
+            if error is None:
+                error = exc
+    if error is not None:
+        raise error
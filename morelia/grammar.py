@@ -1,14 +1,20 @@
 import copy
 import itertools
+import operator
 import re
 from abc import ABC, abstractmethod
 from typing import Iterable, Type
 
+from morelia.combinations import Combinations
 from morelia.exceptions import MissingStepError
 from morelia.i18n import TRANSLATIONS
 
 PLACEHOLDER_RE = re.compile(r"\<(\w+)\>")
 
+# bump whenever attributes of parsed nodes change (they are pickled
+# by feature cache), so features cached by older versions are not used
+GRAMMAR_VERSION = 2
+
 
 class Visitor(ABC):  # pragma: nocover
     @abstractmethod
@@ -50,13 +56,13 @@ class Node(ABC):
     def __init__(
         self, source="", line_number=0, language="en", labels=None, predecessors=[]
     ):
-        self.__source = source
+        self.__source_lines = [source]
         self.__line_number = line_number
         self.__language = language
         self.__labels = labels if labels is not None else []
         self.steps = []
         self.parent = None
-        self.__predicate = self.__extract_predicate()
+        self.__predicate_lines = [self.__extract_predicate()]
         self.parent = self.__find_parent(predecessors)
         self.__connect_to_parent()
         self._validate_predicate()
@@ -83,7 +89,10 @@ class Node(ABC):
         allowed_parents = self.allowed_parents
         if not allowed_parents and predecessors:
             self.enforce(False, "Only one Feature per file")
-        for step in predecessors[::-1]:
+        find_latest = getattr(predecessors, "find_latest", None)
+        if find_latest is not None:
+            return find_latest(allowed_parents)
+        for step in reversed(predecessors):
             if isinstance(step, allowed_parents):
                 return step
         return None
@@ -115,7 +124,10 @@ class Node(ABC):
 
     @property
     def source(self):
-        return self.__source
+        lines = self.__source_lines
+        if len(lines) > 1:
+            lines[:] = ["\n".join(lines)]
+        return lines[0]
 
     @property
     def line_number(self):
@@ -123,21 +135,42 @@ class Node(ABC):
 
     @property
     def predicate(self):
-        return self.__predicate
+        lines = self.__predicate_lines
+        if len(lines) > 1:
+            lines[:] = ["\n".join(lines).strip()]
+        return lines[0]
 
     def append_line(self, line):
-        self.__source += "\n" + line
-        self.__predicate = (self.__predicate + "\n" + line.strip()).strip()
+        """Append continuation line to node.
+
+        Lines are joined when source or predicate is read,
+        so appending many lines takes linear time.
+        """
+        self.__source_lines.append(line)
+        line = line.strip()
+        if line:
+            self.__predicate_lines.append(line)
         self._validate_predicate()
 
     def _validate_predicate(self):
         return  # looks good! (-:
 
     def get_labels(self):
-        labels = self.__labels[:]
-        if self.parent:
-            labels.extend(self.parent.get_labels())
-        return labels
+        """Return own labels followed by labels inherited from parents.
+
+        Labels are collected once and recollected only when node is moved
+        to other parent (e.g. when copied into scenario instance).
+        """
+        try:
+            parent, labels = self.__inherited_labels
+        except AttributeError:
+            parent = labels = None
+        if labels is None or parent is not self.parent:
+            labels = tuple(self.__labels)
+            if self.parent:
+                labels += tuple(self.parent.get_labels())
+            self.__inherited_labels = (self.parent, labels)
+        return list(labels)
 
     def get_all_steps(self):
         return itertools.chain.from_iterable(
@@ -187,9 +220,84 @@ class Node(ABC):
         pass
 
 
+class Predecessors(list):
+    """Parsed nodes remembering latest node of every class.
+
+    Parent of next node is found by comparing latest nodes
+    of allowed classes instead of scanning all nodes parsed so far.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.__latest = {}
+        for position, node in enumerate(self):
+            self.__latest[type(node)] = (position, node)
+
+    def append(self, node):
+        self.__latest[type(node)] = (len(self), node)
+        super().append(node)
+
+    def find_latest(self, classes, __memo={}):
+        """Return latest node which is instance of one of classes or None."""
+        found = []
+        for node_class, latest in self.__latest.items():
+            try:
+                allowed = __memo[node_class, classes]
+            except KeyError:
+                allowed = __memo[node_class, classes] = issubclass(node_class, classes)
+            if allowed:
+                found.append(latest)
+        if not found:
+            return None
+        return max(found, key=operator.itemgetter(0))[1]
+
+
 class Feature(Node):
+    combinations = Combinations()
+    sharding = None
+    __pending = None
+
     def accept(self, visitor: Visitor) -> None:
-        visitor.visit_feature(self, self.steps)
+        if self.__pending is None:
+            visitor.visit_feature(self, self.steps)
+        else:
+            visitor.visit_feature(self, self.iter_steps())
+
+    def defer_parsing(self, nodes) -> None:
+        """Parse rest of feature when its steps are iterated.
+
+        :param nodes: iterator parsing next node of feature on every step
+        """
+        self.__pending = nodes
+
+    @property
+    def parsed(self) -> bool:
+        """Whether whole feature is already parsed."""
+        return self.__pending is None
+
+    def iter_steps(self):
+        """Return iterator over children parsing pending ones on demand.
+
+        Child is returned after next child is parsed (or source ends),
+        so it's complete when returned.
+        """
+        position = 0
+        while True:
+            complete = len(self.steps) - (0 if self.__pending is None else 1)
+            while position < complete:
+                yield self.steps[position]
+                position += 1
+            if self.__pending is None:
+                return
+            try:
+                next(self.__pending)
+            except StopIteration:
+                self.__pending = None
+
+    def parse_remaining(self) -> None:
+        """Parse rest of feature if its parsing was deferred."""
+        for _ in self.iter_steps():
+            pass
 
     def prepend_steps(self, scenario):
         background = self.steps[0]
@@ -207,28 +315,85 @@ class Scenario(Node):
         self.row_indices = [0]
 
     def accept(self, visitor: Visitor) -> None:
+        self.prepare()
+        for instance in self.get_instances():
+            visitor.visit_scenario(instance, instance.steps)
+
+    def get_instances(self):
+        """Return lazy iterator over scenario instances of permutations to run."""
+        for row_indices in self.permute_schedule():
+            yield self.get_instance(row_indices)
+
+    def get_instance(self, row_indices):
+        """Return copy of scenario bound to given row indices.
+
+        Copy has its own steps pointing to it as parent, so many
+        permutations of one scenario can be run at the same time.
+        """
+        instance = copy.copy(self)
+        instance.row_indices = row_indices
+        instance.steps = []
+        for step in self.steps:
+            new_step = copy.copy(step)
+            new_step.parent = instance
+            instance.steps.append(new_step)
+        row_values = self.get_row_values()
+        instance.__row_values = (instance.steps, len(instance.steps), row_values)
+        return instance
+
+    def prepare(self):
+        """Prepend background steps and check that scenario has steps."""
         self.parent.prepend_steps(self)
         self.enforce(
             0 < len(self.steps),
             "Scenario without step(s) - Step, Given, When, Then, And, or #",
         )
-        schedule = self.permute_schedule()
 
-        old_row_indices = self.row_indices
-        try:
-            for indices in schedule:
-                self.row_indices = indices
-                visitor.visit_scenario(self, self.steps)
-        finally:
-            self.row_indices = old_row_indices
+    def permute_schedule(self, sharded=True):
+        """Return lazy iterator over row indices of permutations to run.
 
-    def permute_schedule(self):
+        Permutations are chosen by feature's combinations strategy
+        which can be overridden with scenario's labels. Only permutations
+        of current shard are returned if feature is sharded.
+        """
+        dims = self.count_Row_dimensions()
+        schedule = self.parent.combinations.schedule(dims, self.get_labels())
+        sharding = self.parent.sharding
+        if sharded and sharding is not None:
+            return sharding.select(self, schedule)
+        return schedule
+
+    def count_permutations(self, sharded=True):
+        """Return number of permutations run by :py:meth:`permute_schedule`.
+
+        Permutations are enumerated only when they are split between shards.
+        """
+        if sharded and self.parent.sharding is not None:
+            return sum(1 for _ in self.permute_schedule(sharded))
         dims = self.count_Row_dimensions()
-        return _permute_indices(dims)
+        return self.parent.combinations.count(dims, self.get_labels())
 
     def count_Row_dimensions(self):
         return [step.rows_number for step in self.steps if isinstance(step, RowParent)]
 
+    def get_row_values(self):
+        """Return row values of every table in order of row dimensions.
+
+        Result is computed once for every list of steps.
+        """
+        steps = self.steps
+        try:
+            cached_steps, steps_count, row_values = self.__row_values
+            if cached_steps is steps and steps_count == len(steps):
+                return row_values
+        except AttributeError:
+            pass
+        row_values = tuple(
+            step.get_row_values() for step in steps if isinstance(step, RowParent)
+        )
+        self.__row_values = (steps, len(steps), row_values)
+        return row_values
+
     def get_all_steps(self):
         return (step for step in self.steps if isinstance(step, Step))
 
@@ -255,6 +420,9 @@ class Background(Node):
     def count_Row_dimensions(self):
         return [0]
 
+    def get_row_values(self):
+        return ()
+
     def get_all_steps(self):
         return (step for step in self.steps if isinstance(step, Step))
 
@@ -268,6 +436,31 @@ class RowParent(Node):
     def get_rows(self):
         return [step for step in self.steps if isinstance(step, Row)]
 
+    def get_row_values(self):
+        """Return values of table rows as column title to value mappings.
+
+        Values are escaped for inserting into predicates. Header row
+        is not included. Mappings are computed once for every table size.
+        """
+        rows = self.get_rows()
+        try:
+            rows_count, row_values = self.__row_values
+            if rows_count == len(rows):
+                return row_values
+        except AttributeError:
+            pass
+        row_values = []
+        if len(rows) > 1:
+            header = rows[0].values
+            for row in rows[1:]:
+                values = {}
+                for column_idx, column_title in enumerate(header):
+                    value = row[column_idx].replace("\n", "\\n")
+                    values.setdefault(column_title, value)
+                row_values.append(values)
+        self.__row_values = (len(rows), row_values)
+        return row_values
+
 
 class Step(RowParent):
     allowed_parents = (Scenario, Background)
@@ -279,16 +472,18 @@ class Step(RowParent):
     def accept(self, visitor: Visitor) -> None:
         visitor.visit_step(self, self.steps)
 
-    def find_method(self, matcher):
+    def find_method(self, matcher, augmented_predicate=None):
         """Find method matching step.
 
         :param IStepMatcher matcher: object matching methods by given predicate
+        :param str augmented_predicate: interpolated predicate, current if None
         :returns: (method, args, kwargs) tuple
         :rtype: tuple
         :raises MissingStepError: if method maching step not found
         """
         predicate = self.predicate
-        augmented_predicate = self.__get_interpolated_predicate()
+        if augmented_predicate is None:
+            augmented_predicate = self.__get_interpolated_predicate()
         method, args, kwargs = matcher.find(predicate, augmented_predicate)
         if method:
             return method, args, kwargs
@@ -300,48 +495,87 @@ class Step(RowParent):
         augmented_predicate = self.__get_interpolated_predicate()
         return self.source.replace(self.predicate, augmented_predicate)
 
+    def interpolated_predicate(self):
+        """Return predicate with placeholders replaced by current rows values."""
+        return self.__get_interpolated_predicate()
+
+    def get_interpolated_predicates(self):
+        """Return distinct predicates interpolated with all rows of tables.
+
+        Only tables with columns used in placeholders are permuted,
+        so number of predicates doesn't grow with unrelated tables.
+
+        :returns: list of interpolated predicates
+        :rtype: list
+        """
+        template = self.__get_template()
+        if template is None:
+            return [self.predicate]
+        _, slots, tables_number = template
+        ranges = [[0]] * tables_number
+        for _, table_idx, rows in slots:
+            if table_idx is not None:
+                ranges[table_idx] = range(len(rows))
+        predicates = {}
+        for row_indices in itertools.product(*ranges):
+            predicates[self.__fill_template(template, row_indices)] = True
+        return list(predicates)
+
     def __get_interpolated_predicate(self):
-        if self.parent is None:
+        template = self.__get_template()
+        if template is None:
             return self.predicate
-        if self.__parent_has_no_rows():
-            return self.predicate
-        placeholders = PLACEHOLDER_RE.findall(self.predicate)
-        if not placeholders:
-            return self.predicate
-        return self.__replace_placeholders_in_predicate(placeholders)
-
-    def __parent_has_no_rows(self):
-        dims = self.parent.count_Row_dimensions()
-        return not any(dims)
-
-    def __replace_placeholders_in_predicate(self, placeholders):
-        copy = self.predicate[:]
-        row_indices = self.parent.row_indices
-        siblings = self.parent.steps
-        for step_idx, row_idx in enumerate(row_indices):
-            step = siblings[step_idx]
-            table = step.get_rows()
-            if len(table) > 1:
-                header = table[0]
-                body = table[1:]
-                for column_idx, column_title in enumerate(header.values):
-                    value = body[row_idx][column_idx]
-                    copy = self.__replace_placeholders(
-                        column_title, value, placeholders, copy
-                    )
-        return copy
-
-    def __replace_placeholders(self, column_title, table_value, placeholders, copy):
-        for placeholder in placeholders:
-            if column_title == placeholder:
-                return self.__replace_placeholder(copy, placeholder, table_value)
-        return copy
-
-    def __replace_placeholder(self, copy, placeholder, table_value):
-        table_value = table_value.replace("\n", "\\n")
-        return copy.replace(
-            "<{placeholder}>".format(placeholder=placeholder), table_value
-        )
+        return self.__fill_template(template, self.parent.row_indices)
+
+    def __get_template(self):
+        """Return predicate compiled into literal parts and placeholder slots.
+
+        Every slot knows which table (in order of scenario's row dimensions)
+        provides its value, so filling it for given row indices takes
+        one lookup per placeholder. Template is rebuilt only when
+        predicate or scenario's tables change.
+        """
+        parent = self.parent
+        if parent is None:
+            return None
+        tables = parent.get_row_values()
+        try:
+            predicate, cached_tables, template = self.__template
+            if predicate == self.predicate and cached_tables is tables:
+                return template
+        except AttributeError:
+            pass
+        template = self.__compile_template(tables)
+        self.__template = (self.predicate, tables, template)
+        return template
+
+    def __compile_template(self, tables):
+        if not any(tables):
+            return None
+        parts = PLACEHOLDER_RE.split(self.predicate)
+        if len(parts) == 1:
+            return None
+        slots = []
+        for placeholder in parts[1::2]:
+            table_idx, rows = None, None
+            for idx, table in enumerate(tables):
+                if table and placeholder in table[0]:
+                    table_idx, rows = idx, table
+                    break
+            slots.append((placeholder, table_idx, rows))
+        return parts[::2], slots, len(tables)
+
+    def __fill_template(self, template, row_indices):
+        literals, slots, _ = template
+        result = [literals[0]]
+        for (placeholder, table_idx, rows), literal in zip(slots, literals[1:]):
+            if table_idx is None or table_idx >= len(row_indices):
+                value = "<{placeholder}>".format(placeholder=placeholder)
+            else:
+                value = rows[row_indices[table_idx]][placeholder]
+            result.append(value)
+            result.append(literal)
+        return "".join(result)
 
 
 class Given(Step):
@@ -410,24 +644,3 @@ class Comment(Node):
 
     def _validate_predicate(self):
         self.enforce("\n" not in self.predicate, "linefeed in comment")
-
-
-def _permute_indices(arr):
-    product_args = list(_imap(arr))
-    result = list(itertools.product(*product_args))
-    return result
-    #  tx to Chris Rebert, et al, on the Python newsgroup for curing my brainlock here!!
-
-
-def _imap(*iterables):
-    iterables = [iter(i) for i in iterables]
-    while True:
-        try:
-            args = [next(i) for i in iterables]
-            yield _special_range(*args)
-        except StopIteration:
-            return
-
-
-def _special_range(n):
-    return range(n) if n else [0]
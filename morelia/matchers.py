@@ -91,6 +91,21 @@ matches step:
 
         Then the result should be "120" on the screen
 
+Custom types used in format specification can be registered before
+verifying features:
+
+.. code-block:: python
+
+    from morelia.matchers import ParseStepMatcher
+
+    ParseStepMatcher.register_type("Number", int)
+
+    # ...
+
+        def step_the_result_should_be_on_the_screen(self, number):
+            r'the result should be "{number:Number}" on the screen'
+            self.assertEqual(number, self.result)
+
 Method names
 ^^^^^^^^^^^^
 
@@ -117,6 +132,11 @@ You can override it in your pyproject.toml file. E.g.:
     [tool.morelia.default]
     matchers=["regex", "parse"]
 
+Resolved steps are cached per suite class, so steps repeated in
+Scenario Outlines and Backgrounds are matched only once.
+Cache statistics are available in ``morelia.matchers.STEP_CACHE.hits``
+and ``morelia.matchers.STEP_CACHE.misses``.
+
 .. _matching-tables:
 
 Tables
@@ -286,14 +306,650 @@ Matchers Classes
 ----------------
 """
 
+import hashlib
+import inspect
+import json
+import os
 import re
+import threading
 import unicodedata
+import weakref
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
 
 import parse
 
 PAT = "(^step_|^given_|^when_|^then_)"
 
+EXTRA_ARGUMENTS = ("_text", "_labels")
+
+
+class StepRegistry:
+    """Step methods found in suite's class.
+
+    Registry is built once per suite class and shared by all its instances,
+    so step methods are not searched for and their docstrings, compiled
+    patterns and signatures are not inspected again for every step.
+    Registry holds no reference to suite instances. Methods are bound
+    by matchers to the suite being currently verified.
+    """
+
+    __registries = weakref.WeakKeyDictionary()  # type: ignore
+
+    def __init__(self, suite, step_pattern=PAT):
+        match = re.compile(step_pattern).match
+        self.step_methods = [name for name in dir(suite) if match(name)]
+        self.__docstrings = {}
+        self.__regexps = {}
+        self.__regexp_dispatchers = {}
+        self.__parse_dispatchers = {}
+        self.__method_name_tables = {}
+        self.__call_plans = {}
+
+    @classmethod
+    def for_suite(cls, suite, step_pattern=PAT):
+        """Return registry shared by all instances of suite's class.
+
+        :param suite: object with steps defined
+        :param str step_pattern: pattern for step method names
+        :returns: registry of suite's class
+        :rtype: StepRegistry
+        """
+        registries = cls.__registries.setdefault(type(suite), {})
+        try:
+            return registries[step_pattern]
+        except KeyError:
+            registry = registries[step_pattern] = cls(suite, step_pattern)
+            return registry
+
+    def get_docstring(self, suite, method_name):
+        """Return docstring of step method.
+
+        :param suite: object with steps defined
+        :param str method_name: name of step method
+        :returns: method's docstring or None
+        """
+        try:
+            return self.__docstrings[method_name]
+        except KeyError:
+            doc = getattr(suite, method_name).__doc__
+            self.__docstrings[method_name] = doc
+            return doc
+
+    def get_regexp(self, suite, method_name):
+        """Return step method's docstring compiled as regular expression.
+
+        :param suite: object with steps defined
+        :param str method_name: name of step method
+        :returns: compiled regular expression or None if no docstring
+        """
+        try:
+            return self.__regexps[method_name]
+        except KeyError:
+            doc = self.get_docstring(suite, method_name)
+            regexp = re.compile("^" + doc + "$") if doc else None
+            self.__regexps[method_name] = regexp
+            return regexp
+
+    def get_regexp_dispatcher(self, suite, step_methods):
+        """Return dispatcher matching predicates against regexp docstrings.
+
+        :param suite: object with steps defined
+        :param step_methods: names of step methods in order of matching
+        :returns: dispatcher for given step methods
+        :rtype: RegexpDispatcher
+        """
+        step_methods = tuple(step_methods)
+        try:
+            return self.__regexp_dispatchers[step_methods]
+        except KeyError:
+            entries = []
+            for method_name in step_methods:
+                doc = self.get_docstring(suite, method_name)
+                if doc:
+                    try:
+                        regexp = self.get_regexp(suite, method_name)
+                    except re.error:
+                        regexp = None
+                    entries.append((method_name, doc, regexp))
+            dispatcher = RegexpDispatcher(entries)
+            self.__regexp_dispatchers[step_methods] = dispatcher
+            return dispatcher
+
+    def get_parse_dispatcher(self, suite, step_methods, extra_types):
+        """Return dispatcher matching predicates against format-like docstrings.
+
+        :param suite: object with steps defined
+        :param step_methods: names of step methods in order of matching
+        :param dict extra_types: custom type converters
+        :returns: dispatcher for given step methods
+        :rtype: ParseDispatcher
+        """
+        step_methods = tuple(step_methods)
+        dispatcher = self.__parse_dispatchers.get(step_methods)
+        if dispatcher is None or dispatcher.extra_types is not extra_types:
+            entries = []
+            for method_name in step_methods:
+                doc = self.get_docstring(suite, method_name)
+                if doc:
+                    entries.append((method_name, doc))
+            dispatcher = ParseDispatcher(entries, extra_types)
+            self.__parse_dispatchers[step_methods] = dispatcher
+        return dispatcher
+
+    def get_method_name_table(self, step_methods):
+        """Return table matching predicates against step method names.
+
+        :param step_methods: names of step methods in order of matching
+        :returns: table for given step methods
+        :rtype: MethodNameTable
+        """
+        step_methods = tuple(step_methods)
+        try:
+            return self.__method_name_tables[step_methods]
+        except KeyError:
+            table = MethodNameTable(step_methods)
+            self.__method_name_tables[step_methods] = table
+            return table
+
+    def get_fingerprint(self, suite):
+        """Return fingerprint of step methods' names, docstrings and sources.
+
+        :param suite: object with steps defined
+        :returns: hex digest changing whenever any step method changes
+        :rtype: str
+        """
+        try:
+            return self.__fingerprint
+        except AttributeError:
+            digest = hashlib.sha1()
+            for method_name in self.step_methods:
+                method = getattr(suite, method_name)
+                try:
+                    source = inspect.getsource(method)
+                except (OSError, TypeError):
+                    source = ""
+                doc = self.get_docstring(suite, method_name) or ""
+                for part in (method_name, doc, source):
+                    digest.update(part.encode("utf-8") + b"\0")
+            self.__fingerprint = digest.hexdigest()
+            return self.__fingerprint
+
+    def get_call_plan(self, method):
+        """Return special keyword arguments accepted by step method.
+
+        :param method: step method
+        :returns: names from `EXTRA_ARGUMENTS` which method accepts
+        :rtype: tuple
+        """
+        function = getattr(method, "__func__", method)
+        try:
+            return self.__call_plans[function]
+        except KeyError:
+            spec = inspect.getfullargspec(method)
+            arglist = spec.args + spec.kwonlyargs
+            plan = tuple(name for name in EXTRA_ARGUMENTS if name in arglist)
+            self.__call_plans[function] = plan
+            return plan
+
+
+class RegexpDispatcher:
+    """Matches predicate against many regexp docstrings in single scan.
+
+    Docstrings are joined into one alternation, so regexp engine selects
+    first matching method in one call. Named groups are renamed to keep
+    them unique and captured groups are mapped back to method's own groups.
+    Docstrings which can't be safely joined (backreferences, conditionals,
+    global flags, invalid patterns) are matched on their own at their
+    place in order, so first match wins as if matched one by one.
+
+    :param list entries: (method name, docstring, compiled regexp or None) tuples
+    """
+
+    __unsafe_re = re.compile(r"\\[1-9]|\(\?\(|\(\?[aiLmsux]+\)")
+    __named_group_re = re.compile(r"(?<!\\)\(\?P([<=])(\w+)")
+
+    def __init__(self, entries):
+        self.__entries = entries
+        self.__chunks = []
+        alternatives = []
+        targets = {}
+        for method_name, doc, regexp in entries:
+            source = self.__prepare_alternative(len(targets), doc, regexp)
+            if source is None:
+                self.__add_combined(alternatives, targets)
+                alternatives, targets = [], {}
+                self.__add_single(method_name, doc, regexp)
+                continue
+            wrapper = 1 + sum(target[2] + 1 for target in targets.values())
+            named = {name: wrapper + idx for name, idx in regexp.groupindex.items()}
+            targets[wrapper] = (method_name, wrapper + 1, regexp.groups, named)
+            alternatives.append(source)
+        self.__add_combined(alternatives, targets)
+
+    def __prepare_alternative(self, number, doc, regexp):
+        if regexp is None or self.__unsafe_re.search(doc):
+            return None
+        prefix = "m{}_".format(number)
+        source = self.__named_group_re.sub(
+            lambda match: "(?P{}{}{}".format(match.group(1), prefix, match.group(2)),
+            doc,
+        )
+        try:
+            renamed = re.compile("^" + source + "$")
+        except re.error:
+            return None
+        expected = {prefix + name: idx for name, idx in regexp.groupindex.items()}
+        if renamed.groups != regexp.groups or renamed.groupindex != expected:
+            return None
+        return "(^" + source + "$)"
+
+    def __add_combined(self, alternatives, targets):
+        if alternatives:
+            regexp = re.compile("|".join(alternatives))
+            self.__chunks.append((regexp, targets, None))
+
+    def __add_single(self, method_name, doc, regexp):
+        named = dict(regexp.groupindex) if regexp is not None else {}
+        groups = regexp.groups if regexp is not None else 0
+        target = (method_name, 1, groups, named)
+        self.__chunks.append((regexp, {None: target}, doc))
+
+    def match(self, predicate):
+        """Find first method which docstring matches predicate.
+
+        :param str predicate: augmented predicate
+        :returns: (method name, args, kwargs)
+        :rtype: (str, tuple, dict)
+        :raises re.error: if reached docstring is not valid regexp
+        """
+        for regexp, targets, single_doc in self.__chunks:
+            if regexp is None:
+                re.compile("^" + single_doc + "$")  # raises re.error
+            match = regexp.match(predicate)
+            if match:
+                target = targets[match.lastindex if single_doc is None else None]
+                return self.__extract_arguments(match, *target)
+        return None, (), {}
+
+    def match_all(self, predicate):
+        """Find all methods which docstrings match predicate.
+
+        :param str predicate: augmented predicate
+        :returns: names of methods in order of matching
+        :rtype: list
+        """
+        return [
+            method_name
+            for method_name, _, regexp in self.__entries
+            if regexp is not None and regexp.match(predicate)
+        ]
+
+    def __extract_arguments(self, match, method_name, first, count, named):
+        if named:
+            kwargs = {name: match.group(idx) for name, idx in named.items()}
+            return method_name, (), kwargs
+        args = tuple(match.group(idx) for idx in range(first, first + count))
+        return method_name, args, {}
+
+
+class ParseDispatcher:
+    """Matches predicate against many format-like docstrings.
+
+    Docstrings are compiled once. Literal words of every docstring are
+    kept in inverted index, so only docstrings which words all appear
+    in predicate are parsed. Docstring with most captured fields wins;
+    first one in order if more have the same number of fields.
+
+    :param list entries: (method name, docstring) tuples
+    :param dict extra_types: custom type converters
+    """
+
+    def __init__(self, entries, extra_types):
+        self.extra_types = extra_types
+        self.__parsers = []
+        self.__index = {}
+        self.__unindexed = []
+        frequency = {}
+        for method_name, doc in entries:
+            parser = parse.compile(doc, extra_types=extra_types)
+            words = self.__literal_words(doc)
+            self.__parsers.append((method_name, parser, words))
+            for word in words:
+                frequency[word] = frequency.get(word, 0) + 1
+        for position, (_, _, words) in enumerate(self.__parsers):
+            if words:
+                key = min(words, key=lambda word: (frequency[word], word))
+                self.__index.setdefault(key, []).append(position)
+            else:
+                self.__unindexed.append(position)
+
+    def __literal_words(self, doc):
+        words = set()
+        parts = parse.PARSE_RE.split(doc)
+        literal, after_field = "", False
+        for idx, part in enumerate(parts):
+            if idx % 2 == 0 or part in ("{{", "}}"):
+                literal += part[0] if idx % 2 else part
+                continue
+            words.update(self.__whole_words(literal, after_field, True))
+            literal, after_field = "", True
+        words.update(self.__whole_words(literal, after_field, False))
+        return frozenset(words)
+
+    def __whole_words(self, literal, after_field, before_field):
+        words = literal.casefold().split()
+        if words and after_field and not literal[:1].isspace():
+            words.pop(0)
+        if words and before_field and not literal[-1:].isspace():
+            words.pop()
+        return words
+
+    def __candidates(self, words):
+        positions = list(self.__unindexed)
+        for word in words:
+            positions.extend(self.__index.get(word, ()))
+        return sorted(positions)
+
+    def match(self, predicate):
+        """Find method which docstring captures most fields from predicate.
+
+        :param str predicate: augmented predicate
+        :returns: (method name, args, kwargs)
+        :rtype: (str, tuple, dict)
+        """
+        words = set(predicate.casefold().split())
+        best_count, best_match = -1, (None, (), {})
+        for position in self.__candidates(words):
+            method_name, parser, doc_words = self.__parsers[position]
+            if not doc_words <= words:
+                continue
+            result = parser.parse(predicate)
+            if result is None:
+                continue
+            count = len(result.fixed) + len(result.named)
+            if count > best_count:
+                best_count = count
+                best_match = (method_name, tuple(result.fixed), result.named)
+        return best_match
+
+    def match_all(self, predicate):
+        """Find all methods which docstrings parse predicate.
+
+        :param str predicate: augmented predicate
+        :returns: names of methods in order of matching
+        :rtype: list
+        """
+        words = set(predicate.casefold().split())
+        return [
+            self.__parsers[position][0]
+            for position in self.__candidates(words)
+            if self.__parsers[position][2] <= words
+            and self.__parsers[position][1].parse(predicate) is not None
+        ]
+
+
+class MethodNameTable:
+    """Matches predicate against step method names by hash lookup.
+
+    Every non-word character of predicate matches optional underscore
+    in method name (after "step_", "given_", "when_" or "then_" prefix).
+    Names are indexed by slug with underscores removed, so lookup is
+    a dictionary access followed by check of underscores positions.
+
+    :param step_methods: names of step methods in order of matching
+    """
+
+    __prefix_re = re.compile(PAT)
+    __token_re = re.compile(r"([^\W_]+)|(_)|(\W)")
+
+    def __init__(self, step_methods):
+        self.__table = {}
+        for method_name in step_methods:
+            prefix = self.__prefix_re.match(method_name)
+            if prefix:
+                start = prefix.end()
+                name = method_name[start:]
+                slug = name.replace("_", "")
+                underscores = self.__count_underscores(name)
+                self.__table.setdefault(slug, []).append((method_name, underscores))
+
+    def __count_underscores(self, name):
+        underscores = {}
+        position = 0
+        for part in name.split("_")[:-1]:
+            position += len(part)
+            underscores[position] = underscores.get(position, 0) + 1
+        return underscores
+
+    def __slugify(self, predicate):
+        slug = []
+        position = 0
+        allowed = {}
+        for word, underscore, other in self.__token_re.findall(predicate):
+            if word:
+                slug.append(word)
+                position += len(word)
+                continue
+            minimum, maximum = allowed.get(position, (0, 0))
+            allowed[position] = (minimum + bool(underscore), maximum + 1)
+        return "".join(slug), allowed
+
+    def match(self, predicate):
+        """Find first method which name matches predicate.
+
+        :param str predicate: step predicate
+        :returns: method name or None
+        """
+        return next(iter(self.match_all(predicate)), None)
+
+    def match_all(self, predicate):
+        """Find all methods which names match predicate.
+
+        :param str predicate: step predicate
+        :returns: names of methods in order of matching
+        :rtype: list
+        """
+        slug, allowed = self.__slugify(predicate)
+        return [
+            method_name
+            for method_name, underscores in self.__table.get(slug, ())
+            if all(pos in allowed for pos in underscores)
+            and all(
+                minimum <= underscores.get(pos, 0) <= maximum
+                for pos, (minimum, maximum) in allowed.items()
+            )
+        ]
+
+
+class StepCache:
+    """Least recently used cache of steps resolved by matchers chain.
+
+    Entries are (method name, args, kwargs) tuples, so they can be bound
+    to any instance of suite class.
+
+    :param int maxsize: maximum number of cached entries
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()  # type: OrderedDict
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        """Return cached entry.
+
+        :param key: cache key
+        :returns: (method name, args, kwargs) or None if not cached
+        """
+        with self.__lock:
+            try:
+                entry = self.__entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        """Store entry in cache discarding least recently used ones.
+
+        :param key: cache key
+        :param tuple entry: (method name, args, kwargs)
+        """
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+STEP_CACHE = StepCache()
+
+
+class PersistentStepCache:
+    """Steps resolved by matchers chain stored on disk between runs.
+
+    Entries of every suite class are stored in separate JSON file named
+    after fingerprint of class' step methods, so they are invalidated
+    whenever any step method's name, docstring or source changes.
+    Steps with arguments other than strings, numbers or booleans
+    are not stored.
+
+    :param str directory: directory with cache files
+    """
+
+    __instances = {}  # type: dict
+
+    def __init__(self, directory):
+        self.__directory = Path(directory)
+        self.__files = {}
+
+    @classmethod
+    def for_directory(cls, directory):
+        """Return cache shared by all verifications using given directory.
+
+        :param str directory: directory with cache files
+        :rtype: PersistentStepCache
+        """
+        directory = str(directory)
+        try:
+            return cls.__instances[directory]
+        except KeyError:
+            cache = cls.__instances[directory] = cls(directory)
+            return cache
+
+    def get(self, suite, key):
+        """Return stored entry.
+
+        :param suite: object with steps defined
+        :param tuple key: key used by :py:class:`StepCache`
+        :returns: (method name, args, kwargs) or None if not stored
+        """
+        entries = self.__get_file(suite)["entries"]
+        try:
+            method_name, args, kwargs, pattern = entries[self.__make_key(key)]
+        except (KeyError, TypeError):
+            return None
+        registry = StepRegistry.for_suite(suite)
+        if method_name is not None:
+            if registry.get_docstring(suite, method_name) != pattern:
+                return None
+        return method_name, tuple(args), kwargs
+
+    def put(self, suite, key, entry):
+        """Store entry.
+
+        :param suite: object with steps defined
+        :param tuple key: key used by :py:class:`StepCache`
+        :param tuple entry: (method name, args, kwargs)
+        """
+        method_name, args, kwargs = entry
+        values = list(args) + list(kwargs.values())
+        persistent_key = self.__make_key(key)
+        if persistent_key is None or not all(map(_is_persistable, values)):
+            return
+        pattern = None
+        if method_name is not None:
+            pattern = StepRegistry.for_suite(suite).get_docstring(suite, method_name)
+        cache_file = self.__get_file(suite)
+        cache_file["entries"][persistent_key] = [method_name, args, kwargs, pattern]
+        cache_file["dirty"] = True
+
+    def save(self):
+        """Write changed entries to disk removing outdated files."""
+        for cache_file in self.__files.values():
+            if not cache_file["dirty"]:
+                continue
+            path = cache_file["path"]
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for outdated in path.parent.glob(cache_file["prefix"] + "-*.json"):
+                if outdated != path:
+                    try:
+                        outdated.unlink()
+                    except FileNotFoundError:  # removed by other worker
+                        pass
+            temporary = path.with_suffix(".%d.tmp" % os.getpid())
+            temporary.write_text(json.dumps(cache_file["entries"]))
+            os.replace(str(temporary), str(path))
+            cache_file["dirty"] = False
+
+    def __get_file(self, suite):
+        suite_class = type(suite)
+        try:
+            return self.__files[suite_class]
+        except KeyError:
+            pass
+        name = "{}.{}".format(suite_class.__module__, suite_class.__qualname__)
+        prefix = re.sub(r"[^\w.]", "_", name)
+        fingerprint = hashlib.sha1(
+            StepRegistry.for_suite(suite).get_fingerprint(suite).encode("utf-8")
+        )
+        for type_name, converter in sorted(ParseStepMatcher._types.items()):
+            converter_name = getattr(converter, "__qualname__", repr(converter))
+            fingerprint.update("{}={}".format(type_name, converter_name).encode())
+        path = self.__directory / "{}-{}.json".format(prefix, fingerprint.hexdigest())
+        try:
+            entries = json.loads(path.read_text())
+        except (OSError, ValueError):
+            entries = {}
+        cache_file = {
+            "path": path,
+            "prefix": prefix,
+            "entries": entries,
+            "dirty": False,
+        }
+        self.__files[suite_class] = cache_file
+        return cache_file
+
+    def __make_key(self, key):
+        _, chain_key, predicate, augmented_predicate = key
+        if not isinstance(predicate, str) or not isinstance(augmented_predicate, str):
+            return None
+        chain = " ".join(
+            "{}.{}:{}".format(cls.__module__, cls.__qualname__, pattern)
+            for cls, pattern in chain_key
+        )
+        return "\n".join([chain, predicate, augmented_predicate])
+
+
+def _is_persistable(value):
+    return value is None or isinstance(value, (str, int, float, bool))
+
 
 class IStepMatcher:
     """Matches methods to steps.
@@ -303,14 +959,21 @@ class IStepMatcher:
 
     __metaclass__ = ABCMeta
 
+    _cache = STEP_CACHE
+
     def __init__(self, suite, step_pattern=PAT):
         self._suite = suite
-        self._matcher = re.compile(step_pattern)
+        self._step_pattern = step_pattern
         self._next = None
+        self.__chain_key = None
+        self.__persistent_cache = None
+
+    @property
+    def _registry(self):
+        return StepRegistry.for_suite(self._suite, self._step_pattern)
 
     def _get_all_step_methods(self):
-        match = self._matcher.match
-        return [method_name for method_name in dir(self._suite) if match(method_name)]
+        return self._registry.step_methods
 
     def add_matcher(self, matcher):
         """Add new matcher at end of CoR.
@@ -322,11 +985,31 @@ class IStepMatcher:
             self._next = matcher
         else:
             self._next.add_matcher(matcher)
+        self.__chain_key = None
         return self
 
+    def set_persistent_cache(self, cache):
+        """Use cache stored on disk for steps not found in memory.
+
+        :param PersistentStepCache cache: cache to use
+        :returns: self
+        """
+        self.__persistent_cache = cache
+        return self
+
+    def _get_chain_key(self):
+        if self.__chain_key is None:
+            chain = []
+            matcher = self
+            while matcher is not None:
+                chain.append((type(matcher), matcher._step_pattern))
+                matcher = matcher._next
+            self.__chain_key = tuple(chain)
+        return self.__chain_key
+
     def find(self, predicate, augmented_predicate, step_methods=None):
         if step_methods is None:
-            step_methods = self._get_all_step_methods()
+            return self.__find_cached(predicate, augmented_predicate)
         method, args, kwargs = self.match(predicate, augmented_predicate, step_methods)
         if method:
             return method, args, kwargs
@@ -334,6 +1017,71 @@ class IStepMatcher:
             return self._next.find(predicate, augmented_predicate, step_methods)
         return None, (), {}
 
+    def find_all(self, predicate, augmented_predicate):
+        """Find names of all methods matching step in whole CoR.
+
+        Step is run with method found by :py:meth:`find`, so more names
+        mean that step is ambiguous.
+
+        :param str predicate: step predicate
+        :param str augmented_predicate: step augmented_predicate
+        :returns: distinct names of methods in order of matching
+        :rtype: list
+        """
+        step_methods = self._get_all_step_methods()
+        names = {}  # type: dict
+        matcher = self
+        while matcher is not None:
+            for method_name in matcher.match_all(
+                predicate, augmented_predicate, step_methods
+            ):
+                names[method_name] = True
+            matcher = matcher._next
+        return list(names)
+
+    def match_all(self, predicate, augmented_predicate, step_methods):
+        """Match all methods from suite to given predicate.
+
+        :param str predicate: step predicate
+        :param str augmented_predicate: step augmented_predicate
+        :param list step_methods: list of all step methods from suite
+        :returns: names of matching methods
+        :rtype: list
+        """
+        method, _, _ = self.match(predicate, augmented_predicate, step_methods)
+        return [method.__name__] if method else []
+
+    def __find_cached(self, predicate, augmented_predicate):
+        key = (
+            type(self._suite),
+            self._get_chain_key(),
+            predicate,
+            augmented_predicate,
+        )
+        persistent_cache = self.__persistent_cache
+        entry = self._cache.get(key)
+        if entry is None and persistent_cache is not None:
+            entry = persistent_cache.get(self._suite, key)
+            if entry is not None:
+                self._cache.put(key, entry)
+        if entry is not None:
+            method_name, args, kwargs = entry
+            if method_name is None:
+                return None, (), {}
+            return getattr(self._suite, method_name), args, dict(kwargs)
+        step_methods = self._get_all_step_methods()
+        method, args, kwargs = self.find(predicate, augmented_predicate, step_methods)
+        method_name = getattr(method, "__name__", None)
+        if method is None:
+            entry = (None, (), {})
+        elif method_name and getattr(self._suite, method_name, None) == method:
+            entry = (method_name, args, dict(kwargs))
+        if entry is not None:
+            self._cache.put(key, entry)
+            if persistent_cache is not None:
+                persistent_cache.put(self._suite, key, entry)
+        return method, args, kwargs
+
     @abstractmethod
     def match(self, predicate, augmented_predicate, step_methods):
         """Match method from suite to given predicate.
@@ -445,26 +1193,16 @@ class MethodNameStepMatcher(IStepMatcher):
 
     def match(self, predicate, augmented_predicate, step_methods):
         """See :py:meth:`IStepMatcher.match`."""
-        matches = self.__find_matching_methods(step_methods, predicate)
-        return self.__select_best_match(matches)
-
-    def __find_matching_methods(self, step_methods, predicate):
-        clean = re.sub(r"[^\w]", "_?", predicate)
-        pattern = PAT + clean + "$"
-        regexp = re.compile(pattern)
-        for method_name in step_methods:
-            if regexp.match(method_name):
-                method = self._suite.__getattribute__(method_name)
-                yield (method, (), {})
-
-    def __select_best_match(self, matches):
-        try:
-            best_match = next(iter(matches))
-        except StopIteration:
+        table = self._registry.get_method_name_table(step_methods)
+        method_name = table.match(predicate)
+        if method_name is None:
             return None, (), {}
-        else:
-            method, args, kwargs = best_match
-            return method, args, kwargs
+        return self._suite.__getattribute__(method_name), (), {}
+
+    def match_all(self, predicate, augmented_predicate, step_methods):
+        """See :py:meth:`IStepMatcher.match_all`."""
+        table = self._registry.get_method_name_table(step_methods)
+        return table.match_all(predicate)
 
     def suggest(self, predicate, prefix="step"):
         """See :py:meth:`IStepMatcher.suggest`."""
@@ -489,72 +1227,49 @@ class RegexpStepMatcher(IStepMatcher):
 
     def match(self, predicate, augmented_predicate, step_methods):
         """See :py:meth:`IStepMatcher.match`."""
-        matches = self.__find_matching_methods(step_methods, augmented_predicate)
-        return self.__select_best_match(matches)
-
-    def __find_matching_methods(self, step_methods, augmented_predicate):
-        for method, doc in self.__find_methods_with_docstring(step_methods):
-            doc = re.compile("^" + doc + "$")
-            match = doc.match(augmented_predicate)
-            if match:
-                kwargs = match.groupdict()
-                if not kwargs:
-                    args = match.groups()
-                else:
-                    args = ()
-                yield (method, args, kwargs)
-
-        return None, (), {}
-
-    def __find_methods_with_docstring(self, step_methods):
-        for method_name in step_methods:
-            method = self._suite.__getattribute__(method_name)
-            doc = method.__doc__
-            if doc:
-                yield method, doc
-
-    def __select_best_match(self, matches):
-        try:
-            best_match = next(iter(matches))
-        except StopIteration:
+        dispatcher = self._registry.get_regexp_dispatcher(self._suite, step_methods)
+        method_name, args, kwargs = dispatcher.match(augmented_predicate)
+        if method_name is None:
             return None, (), {}
-        else:
-            method, args, kwargs = best_match
-            return method, args, kwargs
+        return self._suite.__getattribute__(method_name), args, kwargs
+
+    def match_all(self, predicate, augmented_predicate, step_methods):
+        """See :py:meth:`IStepMatcher.match_all`."""
+        dispatcher = self._registry.get_regexp_dispatcher(self._suite, step_methods)
+        return dispatcher.match_all(augmented_predicate)
 
 
 class ParseStepMatcher(IStepMatcher):
     """Matcher that matches steps by format-like string in docstring."""
 
-    def match(self, predicate, augmented_predicate, step_methods):
-        """See :py:meth:`IStepMatcher.match`."""
-        matches = self.__find_matching_methods(step_methods, augmented_predicate)
-        return self.__select_best_match(matches)
+    _types = {}  # type: dict
 
-    def __find_matching_methods(self, step_methods, augmented_predicate):
-        for method, doc in self.__find_methods_with_docstring(step_methods):
-            match = parse.parse(doc, augmented_predicate)
-            if match:
-                args = match.fixed
-                kwargs = match.named
-                yield (len(args) + len(kwargs), method, tuple(args), kwargs)
+    @classmethod
+    def register_type(cls, name, converter):
+        """Register custom type converter used in format-like docstrings.
 
-    def __find_methods_with_docstring(self, step_methods):
-        for method_name in step_methods:
-            method = self._suite.__getattribute__(method_name)
-            doc = method.__doc__
-            if doc:
-                yield method, doc
+        :param str name: type name used in format specification
+        :param callable converter: function converting matched text
+        """
+        cls._types = dict(cls._types, **{name: converter})
+        cls._cache.clear()
 
-    def __select_best_match(self, matches):
-        matches = sorted(matches, reverse=True)
-        try:
-            best_match = next(iter(matches))
-        except StopIteration:
+    def match(self, predicate, augmented_predicate, step_methods):
+        """See :py:meth:`IStepMatcher.match`."""
+        dispatcher = self._registry.get_parse_dispatcher(
+            self._suite, step_methods, self._types
+        )
+        method_name, args, kwargs = dispatcher.match(augmented_predicate)
+        if method_name is None:
             return None, (), {}
-        else:
-            _, method, args, kwargs = best_match
-            return method, args, kwargs
+        return self._suite.__getattribute__(method_name), args, kwargs
+
+    def match_all(self, predicate, augmented_predicate, step_methods):
+        """See :py:meth:`IStepMatcher.match_all`."""
+        dispatcher = self._registry.get_parse_dispatcher(
+            self._suite, step_methods, self._types
+        )
+        return dispatcher.match_all(augmented_predicate)
 
     def replace_placeholders(self, predicate, arguments):
         arguments = iter(arguments)
@@ -0,0 +1,627 @@
+"""
+Parallel execution
+------------------
+
+Scenarios of a feature (and every row of Scenario Outlines) can be run
+in separate processes:
+
+.. code-block:: python
+
+    verify(filename, self, workers=4)
+
+or with configuration:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    workers=4
+
+Every worker process creates its own suite instance, runs "setUpFeature"
+before its first scenario and "tearDownFeature" after its last one.
+By default suite is created by calling suite's class (with test method name
+for :py:class:`unittest.TestCase`, whose "setUp" and "tearDown" are run
+around worker's scenarios). Other factory can be given with
+"suite_factory" parameter. It has to be picklable (e.g. module level function)
+on platforms where worker processes are not forked.
+
+Scenarios waiting mostly for I/O can be run in threads instead:
+
+.. code-block:: python
+
+    verify(filename, self, workers=4, executor="thread")
+
+Then "setUpFeature" and "tearDownFeature" are run once on given suite
+and every scenario is run on its own deep copy of it (or on suite created
+by "suite_factory" if given), so even lists or dictionaries set up by
+"setUpFeature" aren't shared between scenarios.
+
+When many scenarios (or rows of Scenario Outline) begin with the same
+expensive steps they can be run once on systems supporting
+:py:func:`os.fork`:
+
+.. code-block:: python
+
+    verify(filename, self, executor="fork")
+
+Steps shared by scenarios (after interpolation) are run once and process
+is forked when scenarios diverge, so every branch continues from state
+left by shared steps. "setUpScenario" is run once before first step
+and "tearDownScenario" in every branch after its last step.
+
+All scenarios are run even if some of them fail (regardless of "fail_fast"
+or "max_failures" configuration options). Results are reported
+in the same order as they would be when run serially and first failure
+is raised with report of all failures.
+"""
+
+import copy
+import functools
+import os
+import pickle
+import sys
+import traceback
+import unittest
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from morelia.breadcrumbs import Breadcrumbs
+from morelia.exceptions import MoreliaError
+from morelia.fixtures import SESSION
+from morelia.grammar import Scenario, Step
+from morelia.visitors import ExecutionPlan, TestVisitor, VisitorObserver
+
+
+def get_suite_factory(suite):
+    """Return callable creating new instances of suite."""
+    if isinstance(suite, unittest.TestCase):
+        return TestCaseFactory(type(suite), suite._testMethodName)
+    return type(suite)
+
+
+class TestCaseFactory:
+    """Create test cases in workers set up the same way as by unittest.
+
+    :param test_case_class: class of test case
+    :param str method_name: name of test method running scenarios
+    """
+
+    def __init__(self, test_case_class, method_name):
+        self.test_case_class = test_case_class
+        self.method_name = method_name
+
+    def __call__(self):
+        suite = self.test_case_class(self.method_name)
+        suite.setUp()
+        return suite
+
+    def tear_down(self, suite):
+        """Run "tearDown" and cleanups of test case created by factory."""
+        try:
+            suite.tearDown()
+        finally:
+            suite.doCleanups()
+
+
+def copy_suite(suite):
+    """Return copy of suite with deep copies of its attributes.
+
+    Internal attributes of :py:class:`unittest.TestCase` (e.g. its outcome)
+    and attributes which can't be copied (e.g. locks) are shared with
+    original suite. Suites holding resources like event loops or
+    connections should be created by "suite_factory" instead.
+    """
+    clone = copy.copy(suite)
+    memo = {id(suite): clone}
+    shared = TEST_CASE_ATTRIBUTES if isinstance(suite, unittest.TestCase) else ()
+    for name, value in vars(suite).items():
+        if name in shared:
+            continue
+        try:
+            vars(clone)[name] = copy.deepcopy(value, memo)
+        except Exception:
+            pass
+    return clone
+
+
+def _get_test_case_attributes():
+    names = set(vars(unittest.TestCase()))
+    async_case = getattr(unittest, "IsolatedAsyncioTestCase", None)
+    if async_case is not None:
+        names.update(vars(async_case()))
+    return frozenset(names)
+
+
+TEST_CASE_ATTRIBUTES = _get_test_case_attributes()
+
+
+def get_scenario_instances(feature, scenario_re):
+    """Return (scenario position, row indices) of every scenario to run.
+
+    :param Feature feature: feature with scenarios
+    :param scenario_re: compiled pattern selecting scenarios
+    """
+    instances = []
+    for position, node in enumerate(feature.steps):
+        if isinstance(node, Scenario) and scenario_re.match(node.predicate):
+            node.prepare()
+            for row_indices in node.permute_schedule():
+                instances.append((position, tuple(row_indices)))
+    return instances
+
+
+class ProcessRunner:
+    """Run scenario instances of feature in process pool.
+
+    :param int workers: number of worker processes
+    :param suite_factory: callable returning new suite instance
+    :param list matcher_classes: classes of matchers chain
+    :param create_matchers: callable creating matchers chain
+        from suite and matcher classes
+    """
+
+    def __init__(self, workers, suite_factory, matcher_classes, create_matchers):
+        self.__workers = workers
+        self.__suite_factory = suite_factory
+        self.__matcher_classes = matcher_classes
+        self.__create_matchers = create_matchers
+
+    def run(self, feature, visitor, scenario_re):
+        """Run scenarios and replay their events on visitor's observers.
+
+        :param Feature feature: feature to run
+        :param TestVisitor visitor: visitor with registered observers
+        :param scenario_re: compiled pattern selecting scenarios
+        :raises: first failure in scenarios order
+        """
+        instances = get_scenario_instances(feature, scenario_re)
+        workers = max(1, min(self.__workers, len(instances)))
+        chunks = [list(enumerate(instances))[idx::workers] for idx in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    run_instances,
+                    feature,
+                    self.__suite_factory,
+                    self.__matcher_classes,
+                    self.__create_matchers,
+                    scenario_re,
+                    chunk,
+                )
+                for chunk in chunks
+            ]
+            results = [result for future in futures for result in future.result()]
+        results.sort(key=lambda result: result[0])
+        replay_results(feature, instances, results, visitor)
+
+
+class ThreadRunner:
+    """Run scenario instances of feature in thread pool.
+
+    Every scenario instance is run on its own copy of suite made after
+    "setUpFeature" (see :py:func:`copy_suite`), so scenarios don't share
+    state set by steps.
+
+    :param int workers: number of threads
+    :param suite: suite running "setUpFeature" and "tearDownFeature"
+    :param suite_factory: callable returning new suite instance
+        (copy of suite is used when not given)
+    :param list matcher_classes: classes of matchers chain
+    :param create_matchers: callable creating matchers chain
+        from suite and matcher classes
+    """
+
+    def __init__(self, workers, suite, suite_factory, matcher_classes, create_matchers):
+        self.__workers = workers
+        self.__suite = suite
+        self.__suite_factory = suite_factory
+        self.__matcher_classes = matcher_classes
+        self.__create_matchers = create_matchers
+
+    def run(self, feature, visitor, scenario_re):
+        """Run scenarios and replay their events on visitor's observers.
+
+        :param Feature feature: feature to run
+        :param TestVisitor visitor: visitor with registered observers
+        :param scenario_re: compiled pattern selecting scenarios
+        :raises: first failure in scenarios order
+        """
+        instances = get_scenario_instances(feature, scenario_re)
+        visitor.setUpFeature()
+        try:
+            with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+                results = list(
+                    executor.map(
+                        functools.partial(
+                            self.__run_instance,
+                            feature,
+                            scenario_re,
+                            visitor.fixtures,
+                        ),
+                        enumerate(instances),
+                    )
+                )
+        finally:
+            try:
+                visitor.tearDownFeature()
+            finally:
+                visitor.close_fixtures()
+        replay_results(feature, instances, results, visitor)
+
+    def __run_instance(self, feature, scenario_re, fixtures, item):
+        number, (position, row_indices) = item
+        if self.__suite_factory is None:
+            suite = copy_suite(self.__suite)
+        else:
+            suite = self.__suite_factory()
+        matcher = self.__create_matchers(suite, self.__matcher_classes)
+        visitor = TestVisitor(suite, matcher, scenario_re, fixtures=fixtures)
+        scenario = feature.steps[position].get_instance(row_indices)
+        try:
+            events, failure = run_scenario(visitor, scenario)
+        finally:
+            visitor.close()
+        return number, events, failure
+
+
+class ForkRunner:
+    """Run scenario instances sharing leading steps with forked processes.
+
+    Scenario instances are arranged in prefix tree of their interpolated
+    steps. Every shared prefix is run once and process is forked where
+    instances diverge, so each fork continues from state left by prefix.
+    Results are sent to parent process over pipes. Requires :py:func:`os.fork`.
+
+    :param suite: suite running steps
+    :param list matcher_classes: classes of matchers chain
+    :param create_matchers: callable creating matchers chain
+        from suite and matcher classes
+    """
+
+    def __init__(self, suite, matcher_classes, create_matchers):
+        self.__suite = suite
+        self.__matcher_classes = matcher_classes
+        self.__create_matchers = create_matchers
+
+    def run(self, feature, visitor, scenario_re):
+        """Run scenarios and replay their events on visitor's observers.
+
+        :param Feature feature: feature to run
+        :param TestVisitor visitor: visitor with registered observers
+        :param scenario_re: compiled pattern selecting scenarios
+        :raises: first failure in scenarios order
+        """
+        instances = get_scenario_instances(feature, scenario_re)
+        group = [
+            (number, feature.steps[position].get_instance(row_indices))
+            for number, (position, row_indices) in enumerate(instances)
+        ]
+        matcher = self.__create_matchers(self.__suite, self.__matcher_classes)
+        self.__visitor = TestVisitor(
+            self.__suite, matcher, scenario_re, fixtures=visitor.fixtures
+        )
+        self.__recorder = EventRecorder()
+        self.__visitor.register(self.__recorder)
+        visitor.setUpFeature()
+        try:
+            results = self.__fork(group, -1) if group else []
+        finally:
+            try:
+                visitor.tearDownFeature()
+            finally:
+                try:
+                    visitor.close_fixtures()
+                finally:
+                    self.__visitor.close()
+        results.sort(key=lambda result: result[0])
+        replay_results(feature, instances, results, visitor)
+
+    def __fork(self, group, depth):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: nocover
+            try:
+                os.close(read_fd)
+                try:
+                    payload = pickle.dumps(self.__run_group(group, depth))
+                except (SystemExit, Exception) as exc:
+                    payload = pickle.dumps(_picklable(exc))
+                with os.fdopen(write_fd, "wb") as pipe:
+                    pipe.write(payload)
+                self.__visitor.fixtures.close()
+                self.__visitor.close()
+                SESSION.close()
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as pipe:
+            payload = pipe.read()
+        os.waitpid(pid, 0)
+        if not payload:
+            raise MoreliaError("Forked process exited without sending results")
+        results = pickle.loads(payload)
+        if isinstance(results, BaseException):
+            raise results
+        return results
+
+    def __run_group(self, group, depth):
+        while True:
+            branches = _split_group(group, depth)
+            if len(branches) > 1:
+                return [
+                    result
+                    for members in branches
+                    for result in self.__fork(members, depth)
+                ]
+            _, scenario = group[0]
+            self.__recorder.rebase(scenario)
+            failure = self.__run_node(scenario, depth)
+            if failure is not None or depth == len(scenario.steps):
+                return self.__get_results(group, depth, failure)
+            depth += 1
+
+    def __run_node(self, scenario, depth):
+        """Run scenario's node at depth and return failure (or None)."""
+        visitor = self.__visitor
+        try:
+            if depth < 0:
+                visitor.start_scenario(scenario)
+            elif depth < len(scenario.steps):
+                scenario.steps[depth].accept(visitor)
+            else:
+                visitor.finish_scenario(scenario)
+            return None
+        except (SystemExit, Exception) as exc:
+            failure = (exc, format_exception(exc))
+        if 0 <= depth < len(scenario.steps):
+            try:
+                visitor.finish_scenario(scenario)
+            except (SystemExit, Exception) as exc:
+                failure = (exc, format_exception(exc))
+        return failure
+
+    def __get_results(self, group, depth, failure):
+        events = self.__recorder.pop_events()
+        results = []
+        for number, scenario in group:
+            if failure is None:
+                results.append((number, events, None))
+                continue
+            exc, formatted = failure
+            breadcrumbs = Breadcrumbs()
+            breadcrumbs.feature = scenario.parent
+            breadcrumbs.scenario = scenario
+            if 0 <= depth < len(scenario.steps):
+                breadcrumbs.step = scenario.steps[depth]
+            crumbs = str(breadcrumbs)
+            results.append((number, events, (_picklable(exc), crumbs, formatted)))
+        return results
+
+
+def _split_group(group, depth):
+    """Split scenarios into groups running the same node at depth."""
+    branches = OrderedDict()
+    for number, scenario in group:
+        key = _get_branch_key(scenario, depth)
+        branches.setdefault(key, []).append((number, scenario))
+    return list(branches.values())
+
+
+def _get_branch_key(scenario, depth):
+    """Return key of scenario's node run at given depth of prefix tree."""
+    if depth < 0:
+        return None
+    try:
+        node = scenario.steps[depth]
+    except IndexError:
+        return None
+    if isinstance(node, Step):
+        predicate = node.interpolated_predicate()
+    else:
+        predicate = node.predicate
+    return (
+        type(node).__name__,
+        predicate,
+        getattr(node, "payload", None),
+        tuple(node.get_labels()),
+        tuple(child.predicate for child in node.steps),
+    )
+
+
+def replay_results(feature, instances, results, visitor):
+    """Notify visitor's observers about events recorded by workers.
+
+    :raises: first failure with report of all failures
+    """
+    failures = []
+    visitor.feature_started(feature)
+    try:
+        for number, events, failure in results:
+            position, row_indices = instances[number]
+            scenario = feature.steps[position].get_instance(row_indices)
+            replay_events(visitor, scenario, events)
+            if failure is not None:
+                failures.append(failure)
+    finally:
+        visitor.feature_finished(feature)
+    if failures:
+        raise_failures(failures)
+
+
+def replay_events(visitor, scenario, events):
+    """Notify visitor's observers about events recorded for scenario."""
+    for event, path in events:
+        getattr(visitor, event)(_find_node(scenario, path))
+
+
+def raise_failures(failures):
+    """Raise first failure with report of all failures.
+
+    Failure keeps its own traceback and report is attached as its cause.
+
+    :param list failures: (exception, breadcrumbs, formatted traceback) tuples
+    """
+    exc = failures[0][0]
+    report = "\n".join(
+        "{}\n{}".format(crumbs, formatted) for _, crumbs, formatted in failures
+    )
+    raise exc from AssertionError(report)
+
+
+def run_instances(
+    feature, suite_factory, matcher_classes, create_matchers, scenario_re, chunk
+):
+    """Run scenario instances in worker and return recorded results.
+
+    Suite created by :py:class:`TestCaseFactory` is torn down when finished.
+
+    :returns: list of (instance number, events, failure) tuples
+    """
+    suite = suite_factory()
+    try:
+        return _run_chunk(
+            feature, suite, matcher_classes, create_matchers, scenario_re, chunk
+        )
+    finally:
+        tear_down = getattr(suite_factory, "tear_down", None)
+        if tear_down is not None:
+            tear_down(suite)
+
+
+def _run_chunk(feature, suite, matcher_classes, create_matchers, scenario_re, chunk):
+    matcher = create_matchers(suite, matcher_classes)
+    plan = ExecutionPlan(matcher)
+    plan.compile(feature, scenario_re)
+    visitor = TestVisitor(suite, matcher, scenario_re, plan)
+    results = []
+    visitor.setUpFeature()
+    try:
+        for number, (position, row_indices) in chunk:
+            scenario = feature.steps[position].get_instance(row_indices)
+            events, failure = run_scenario(visitor, scenario)
+            if failure is not None:
+                exc, crumbs, formatted = failure
+                failure = (_picklable(exc), crumbs, formatted)
+            results.append((number, events, failure))
+    finally:
+        try:
+            visitor.tearDownFeature()
+        finally:
+            try:
+                visitor.close_fixtures()
+            finally:
+                visitor.close()
+                SESSION.close()
+    return results
+
+
+def run_scenario(visitor, scenario):
+    """Run scenario instance recording events of visitor.
+
+    :returns: (events, failure) tuple where failure is None or
+        (exception, breadcrumbs, formatted traceback) tuple
+    """
+    recorder = EventRecorder()
+    breadcrumbs = Breadcrumbs()
+    breadcrumbs.feature = scenario.parent
+    observers = [recorder, breadcrumbs]
+    visitor.register(recorder)
+    visitor.register(breadcrumbs)
+    failure = None
+    try:
+        visitor.visit_scenario(scenario, scenario.steps)
+    except (SystemExit, Exception) as exc:
+        failure = (exc, str(breadcrumbs), format_exception(exc))
+    finally:
+        for observer in observers:
+            visitor.unregister(observer)
+    return recorder.pop_events(), failure
+
+
+def format_exception(exc):
+    """Return traceback of exception starting from step method."""
+    tb = exc.__traceback__
+    while tb and not tb.tb_frame.f_locals.get("__tracebackhide__", False):
+        tb = tb.tb_next
+    tb = tb.tb_next if tb else exc.__traceback__
+    return "".join(traceback.format_exception(type(exc), exc, tb))
+
+
+def _picklable(exc):
+    exc.__traceback__ = None
+    exc.__context__ = exc.__cause__ = None
+    try:
+        pickle.loads(pickle.dumps(exc))
+    except Exception:
+        return MoreliaError("{}: {}".format(type(exc).__name__, exc))
+    return exc
+
+
+def _find_node(scenario, path):
+    node = scenario
+    for idx in path:
+        node = node.steps[idx]
+    return node
+
+
+class EventRecorder(VisitorObserver):
+    """Record observed events with positions of nodes within scenario."""
+
+    def __init__(self):
+        self.__events = []
+        self.__stack = []
+
+    def pop_events(self):
+        events = self.__events
+        self.__events = []
+        return events
+
+    def feature_started(self, node):
+        pass
+
+    def feature_finished(self, node):
+        pass
+
+    def rebase(self, scenario):
+        """Continue recording nodes of other scenario with the same prefix."""
+        self.__stack = [(scenario, ())] + self.__stack[1:]
+
+    def scenario_started(self, node):
+        self.__stack = [(node, ())]
+        self.__events.append(("scenario_started", ()))
+
+    def scenario_finished(self, node):
+        self.__events.append(("scenario_finished", ()))
+        self.__stack = []
+
+    def step_started(self, node):
+        self.__push("step_started", node)
+
+    def step_finished(self, node):
+        self.__pop("step_finished")
+
+    def step_failed(self, node):
+        self.__events.append(("step_failed", self.__stack[-1][1]))
+
+    def step_errored(self, node):
+        self.__events.append(("step_errored", self.__stack[-1][1]))
+
+    def node_started(self, node):
+        self.__push("node_started", node)
+
+    def node_finished(self, node):
+        self.__pop("node_finished")
+
+    def __push(self, event, node):
+        parent, parent_path = self.__stack[-1]
+        idx = next(idx for idx, child in enumerate(parent.steps) if child is node)
+        path = parent_path + (idx,)
+        self.__stack.append((node, path))
+        self.__events.append((event, path))
+
+    def __pop(self, event):
+        _, path = self.__stack.pop()
+        self.__events.append((event, path))
@@ -8,17 +8,34 @@
 #                                 ,_       __|      ,
 #                        |  |_|  /  |  |  /  |  |  / \_
 #                         \/  |_/   |_/|_/\_/|_/|_/ \/
+import functools
+import glob
+import os
 import re
 import textwrap
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
+from morelia.asynchronous import AsyncTestVisitor
 from morelia.breadcrumbs import Breadcrumbs
 from morelia.config import TOMLConfig
-from morelia.exceptions import InvalidScenarioMatchingPattern
+from morelia.exceptions import FeatureSyntaxErrors, InvalidScenarioMatchingPattern
 from morelia.formatters import Writer
 from morelia.grammar import (And, Background, But, Comment, Examples, Feature,
-                             Given, Row, Scenario, Step, Then, When)
+                             Given, Predecessors, Row, Scenario, Step, Then,
+                             When)
 from morelia.i18n import TRANSLATIONS
-from morelia.visitors import MissingFinder, TestVisitor
+from morelia.parallel import (
+    ForkRunner,
+    ProcessRunner,
+    ThreadRunner,
+    format_exception,
+    get_scenario_instances,
+    get_suite_factory,
+    raise_failures,
+)
+from morelia.visitors import DryRunReport, ExecutionPlan, TestVisitor
 
 
 def execute_script(
@@ -29,45 +46,281 @@ def execute_script(
     matchers=None,
     show_all_missing=True,
     config=None,
+    workers=None,
+    suite_factory=None,
+    executor=None,
+    max_failures=None,
 ):
+    """Execute script running scenarios with steps from suite.
+
+    :param int max_failures: number of failed scenarios stopping the run;
+        0 runs all scenarios (configuration is used if None).
+        Scenarios run by workers are all run regardless of failures.
+    """
+    scenario_re = _compile_scenario_re(scenario)
+    if config is None:
+        config = TOMLConfig("default")
+    if matchers is None:
+        matchers = config.get_matchers()
+    runner = None
+    if workers is None:
+        workers = config.get_workers()
+    if executor is None:
+        executor = config.get_executor()
+    if max_failures is None:
+        max_failures = config.get_max_failures()
+    if isinstance(script_root, Feature) and (workers > 1 or executor == "fork"):
+        script_root.parse_remaining()
+        runner = __prepare_runner(executor, workers, suite, suite_factory, matchers)
+        __warn_background_once(config, "parallel runners")
+    matchers = _create_matchers_chain(suite, matchers)
+    step_cache = __prepare_step_cache(config, matchers)
+    try:
+        __execute_script(
+            script_root,
+            suite,
+            scenario_re,
+            formatter,
+            matchers,
+            show_all_missing,
+            config,
+            runner,
+            max_failures,
+        )
+    finally:
+        if step_cache is not None:
+            step_cache.save()
+
+
+async def aexecute_script(
+    script_root,
+    suite,
+    scenario=".*",
+    formatter=None,
+    matchers=None,
+    show_all_missing=True,
+    config=None,
+    concurrency=None,
+    suite_factory=None,
+    max_failures=None,
+):
+    """Execute script on running event loop awaiting coroutine steps.
+
+    With concurrency greater than 1 that many scenarios are run
+    at the same time as tasks, each on its own copy of suite
+    (or suite created by suite_factory). Otherwise run stops after
+    max_failures failed scenarios (see :py:func:`execute_script`).
+    """
+    scenario_re = _compile_scenario_re(scenario)
+    if config is None:
+        config = TOMLConfig("default")
+    if matchers is None:
+        matchers = config.get_matchers()
+    if concurrency is None:
+        concurrency = config.get_concurrency()
+    if max_failures is None:
+        max_failures = config.get_max_failures()
+    if isinstance(script_root, Feature) and concurrency > 1:
+        script_root.parse_remaining()
+    __warn_background_once(config, "asynchronous execution")
+    matcher_classes = matchers
+    matchers = _create_matchers_chain(suite, matchers)
+    step_cache = __prepare_step_cache(config, matchers)
+    try:
+        plan = __compile_plan(
+            script_root, scenario_re, matchers, show_all_missing, config
+        )
+        test_visitor = AsyncTestVisitor(
+            suite,
+            matchers,
+            scenario_re,
+            plan,
+            concurrency=concurrency,
+            suite_factory=suite_factory,
+            create_matchers=functools.partial(
+                _create_matchers_chain, matcher_classes=matcher_classes
+            ),
+        )
+        breadcrumbs = __prepare_observers(config, formatter, test_visitor)
+        failures = __prepare_failures(max_failures, breadcrumbs, test_visitor)
+        try:
+            await test_visitor.avisit(script_root)
+        except Exception as exc:
+            __raise_with_breadcrumbs(exc, breadcrumbs)
+        failures.raise_failures()
+    finally:
+        if step_cache is not None:
+            step_cache.save()
+
+
+def dry_run_script(script_root, suite, scenario=".*", matchers=None, config=None):
+    """Resolve steps of script without running any hooks or steps.
+
+    Scenario Outlines are expanded the way they would be run and every
+    step is matched against whole matchers chain.
+
+    :returns: report with number of planned scenarios, missing and ambiguous steps
+    :rtype: DryRunReport
+    :raises AssertionError: if some steps are missing or ambiguous (unless in wip mode)
+    """
+    scenario_re = _compile_scenario_re(scenario)
+    if config is None:
+        config = TOMLConfig("default")
+    if matchers is None:
+        matchers = config.get_matchers()
+    script_root.parse_remaining()
+    script_root.combinations = config.get_combinations()
+    script_root.sharding = config.get_sharding()
+    matchers = _create_matchers_chain(suite, matchers)
+    plan = ExecutionPlan(matchers, find_ambiguous=True)
+    plan.compile(script_root, scenario_re)
+    report = DryRunReport(
+        scenarios=len(get_scenario_instances(script_root, scenario_re)),
+        steps=plan.count_resolved_steps(),
+        missing=plan.get_not_matched_steps(),
+        ambiguous=plan.get_ambiguous_steps(),
+    )
+    assert config["wip"] or report.ok, str(report)
+    return report
+
+
+def _compile_scenario_re(scenario):
     try:
-        scenario_re = re.compile(scenario)
+        return re.compile(scenario)
     except re.error as e:
         raise InvalidScenarioMatchingPattern(
             'Invalid scenario matching regex "{}": {}'.format(scenario, e)
         )
-    if config is None:
-        config = TOMLConfig("default")
-    matchers = __prepare_matchers(config, matchers, suite)
+
+
+def __prepare_step_cache(config, matchers):
+    step_cache = config.get_step_cache()
+    if step_cache is not None:
+        matchers.set_persistent_cache(step_cache)
+    return step_cache
+
+
+def __execute_script(
+    script_root,
+    suite,
+    scenario_re,
+    formatter,
+    matchers,
+    show_all_missing,
+    config,
+    runner=None,
+    max_failures=1,
+):
+    plan = __compile_plan(script_root, scenario_re, matchers, show_all_missing, config)
+    test_visitor = TestVisitor(
+        suite,
+        matchers,
+        scenario_re,
+        plan,
+        background_once=config.get_background_once(),
+    )
+    breadcrumbs = __prepare_observers(config, formatter, test_visitor)
+    if runner is not None:
+        runner.run(script_root, test_visitor, scenario_re)
+        return
+    failures = __prepare_failures(max_failures, breadcrumbs, test_visitor)
+    try:
+        script_root.accept(test_visitor)
+    except Exception as exc:
+        __raise_with_breadcrumbs(exc, breadcrumbs)
+    failures.raise_failures()
+
+
+def __compile_plan(script_root, scenario_re, matchers, show_all_missing, config):
     wip = config["wip"]
+    script_root.combinations = config.get_combinations()
+    script_root.sharding = config.get_sharding()
+    plan = ExecutionPlan(matchers)
+    if not getattr(script_root, "parsed", True):
+        # steps of scenarios not parsed yet are resolved when they are run
+        return plan
+    plan.compile(script_root, scenario_re)
     if not wip and show_all_missing:
-        not_found = _find_missing_steps(script_root, matchers, scenario_re)
+        not_found = plan.get_not_matched_steps()
         message = "Cannot match steps:\n\n{}".format("".join(not_found))
         assert not_found == set(), message
-    test_visitor = TestVisitor(suite, matchers, scenario_re)
+    return plan
+
+
+def __prepare_observers(config, formatter, test_visitor):
     breadcrumbs = Breadcrumbs()
     test_visitor.register(breadcrumbs)
     __prepare_writers(config, formatter, test_visitor)
-    try:
-        script_root.accept(test_visitor)
-    except Exception as exc:
-        exc.__traceback__.tb_frame.f_locals
-        tb = exc.__traceback__.tb_next
-        while tb and not tb.tb_frame.f_locals.get("__tracebackhide__", False):
-            tb = tb.tb_next
-        if not tb:
-            del tb
-            raise
-        exc.__traceback__ = tb.tb_next
+    return breadcrumbs
+
+
+def __prepare_failures(max_failures, breadcrumbs, test_visitor):
+    failures = FailureCollector(max_failures, breadcrumbs)
+    if max_failures != 1:
+        test_visitor.on_failure = failures
+    return failures
+
+
+class FailureCollector:
+    """Failures of scenarios collected until their limit is reached.
+
+    :param int max_failures: number of failures stopping the run (0 for no limit)
+    :param Breadcrumbs breadcrumbs: breadcrumbs of visitor running scenarios
+    """
+
+    def __init__(self, max_failures, breadcrumbs):
+        self.max_failures = max_failures
+        self.failures = []
+        self.__breadcrumbs = breadcrumbs
+
+    def __call__(self, scenario, exc):
+        """Record failure of scenario.
+
+        :returns: False if limit of failures is reached
+        """
+        self.failures.append((exc, str(self.__breadcrumbs), format_exception(exc)))
+        return not self.max_failures or len(self.failures) < self.max_failures
+
+    def raise_failures(self):
+        """Raise first failure with report of all failures (if any)."""
+        if self.failures:
+            raise_failures(self.failures)
+
+
+def __raise_with_breadcrumbs(exc, breadcrumbs):
+    exc.__traceback__.tb_frame.f_locals
+    tb = exc.__traceback__.tb_next
+    while tb and not tb.tb_frame.f_locals.get("__tracebackhide__", False):
+        tb = tb.tb_next
+    if not tb:
         del tb
-        raise exc from AssertionError(breadcrumbs)
+        raise exc
+    exc.__traceback__ = tb.tb_next
+    del tb
+    raise exc from AssertionError(breadcrumbs)
+
+
+def __warn_background_once(config, ignored_by):
+    if config.get_background_once():
+        warnings.warn(
+            '"background_once" is ignored by {}, Background is run'
+            " before every scenario".format(ignored_by),
+            stacklevel=4,
+        )
 
 
-def __prepare_matchers(config, matchers, suite):
-    if matchers is None:
-        matchers = config.get_matchers()
-    matcher = _create_matchers_chain(suite, matchers)
-    return matcher
+def __prepare_runner(executor, workers, suite, suite_factory, matcher_classes):
+    if executor == "fork":
+        return ForkRunner(suite, matcher_classes, _create_matchers_chain)
+    if executor == "thread":
+        return ThreadRunner(
+            workers, suite, suite_factory, matcher_classes, _create_matchers_chain
+        )
+    if suite_factory is None:
+        suite_factory = get_suite_factory(suite)
+    return ProcessRunner(
+        workers, suite_factory, matcher_classes, _create_matchers_chain
+    )
 
 
 def _create_matchers_chain(suite, matcher_classes):
@@ -81,12 +334,6 @@ def _create_matchers_chain(suite, matcher_classes):
     return root_matcher
 
 
-def _find_missing_steps(script_root, matchers, scenario_re):
-    missing_steps_finder = MissingFinder(matchers, scenario_re)
-    script_root.accept(missing_steps_finder)
-    return missing_steps_finder.get_not_matched_steps()
-
-
 def __prepare_writers(config, formatter, test_visitor):
     writers = config.get_writers()
     if formatter is not None:
@@ -96,7 +343,14 @@ def __prepare_writers(config, formatter, test_visitor):
 
 
 class Parser:
-    def __init__(self, language=None):
+    """Parser of features.
+
+    :param str language: default language of features
+    :param FeatureCache cache: cache of parsed features
+    :param ScenarioFilter scenario_filter: filter of scenarios to parse
+    """
+
+    def __init__(self, language=None, cache=None, scenario_filter=None):
         self.__node_classes = [
             Feature,
             Background,
@@ -111,51 +365,185 @@ class Parser:
             Examples,
             Step,
         ]
-        self.nodes = []
+        self.nodes = Predecessors()
         if language is None:
             language = "en"
+        self.__default_language = language
         self.__language = language
         self.__continuation_marker_re = re.compile(r"\\\s*$")
-
-    def parse_features(self, prose):
-        self.parse_feature(str(prose))
-        feature = self.nodes[0]
-        feature.filename = getattr(prose, "filename", "<stdin>")
+        self.__cache = cache
+        self.__filter = scenario_filter
+
+    def parse_features(self, prose, lazy=False):
+        """Parse feature.
+
+        :param prose: text, source (:py:class:`morelia.File`,
+            :py:class:`morelia.Text`, :py:class:`morelia.Url`),
+            file object or other iterable of lines
+        :param bool lazy: parse only feature's header now and its scenarios
+            when they are visited, so first scenario can be run before
+            whole source is read
+        :returns: parsed feature
+        """
+        lines = _get_lines(prose, lazy)
+        language = self.__default_language
+        cached = (
+            self.__cache is not None
+            and self.__filter is None
+            and isinstance(lines, str)
+        )
+        if cached:
+            feature = self.__cache.get(lines, language)
+            if feature is not None:
+                feature.filename = getattr(prose, "filename", "<stdin>")
+                self.nodes = Predecessors(_iter_tree(feature))
+                return feature
+        if lazy:
+            # own parser keeps state of parsing until feature is visited
+            parser = Parser(language, scenario_filter=self.__filter)
+            nodes = parser.iter_nodes(lines)
+            feature = next(nodes, None)
+            self.nodes = parser.nodes
+        else:
+            self.parse_feature(lines)
+            feature = self.nodes[0] if self.nodes else None
         assert isinstance(feature, Feature), "Exactly one Feature per file"
+        feature.filename = getattr(prose, "filename", "<stdin>")
+        if lazy:
+            feature.defer_parsing(parser.__parse_rest(feature, nodes))
+        else:
+            self.__check_scenarios(feature)
+            if cached:
+                self.__cache.put(lines, language, feature)
+        return feature
+
+    def parse_many(self, paths, workers=None):
+        """Parse many feature files in worker processes.
+
+        :param paths: path, directory (searched for "*.feature" files)
+            or glob pattern or list of them
+        :param int workers: number of worker processes
+            (number of CPUs if not given, 1 parses in current process)
+        :returns: list of parsed features in order of paths
+        :raises FeatureSyntaxErrors: with syntax errors of all files
+        """
+        filenames = _expand_paths(paths)
+        results = [None] * len(filenames)
+        missing = []
+        for position, filename in enumerate(filenames):
+            text = Path(filename).read_text()
+            if self.__cache is not None:
+                results[position] = self.__cache.get(text, self.__default_language)
+            if results[position] is None:
+                missing.append((position, text, filename))
+            else:
+                results[position].filename = filename
+        parse = functools.partial(_parse_text, self.__default_language)
+        items = [(text, filename) for _, text, filename in missing]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(items) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(items) // (workers * 4))
+                parsed = list(executor.map(parse, items, chunksize=chunksize))
+        else:
+            parsed = [parse(item) for item in items]
+        for (position, text, _), result in zip(missing, parsed):
+            results[position] = result
+            if self.__cache is not None and isinstance(result, Feature):
+                self.__cache.put(text, self.__default_language, result)
+        errors = [result for result in results if isinstance(result, SyntaxError)]
+        if errors:
+            raise FeatureSyntaxErrors(errors)
+        return results
+
+    def __parse_rest(self, feature, nodes):
+        yield from nodes
+        self.__check_scenarios(feature)
+
+    def __check_scenarios(self, feature):
+        has_scenarios = any(isinstance(step, Scenario) for step in feature.steps)
         feature.enforce(
-            any(isinstance(step, Scenario) for step in feature.steps),
+            self.__scenarios_skipped or has_scenarios,
             "Feature without Scenario(s)",
         )
-        return self.nodes[0]
+        if self.__filter is not None and self.__filter.lines and not has_scenarios:
+            raise InvalidScenarioMatchingPattern(
+                'No scenario selected at line(s) {} of "{}"'.format(
+                    ", ".join(str(number) for number in self.__filter.lines),
+                    getattr(feature, "filename", "<stdin>"),
+                )
+            )
 
     def parse_feature(self, lines):
+        """Parse all nodes.
+
+        :param lines: text or iterable of lines
+        :returns: list of parsed nodes
+        """
+        for _ in self.iter_nodes(lines):
+            pass
+        return self.nodes
+
+    def iter_nodes(self, lines):
+        """Return iterator parsing nodes one by one.
+
+        Node is yielded as soon as it is created, so it can still receive
+        continuation lines, docstring and children until next one is yielded.
+        Nodes parsed before are discarded, so parser can be reused.
+
+        :param lines: text or iterable of lines
+        """
+        self.nodes = Predecessors()
+        self.__language = self.__default_language
+        self.__scenarios_skipped = False
+        self.__skipping = False
+        self.__skipped = None
+        self.__selected_line = None
         self.__line_producer = LineSource(lines)
         self.__docstring_parser = DocStringParser(self.__line_producer)
         self.__language_parser = LanguageParser(default_language=self.__language)
         self.__labels_parser = LabelParser()
+        self.__dispatcher = LineDispatcher.for_language(
+            self.__node_classes, self.__language
+        )
+        parsed = 0
         try:
             while True:
                 line = self.__line_producer.get_line()
                 if line:
                     self.__parse_line(line)
+                while parsed < len(self.nodes):
+                    yield self.nodes[parsed]
+                    parsed += 1
         except StopIteration:
             pass
-        return self.nodes
 
     def __parse_line(self, line):
-        if self.__language_parser.parse(line):
+        kind, node_class = self.__dispatcher.classify(line)
+        if self.__skipping and self.__skip_line(line, kind, node_class):
+            return
+
+        if node_class is Scenario and not self.__select_scenario(line):
+            return
+
+        if kind == "language" and self.__language_parser.parse(line):
             self.__language = self.__language_parser.language
+            self.__dispatcher = LineDispatcher.for_language(
+                self.__node_classes, self.__language
+            )
             return
 
-        if self.__labels_parser.parse(line):
+        if kind == "labels" and self.__labels_parser.parse(line):
             return
 
-        if self.__docstring_parser.parse(line):
+        if kind == "docstring" and self.__docstring_parser.parse(line):
             previous = self.nodes[-1]
             previous.payload = self.__docstring_parser.payload
             return
 
-        if self.__parse_node(line):
+        if node_class is not None:
+            self.__parse_node(line, node_class)
             return
 
         if 0 < len(self.nodes):
@@ -169,23 +557,92 @@ class Parser:
             feature_name = feature_name.replace("|", " or ")
             s.enforce(False, "feature files must start with a %s" % feature_name)
 
-    def __parse_node(self, line):
+    def __select_scenario(self, line):
+        """Decide if scenario starting at line is parsed or skipped."""
+        line_number = self.__line_producer.line_number
+        if self.__filter is None or self.__selected_line == line_number:
+            return True
+        name_start = Scenario.match(line, self.__language).end()
+        name = line[name_start:].strip()
+        labels = self.__labels_parser.peek_labels()
+        if self.nodes:
+            labels.extend(self.nodes[0].get_labels())
+        selected = self.__filter.select(name, labels, line_number)
+        if selected:
+            return True
+        self.__scenarios_skipped = True
+        self.__skipping = True
+        if selected is None:
+            # selected if one of filter's lines is found before next scenario
+            labels = self.__labels_parser.pop_labels()
+            self.__skipped = (labels, [(line_number, line)])
+        else:
+            self.__labels_parser.pop_labels()
+            self.__skipped = None
+        return False
+
+    def __skip_line(self, line, kind, node_class):
+        """Scan line of skipped scenario.
+
+        :returns: False if line ends skipped scenario
+        """
+        line_number = self.__line_producer.line_number
+        if node_class in (Feature, Background, Scenario):
+            self.__skipping = False
+            if self.__skipped is not None:
+                skipped_lines = self.__skipped[1]
+                if self.__filter.reaches(skipped_lines[0][0], line_number - 1):
+                    self.__replay_skipped([(line_number, line)])
+                    return True
+            self.__skipped = None
+            return False
+        lines = [(line_number, line)]
+        if kind == "docstring":
+            lines.extend(self.__skip_docstring(line))
+        elif kind == "labels":
+            self.__labels_parser.parse(line)
+        elif node_class is not None:
+            self.__labels_parser.pop_labels()
+        if self.__skipped is not None:
+            skipped_lines = self.__skipped[1]
+            skipped_lines.extend(lines)
+            if self.__filter.reaches(skipped_lines[0][0], line_number):
+                self.__replay_skipped([])
+        return True
+
+    def __skip_docstring(self, start_line):
+        lines = []
+        line = None
+        while line != start_line:
+            line = self.__line_producer.get_line()
+            lines.append((self.__line_producer.line_number, line))
+        return lines
+
+    def __replay_skipped(self, following_lines):
+        """Parse lines of skipped scenario again as selected one."""
+        labels, lines = self.__skipped
+        self.__skipping = False
+        self.__skipped = None
+        self.__selected_line = lines[0][0]
+        self.__labels_parser.pop_labels()
+        self.__labels_parser.push_labels(labels)
+        self.__line_producer.push_back(lines + following_lines)
+
+    def __parse_node(self, line, node_class):
         line_number = self.__line_producer.line_number
         folded_lines = self.__read_folded_lines(line)
         line = line.rstrip()
         source = line + folded_lines
-        for node_class in self.__node_classes:
-            if node_class.match(line, self.__language):
-                labels = self.__labels_parser.pop_labels()
-                node = node_class(
-                    source=source,
-                    line_number=line_number,
-                    labels=labels,
-                    predecessors=self.nodes,
-                    language=self.__language,
-                )
-                self.nodes.append(node)
-                return node
+        labels = self.__labels_parser.pop_labels()
+        node = node_class(
+            source=source,
+            line_number=line_number,
+            labels=labels,
+            predecessors=self.nodes,
+            language=self.__language,
+        )
+        self.nodes.append(node)
+        return node
 
     def __read_folded_lines(self, line):
         folded_lines = [""]
@@ -199,11 +656,110 @@ class Parser:
         previous.append_line(line)
 
 
+class ScenarioFilter:
+    """Selects scenarios materialized by parser.
+
+    Scenarios which are not selected are only scanned for their headers,
+    so their steps are never parsed.
+
+    :param str name: pattern which scenario's name has to match
+    :param lines: line numbers; scenario is selected if one of them
+        is between its header and next scenario
+    :param labels: callable accepting list of scenario's labels
+        (also inherited from feature) and returning True if it's selected
+    """
+
+    def __init__(self, name=None, lines=None, labels=None):
+        self.__name_re = None if name is None else _compile_scenario_re(name)
+        self.lines = sorted(set(lines or ()))
+        self.__labels = labels
+
+    def select(self, name, labels, line_number):
+        """Return whether scenario is selected.
+
+        :param str name: name of scenario
+        :param list labels: labels of scenario
+        :param int line_number: line number of scenario's header
+        :returns: True or False, or None if it depends on lines following header
+        """
+        if self.__name_re is not None and not self.__name_re.match(name):
+            return False
+        if self.__labels is not None and not self.__labels(labels):
+            return False
+        if not self.lines or line_number in self.lines:
+            return True
+        return None if self.reaches(line_number, self.lines[-1]) else False
+
+    def reaches(self, first, last):
+        """Return True if one of lines is between first and last (inclusive)."""
+        return any(first <= number <= last for number in self.lines)
+
+
+LANGUAGE_PATTERN = r"^# language: (\w+)"
+LABELS_PREFIX_PATTERN = r"^\s*@"
+DOCSTRING_PATTERN = r'\s*"""\s*'
+
+
+class LineDispatcher:
+    """Classifies line with single match.
+
+    Patterns of language directive, labels, docstring and all node classes
+    are joined into one alternation in order they would be tried one by one,
+    so first matching alternative selects kind of line.
+
+    :param list node_classes: node classes in order of precedence
+    :param str language: language of keywords
+    """
+
+    __dispatchers = {}  # type: ignore
+
+    def __init__(self, node_classes, language):
+        alternatives = [
+            ("language", LANGUAGE_PATTERN),
+            ("labels", LABELS_PREFIX_PATTERN),
+            ("docstring", DOCSTRING_PATTERN),
+        ]
+        self.__node_classes = {}
+        for position, node_class in enumerate(node_classes):
+            name = "node{}".format(position)
+            self.__node_classes[name] = node_class
+            alternatives.append((name, node_class._get_pattern(language)))
+        self.__match = re.compile(
+            "|".join(
+                "(?P<{}>{})".format(name, pattern) for name, pattern in alternatives
+            )
+        ).match
+
+    @classmethod
+    def for_language(cls, node_classes, language):
+        """Return dispatcher shared by parsers of the same language."""
+        key = (tuple(node_classes), language)
+        try:
+            return cls.__dispatchers[key]
+        except KeyError:
+            dispatcher = cls.__dispatchers[key] = cls(node_classes, language)
+            return dispatcher
+
+    def classify(self, line):
+        """Return kind of line and node class if it starts node.
+
+        :returns: (kind, node class) tuple where kind is "language", "labels",
+            "docstring", "node" or None if line continues previous node
+        """
+        match = self.__match(line)
+        if match is None:
+            return None, None
+        node_class = self.__node_classes.get(match.lastgroup)
+        if node_class is None:
+            return match.lastgroup, None
+        return "node", node_class
+
+
 class LabelParser:
     def __init__(self, labels_pattern=r"@\w+"):
         self._labels = []
         self._labels_re = re.compile(labels_pattern)
-        self._labels_prefix_re = re.compile(r"^\s*@")
+        self._labels_prefix_re = re.compile(LABELS_PREFIX_PATTERN)
 
     def parse(self, line):
         """Parse labels.
@@ -219,6 +775,17 @@ class LabelParser:
                 return True
         return False
 
+    def push_labels(self, labels):
+        """Return labels popped before.
+
+        :param list labels: labels returned by :py:meth:`pop_labels`
+        """
+        self._labels[:0] = ["@" + label for label in labels]
+
+    def peek_labels(self):
+        """Return labels without clearing them."""
+        return [label.strip("@") for label in self._labels]
+
     def pop_labels(self):
         """Return labels.
 
@@ -231,7 +798,7 @@ class LabelParser:
 
 
 class LanguageParser:
-    def __init__(self, lang_pattern=r"^# language: (\w+)", default_language=None):
+    def __init__(self, lang_pattern=LANGUAGE_PATTERN, default_language=None):
         if default_language is None:
             default_language = "en"
         self.__language = default_language
@@ -256,7 +823,7 @@ class LanguageParser:
 
 
 class DocStringParser:
-    def __init__(self, source, pattern=r'\s*"""\s*'):
+    def __init__(self, source, pattern=DOCSTRING_PATTERN):
         self.__source = source
         self.__docstring_re = re.compile(pattern)
         self.__payload = []
@@ -284,19 +851,101 @@ class DocStringParser:
         return textwrap.dedent("\n".join(self.__payload))
 
 
+def _expand_paths(paths):
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    filenames = []
+    for path in paths:
+        path = str(path)
+        if os.path.isdir(path):
+            names = Path(path).rglob("*.feature")
+            filenames.extend(sorted(str(name) for name in names))
+        elif any(char in path for char in "*?["):
+            filenames.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            filenames.append(path)
+    return filenames
+
+
+def _parse_text(language, item):
+    text, filename = item
+    try:
+        feature = Parser(language).parse_features(text)
+    except SyntaxError as exc:
+        return SyntaxError(exc.msg, (filename, exc.lineno, exc.offset, exc.text))
+    except AssertionError as exc:
+        return SyntaxError(str(exc), (filename, 1, 1, ""))
+    feature.filename = filename
+    return feature
+
+
+def _iter_tree(node):
+    """Return iterator over node and its descendants in order they were parsed."""
+    yield node
+    for child in node.steps:
+        yield from _iter_tree(child)
+
+
+def _get_lines(prose, lazy):
+    iter_lines = getattr(prose, "iter_lines", None)
+    if iter_lines is None:
+        return prose
+    return iter_lines() if lazy else str(prose)
+
+
 class LineSource:
+    """Non-empty lines of text or of iterable of lines read on demand.
+
+    :param text: text, file object (also binary one or :py:class:`mmap.mmap`)
+        or other iterable of lines
+    """
+
     def __init__(self, text):
-        self.__lines = iter(line for line in text.split("\n") if line)
+        if isinstance(text, str):
+            lines = text.split("\n")
+        else:
+            lines = _read_lines(text)
+        self.__lines = iter(lines)
+        self.__read = 0
         self.__line_number = 0
+        self.__pushed_back = []
 
     def get_line(self):
         """Return next line.
 
+        Line numbers count also empty lines, which are skipped.
+
         :returns: next line of text
         """
-        self.__line_number += 1
-        return next(self.__lines)
+        if self.__pushed_back:
+            self.__line_number, line = self.__pushed_back.pop()
+            return line
+        line = ""
+        while not line:
+            line = next(self.__lines)
+            self.__read += 1
+        self.__line_number = self.__read
+        return line
+
+    def push_back(self, lines):
+        """Return lines to be read again.
+
+        :param list lines: (line number, line) tuples
+        """
+        self.__pushed_back.extend(reversed(lines))
 
     @property
     def line_number(self):
         return self.__line_number
+
+
+def _read_lines(source):
+    readline = getattr(source, "readline", None)
+    if readline is None:
+        lines = iter(source)
+    else:
+        lines = iter(lambda: readline() or None, None)
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        yield line.rstrip("\r\n")
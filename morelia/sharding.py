@@ -0,0 +1,181 @@
+"""
+Sharding
+--------
+
+Scenarios can be split between many machines (e.g. CI nodes) running
+the same tests. Every machine runs only its part (shard) of scenario
+instances, so even rows of one Scenario Outline can be run on
+different machines:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    shard_index=0
+    shard_count=12
+
+Settings can also be given (or overridden) with environment variables
+"MORELIA_SHARD_INDEX" and "MORELIA_SHARD_COUNT". Shards are numbered
+from 0.
+
+Every scenario instance has stable id made of feature's file path,
+scenario's name and indices of its rows, e.g.
+"features/calculator.feature::Add two numbers[0,1]", and is assigned
+to shard by hash of that id, so all machines agree on partition without
+talking to each other.
+
+When timing file is given ("shard_timings" option or "MORELIA_SHARD_TIMINGS"
+variable) and exists, instances of every feature are balanced between
+shards by their historical durations instead. Timing file is JSON object
+mapping instance ids to durations in seconds:
+
+.. code-block:: json
+
+    {
+        "features/calculator.feature::Add two numbers[0,1]": 1.5,
+        "features/calculator.feature::Divide by zero": 0.2
+    }
+
+Instances missing in timing file are assumed to take average time
+of known ones.
+"""
+
+import hashlib
+import json
+import os
+import weakref
+from pathlib import Path
+
+from morelia.grammar import Scenario
+
+
+class Sharding:
+    """Selects scenario instances run by one shard.
+
+    :param int index: index of shard (from 0)
+    :param int count: number of shards
+    :param dict timings: durations of scenario instances by their ids
+    """
+
+    def __init__(self, index, count, timings=None):
+        if not 0 <= index < count:
+            raise ValueError(
+                "Shard index {} out of range for {} shards".format(index, count)
+            )
+        self.index = index
+        self.count = count
+        self.timings = timings
+        self.__assignments = weakref.WeakKeyDictionary()  # type: ignore
+
+    @classmethod
+    def load_timings(cls, path):
+        """Return durations read from timing file.
+
+        :param str path: path to JSON timing file
+        :returns: dictionary of durations or None if file doesn't exist
+        """
+        if not path:
+            return None
+        try:
+            return json.loads(Path(path).read_text())
+        except FileNotFoundError:
+            return None
+
+    def select(self, scenario, schedule):
+        """Return lazy iterator over row indices of instances run by shard.
+
+        :param Scenario scenario: scenario with instances
+        :param schedule: row indices of all scenario's instances
+        """
+        for row_indices in schedule:
+            if self.get_shard(scenario, row_indices) == self.index:
+                yield row_indices
+
+    def get_shard(self, scenario, row_indices):
+        """Return index of shard running scenario instance.
+
+        :param Scenario scenario: scenario with instances
+        :param row_indices: row indices of instance
+        :rtype: int
+        """
+        instance_id = get_instance_id(scenario, row_indices)
+        if self.timings is not None:
+            assignment = self.__get_assignment(scenario.parent)
+            try:
+                return assignment[instance_id]
+            except KeyError:
+                pass
+        return _hash(instance_id) % self.count
+
+    def __get_assignment(self, feature):
+        try:
+            return self.__assignments[feature]
+        except KeyError:
+            assignment = self.__assignments[feature] = self.__balance(feature)
+            return assignment
+
+    def __balance(self, feature):
+        """Assign instances of feature to shards starting from the longest."""
+        instance_ids = [
+            get_instance_id(scenario, row_indices)
+            for scenario, row_indices in _iter_instances(feature)
+        ]
+        known = [self.timings[i] for i in instance_ids if i in self.timings]
+        default = sum(known) / len(known) if known else 1.0
+        durations = {i: self.timings.get(i, default) for i in instance_ids}
+        # features starting on different shards don't pile up on first one
+        offset = _hash(get_feature_path(feature)) % self.count
+        loads = [0.0] * self.count
+        assignment = {}
+        for instance_id in sorted(durations, key=lambda i: (-durations[i], i)):
+            shard = min(
+                range(self.count),
+                key=lambda s: (loads[s], (s - offset) % self.count),
+            )
+            loads[shard] += durations[instance_id]
+            assignment[instance_id] = shard
+        return assignment
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_Sharding__assignments"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__assignments = weakref.WeakKeyDictionary()
+
+
+def get_instance_id(scenario, row_indices):
+    """Return stable id of scenario instance.
+
+    :param Scenario scenario: scenario with instances
+    :param row_indices: row indices of instance
+    :rtype: str
+    """
+    instance_id = "{}::{}".format(get_feature_path(scenario.parent), scenario.predicate)
+    if any(scenario.count_Row_dimensions()):
+        instance_id += "[{}]".format(",".join(str(idx) for idx in row_indices))
+    return instance_id
+
+
+def get_feature_path(feature):
+    """Return feature's file path relative to current directory if possible."""
+    path = getattr(feature, "filename", None) or "<stdin>"
+    if os.path.isabs(path):
+        try:
+            path = os.path.relpath(path)
+        except ValueError:
+            pass
+    return path.replace(os.sep, "/")
+
+
+def _iter_instances(feature):
+    for node in feature.steps:
+        if isinstance(node, Scenario):
+            node.prepare()
+            for row_indices in node.permute_schedule(sharded=False):
+                yield node, row_indices
+
+
+def _hash(text):
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest(), 16)
@@ -0,0 +1,157 @@
+"""
+Tag expressions
+---------------
+
+Scenarios can be selected by their labels (also inherited from feature)
+with tag expressions:
+
+.. code-block:: python
+
+    verify(filename, self, tags="@smoke and not (@slow or @wip)")
+
+or in configuration:
+
+.. code-block:: toml
+
+    [tool.morelia.default]
+    tags="@smoke and not (@slow or @wip)"
+
+Expressions are built from labels (with or without "@"), "and", "or", "not"
+and parentheses. Labels written next to each other (or separated by commas)
+must all be present and "-label" is short for "not label" ("-" inside
+label is part of its name, e.g. "my-tag"). Empty expression selects
+everything.
+
+Scenarios not selected are skipped by parser (see :py:class:`morelia.parser.ScenarioFilter`),
+so none of their hooks or steps are run. The same expressions are used by
+:py:func:`morelia.decorators.tags` reading "MORELIA_TAGS" environment variable
+(which keeps old meaning of patterns like "advanced -slow").
+"""
+
+import functools
+import re
+
+from morelia.exceptions import InvalidTagExpression
+
+TOKEN_RE = re.compile(r"\s*(?:(\()|(\))|(-)|(,)|@?(\w[\w-]*))")
+
+OPERATORS = ("and", "or", "not")
+
+
+class TagExpression:
+    """Tag expression compiled into predicate.
+
+    :param str expression: tag expression
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.__tokens = _tokenize(expression)
+        self.__position = 0
+        if self.__tokens:
+            self.__predicate = self.__parse_or()
+            if self.__position < len(self.__tokens):
+                self.__fail("unexpected {!r}".format(self.__tokens[self.__position]))
+        else:
+            self.__predicate = _always
+        del self.__tokens
+
+    def __call__(self, labels):
+        """Return True if labels match expression.
+
+        :param labels: labels of scenario or test
+        """
+        return self.__predicate(frozenset(labels))
+
+    def __repr__(self):
+        return "TagExpression({!r})".format(self.expression)
+
+    def __peek(self):
+        try:
+            return self.__tokens[self.__position]
+        except IndexError:
+            return None
+
+    def __next(self):
+        token = self.__peek()
+        if token is None:
+            self.__fail("unexpected end")
+        self.__position += 1
+        return token
+
+    def __fail(self, reason):
+        raise InvalidTagExpression(
+            'Invalid tag expression "{}": {}'.format(self.expression, reason)
+        )
+
+    def __parse_or(self):
+        operands = [self.__parse_and()]
+        while self.__peek() == "or":
+            self.__next()
+            operands.append(self.__parse_and())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda labels: any(operand(labels) for operand in operands)
+
+    def __parse_and(self):
+        operands = [self.__parse_not()]
+        while self.__peek() not in (None, "or", ")"):
+            if self.__peek() in ("and", ","):
+                self.__next()
+            operands.append(self.__parse_not())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda labels: all(operand(labels) for operand in operands)
+
+    def __parse_not(self):
+        if self.__peek() in ("not", "-"):
+            self.__next()
+            operand = self.__parse_not()
+            return lambda labels: not operand(labels)
+        return self.__parse_atom()
+
+    def __parse_atom(self):
+        token = self.__next()
+        if token == "(":
+            predicate = self.__parse_or()
+            if self.__next() != ")":
+                self.__fail("missing closing parenthesis")
+            return predicate
+        if token in OPERATORS or token in (")", ","):
+            self.__fail("unexpected {!r}".format(token))
+        label = token.lstrip("@")
+        return lambda labels: label in labels
+
+
+@functools.lru_cache(maxsize=None)
+def compile_tag_expression(expression):
+    """Return compiled tag expression.
+
+    Expressions are compiled once and reused.
+
+    :param str expression: tag expression
+    :rtype: TagExpression
+    :raises InvalidTagExpression: if expression can't be parsed
+    """
+    return TagExpression(expression)
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_RE.match(expression, position)
+        if match is None:
+            raise InvalidTagExpression(
+                'Invalid tag expression "{}": unexpected {!r}'.format(
+                    expression, expression[position:].strip()[0]
+                )
+            )
+        tokens.append(next(group for group in match.groups() if group))
+        position = match.end()
+    return tokens
+
+
+def _always(labels):
+    return True
@@ -1,9 +1,22 @@
+import asyncio
+import copy
 import inspect
+import itertools
 from abc import ABC
 from typing import Iterable, List
 
 from morelia.exceptions import MissingStepError
-from morelia.grammar import Feature, Node, Scenario, Step, Visitor
+from morelia.fixtures import FixturePool, FixtureScope, get_fixture_parameters
+from morelia.grammar import (
+    PLACEHOLDER_RE,
+    Background,
+    Feature,
+    Node,
+    Scenario,
+    Step,
+    Visitor,
+)
+from morelia.matchers import StepRegistry
 
 
 class VisitorObserver(ABC):
@@ -45,6 +58,9 @@ class ObservableVisitor:
     def register(self, observer: VisitorObserver) -> None:
         self.__observers.append(observer)
 
+    def unregister(self, observer: VisitorObserver) -> None:
+        self.__observers.remove(observer)
+
     def feature_started(self, node: Feature) -> None:
         for observer in self.__observers:
             observer.feature_started(node)
@@ -87,13 +103,39 @@ class ObservableVisitor:
 
 
 class TestVisitor(ObservableVisitor, Visitor):
-    """Visits all steps and run step methods."""
-
-    def __init__(self, suite, matcher, scenario_re):
+    """Visits all steps and run step methods.
+
+    :param FixturePool fixtures: pool of "feature" fixtures shared
+        with other visitors running scenarios of the same feature
+    :param on_failure: callable accepting failed scenario and exception
+        and returning False if no more scenarios should be run;
+        if not given first failure stops visiting
+    """
+
+    def __init__(
+        self,
+        suite,
+        matcher,
+        scenario_re,
+        plan=None,
+        background_once=False,
+        fixtures=None,
+        on_failure=None,
+    ):
         super().__init__()
         self.__prepare_setup_and_teardown(suite)
-        self.__matcher = matcher
+        self.__plan = plan if plan is not None else ExecutionPlan(matcher)
         self.__scenario_re = scenario_re
+        self.__registry = StepRegistry.for_suite(suite)
+        self.__loop = None
+        self.__suite = suite
+        self.__background_once = background_once
+        self.__background_shared = False
+        self.__background_state = None
+        self.fixtures = fixtures if fixtures is not None else FixturePool()
+        self.__fixture_scopes = []  # type: List[FixtureScope]
+        self.on_failure = on_failure
+        self.stopped = False
 
     def __prepare_setup_and_teardown(self, suite):
         self.setUpFeature = getattr(suite, "setUpFeature", self.noop)
@@ -108,27 +150,102 @@ class TestVisitor(ObservableVisitor, Visitor):
 
     def visit_feature(self, node: Feature, children: Iterable[Node] = []) -> None:
         self.feature_started(node)
-        self.setUpFeature()
+        self.__call_hook(self.setUpFeature)
         try:
             self.visit_children(children)
         finally:
-            self.tearDownFeature()
-            self.feature_finished(node)
+            try:
+                self.__call_hook(self.tearDownFeature)
+            finally:
+                try:
+                    self.close_fixtures()
+                finally:
+                    self.close()
+                    self.feature_finished(node)
+
+    def visit_background(self, node: Background) -> None:
+        self.visit(node)
+        if self.__background_once and not _has_placeholders(node):
+            self.__background_shared = True
 
     def visit_scenario(self, node: Scenario, children: Iterable[Node] = []) -> None:
-        if not self.__scenario_re.match(node.predicate):
+        if self.stopped or not self.matches_scenario(node):
             return
-        self.scenario_started(node)
-        self.setUpScenario()
         try:
+            self.__visit_scenario(node, children)
+        except Exception as exc:
+            if self.on_failure is None:
+                raise
+            self.stopped = not self.on_failure(node, exc)
+
+    def __visit_scenario(self, node: Scenario, children: Iterable[Node]) -> None:
+        if self.__background_state is not None:
+            self.__restore_background()
+        self.start_scenario(node)
+        try:
+            if self.__background_shared:
+                children = self.__share_background(node, children)
             self.visit_children(children)
         finally:
-            self.tearDownScenario()
-            self.scenario_finished(node)
+            self.finish_scenario(node)
+
+    def __share_background(self, node: Scenario, children: Iterable[Node]):
+        """Run background steps in first scenario and skip them in others."""
+        skipped = len(getattr(node, "background_steps", []))
+        children = iter(children)
+        if self.__background_state is None:
+            attributes = dict(vars(self.__suite))
+            self.visit_children(itertools.islice(children, skipped))
+            snapshot = getattr(self.__suite, "snapshot", None)
+            if snapshot is None:
+                self.__background_state = SuiteSnapshot(self.__suite, attributes)
+            else:
+                self.__background_state = snapshot()
+            return children
+        return itertools.islice(children, skipped, None)
+
+    def __restore_background(self) -> None:
+        """Restore state left by background before scenario is set up."""
+        restore = getattr(self.__suite, "restore", None)
+        if restore is None:
+            self.__background_state.restore(self.__suite)
+        else:
+            restore(self.__background_state)
+
+    def start_scenario(self, node: Scenario) -> None:
+        self.scenario_started(node)
+        self.open_fixture_scope()
+        self.__call_hook(self.setUpScenario)
+
+    def finish_scenario(self, node: Scenario) -> None:
+        try:
+            self.__call_hook(self.tearDownScenario)
+        finally:
+            try:
+                self.close_fixture_scope()
+            finally:
+                self.scenario_finished(node)
+
+    def open_fixture_scope(self) -> None:
+        """Start scope of fixtures used by scenario."""
+        self.__fixture_scopes.append(FixtureScope(self.__suite, self.fixtures))
+
+    def close_fixture_scope(self) -> None:
+        """Tear down scenario fixtures and return pooled ones."""
+        if self.__fixture_scopes:
+            self.__fixture_scopes.pop().close()
+
+    def close_fixtures(self) -> None:
+        """Tear down all fixtures, then "feature" fixtures created by visitor."""
+        try:
+            while self.__fixture_scopes:
+                self.close_fixture_scope()
+        finally:
+            self.fixtures.close()
 
     def visit_step(self, node: Step, children: Iterable[Node] = []) -> None:
         self.step_started(node)
-        self.setUpStep()
+        self.__call_hook(self.setUpStep)
         try:
             self.__execute_step(node)
             self.visit_children(children)
@@ -139,19 +256,55 @@ class TestVisitor(ObservableVisitor, Visitor):
             self.step_errored(node)
             raise
         finally:
-            self.tearDownStep()
+            self.__call_hook(self.tearDownStep)
             self.step_finished(node)
 
+    def matches_scenario(self, node: Scenario) -> bool:
+        return bool(self.__scenario_re.match(node.predicate))
+
     def __execute_step(self, node: Step) -> None:
         __tracebackhide__ = True
-        method, args, kwargs = node.find_method(self.__matcher)
-        spec = inspect.getfullargspec(method)
-        arglist = spec.args + spec.kwonlyargs
-        if "_labels" in arglist:
+        method, args, kwargs = self.prepare_step(node)
+        result = method(*args, **kwargs)
+        if inspect.isawaitable(result):
+            self.__run_until_complete(result)
+
+    def prepare_step(self, node: Step):
+        """Return method matching step with arguments to call it with.
+
+        :returns: (method, args, kwargs) tuple
+        """
+        method, args, kwargs = self.__plan.find_method(node)
+        call_plan = self.__registry.get_call_plan(method)
+        if "_labels" in call_plan:
             kwargs["_labels"] = node.get_labels()
-        if "_text" in arglist:
+        if "_text" in call_plan:
             kwargs["_text"] = node.payload
-        method(*args, **kwargs)
+        for position, name in get_fixture_parameters(method):
+            if position >= len(args) and name not in kwargs:
+                kwargs[name] = self.__get_fixture_scope().get(name)
+        return method, args, kwargs
+
+    def __get_fixture_scope(self) -> FixtureScope:
+        if not self.__fixture_scopes:
+            self.open_fixture_scope()
+        return self.__fixture_scopes[-1]
+
+    def __call_hook(self, hook) -> None:
+        result = hook()
+        if inspect.isawaitable(result):
+            self.__run_until_complete(result)
+
+    def __run_until_complete(self, awaitable):
+        if self.__loop is None:
+            self.__loop = asyncio.new_event_loop()
+        return self.__loop.run_until_complete(awaitable)
+
+    def close(self) -> None:
+        """Close event loop used to run coroutine steps and hooks."""
+        if self.__loop is not None:
+            self.__loop.close()
+            self.__loop = None
 
     def visit(self, node: Node, children: Iterable[Node] = []) -> None:
         self.node_started(node)
@@ -160,32 +313,155 @@ class TestVisitor(ObservableVisitor, Visitor):
         finally:
             self.node_finished(node)
 
-    visit_background = visit_row = visit_examples = visit_comment = visit
+    visit_row = visit_examples = visit_comment = visit
 
 
-class MissingFinder(Visitor):
-    def __init__(self, matcher, scenario_re):
-        super().__init__()
-        self.__not_matched = {}
+def _has_placeholders(node: Node) -> bool:
+    return any(PLACEHOLDER_RE.search(step.predicate) for step in node.steps)
+
+
+class SuiteSnapshot:
+    """Attributes of suite set by background.
+
+    Attributes added or rebound by background are deep copied, so every
+    scenario restoring snapshot gets its own copy of them. Other attributes
+    are restored as they were.
+
+    :param suite: suite after running background
+    :param dict attributes: suite's attributes before running background
+    """
+
+    def __init__(self, suite, attributes):
+        self.__unchanged = {}
+        changed = {}
+        for name, value in vars(suite).items():
+            if name in attributes and attributes[name] is value:
+                self.__unchanged[name] = value
+            else:
+                changed[name] = value
+        self.__changed = copy.deepcopy(changed, {id(suite): suite})
+
+    def restore(self, suite) -> None:
+        attributes = vars(suite)
+        attributes.clear()
+        attributes.update(self.__unchanged)
+        attributes.update(copy.deepcopy(self.__changed, {id(suite): suite}))
+
+
+class ExecutionPlan:
+    """Steps resolved once before execution.
+
+    Every distinct interpolated predicate is matched only once, no matter
+    how many times it's repeated in Scenario Outline permutations
+    or Backgrounds. Steps not resolved in advance are matched when executed.
+
+    :param IStepMatcher matcher: matchers chain
+    :param bool find_ambiguous: also look for steps matched by more than one method
+    """
+
+    def __init__(self, matcher, find_ambiguous=False):
         self.__matcher = matcher
-        self.__scenario_re = scenario_re
+        self.__resolved = {}
+        self.__not_matched = {}
+        self.__find_ambiguous = find_ambiguous
+        self.__ambiguous = {}
+
+    def compile(self, feature: Feature, scenario_re) -> None:
+        """Resolve steps of feature's background and matching scenarios.
+
+        :param Feature feature: feature to resolve
+        :param scenario_re: compiled pattern selecting scenarios
+        """
+        for node in feature.steps:
+            if isinstance(node, Background):
+                self.__resolve_steps(node)
+            elif isinstance(node, Scenario) and scenario_re.match(node.predicate):
+                node.prepare()
+                self.__resolve_steps(node)
+
+    def __resolve_steps(self, node: Node) -> None:
+        for step in node.get_all_steps():
+            for augmented_predicate in step.get_interpolated_predicates():
+                key = (step.predicate, augmented_predicate)
+                if key in self.__resolved:
+                    continue
+                try:
+                    self.__resolved[key] = step.find_method(
+                        self.__matcher, augmented_predicate
+                    )
+                except MissingStepError as e:
+                    self.__not_matched[e.suggest] = True
+                    continue
+                if self.__find_ambiguous:
+                    method_names = self.__matcher.find_all(
+                        step.predicate, augmented_predicate
+                    )
+                    if len(method_names) > 1:
+                        self.__ambiguous[augmented_predicate] = method_names
 
     def get_not_matched_steps(self):
         return self.__not_matched.keys()
 
-    def visit_scenario(self, node: Scenario, children: Iterable[Node] = []) -> None:
-        if not self.__scenario_re.match(node.predicate):
-            return
-        self.visit_children(children)
+    def get_ambiguous_steps(self):
+        """Return steps matched by more than one method.
 
-    def visit_step(self, node: Step, children: Iterable[Node] = []) -> None:
-        try:
-            node.find_method(self.__matcher)
-        except MissingStepError as e:
-            self.__not_matched[e.suggest] = True
+        Steps are found only by plan created with "find_ambiguous".
 
-    def visit(self, node: Node, children: Iterable[Node] = []) -> None:
-        self.visit_children(children)
+        :returns: dictionary mapping predicates to names of matching methods
+        :rtype: dict
+        """
+        return dict(self.__ambiguous)
 
-    visit_feature = visit_background = visit
-    visit_row = visit_examples = visit_comment = visit
+    def count_resolved_steps(self) -> int:
+        """Return number of distinct interpolated predicates resolved."""
+        return len(self.__resolved)
+
+    def find_method(self, step: Step):
+        """Return method resolved for step in its current row.
+
+        :param Step step: step to find method for
+        :returns: (method, args, kwargs) tuple
+        :raises MissingStepError: if method maching step not found
+        """
+        key = (step.predicate, step.interpolated_predicate())
+        try:
+            method, args, kwargs = self.__resolved[key]
+        except KeyError:
+            return step.find_method(self.__matcher)
+        return method, args, dict(kwargs)
+
+
+class DryRunReport:
+    """Result of checking feature without running it.
+
+    :param int scenarios: number of scenario instances which would be run
+    :param int steps: number of distinct steps resolved
+    :param missing: suggested definitions of steps not matched
+    :param dict ambiguous: predicates of steps matched by more than one method
+        mapped to names of these methods
+    """
+
+    def __init__(self, scenarios, steps, missing, ambiguous):
+        self.scenarios = scenarios
+        self.steps = steps
+        self.missing = list(missing)
+        self.ambiguous = ambiguous
+
+    @property
+    def ok(self) -> bool:
+        """True if all steps are matched by exactly one method."""
+        return not self.missing and not self.ambiguous
+
+    def __str__(self):
+        lines = [
+            "Dry run: {} scenario(s) planned, {} step(s) resolved".format(
+                self.scenarios, self.steps
+            )
+        ]
+        if self.missing:
+            lines.append("\nCannot match steps:\n\n{}".format("".join(self.missing)))
+        if self.ambiguous:
+            lines.append("\nAmbiguous steps:\n")
+            for predicate, method_names in self.ambiguous.items():
+                lines.append("    {}: {}".format(predicate, ", ".join(method_names)))
+        return "\n".join(lines)
@@ -0,0 +1,121 @@
+import asyncio
+import re
+from io import StringIO
+from unittest import TestCase
+
+from morelia import averify, verify
+from morelia.decorators import tags
+from morelia.formatters import PlainTextFormatter
+from morelia.parser import Parser, aexecute_script
+
+SOURCE = """
+Feature: asynchronous steps
+    Scenario: waiting
+        Given I wait for <number>
+            | number |
+            | 1      |
+            | 2      |
+            | 3      |
+            | 4      |
+        Then I have waited for <number>
+"""
+
+
+@tags(["acceptance"])
+class AsynchronousStepsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # kept on class, so copies of suite don't copy it
+        cls.loop = asyncio.new_event_loop()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.close()
+
+    def setUp(self):
+        self.events = []
+        self.running = {"now": 0, "max": 0}
+
+    def test_verify_awaits_coroutine_steps_and_hooks(self):
+        verify(SOURCE, self)
+        assert 4 == self.events.count("setUpScenario")
+        assert 4 == self.events.count("tearDownScenario")
+        assert ["waited 1", "waited 2", "waited 3", "waited 4"] == [
+            event for event in self.events if event.startswith("waited")
+        ]
+
+    def test_averify_runs_steps_on_callers_loop(self):
+        self.loop.run_until_complete(averify(SOURCE, self))
+        assert {self.loop} == set(self.step_loops)
+        assert 1 == self.running["max"]
+
+    def test_runs_scenarios_concurrently_with_limit(self):
+        serial = self.run_script(concurrency=1)
+        concurrent = self.run_script(concurrency=2)
+        assert serial == concurrent
+        assert 2 == self.running["max"]
+
+    def test_reports_all_failures_of_concurrent_scenarios(self):
+        source = SOURCE.replace("I have waited for <number>", "I have waited for 2")
+        with self.assertRaises(AssertionError) as context:
+            self.loop.run_until_complete(
+                averify(source, self, concurrency=4, continue_on_failure=True)
+            )
+        report = str(context.exception.__cause__)
+        assert 3 == report.count("Then I have waited for 2")
+
+    def test_stops_starting_concurrent_scenarios_after_failure(self):
+        source = SOURCE.replace("I have waited for <number>", "I have waited for 0")
+        with self.assertRaises(AssertionError):
+            self.loop.run_until_complete(
+                averify(source, self, concurrency=2, suite_factory=self.create_suite)
+            )
+        assert 2 == self.events.count("setUpScenario")
+        assert 2 == self.events.count("tearDownScenario")
+
+    def test_runs_concurrent_scenarios_on_deep_copies_of_suite(self):
+        self.loop.run_until_complete(averify(SOURCE, self, concurrency=2))
+        assert [] == self.events
+
+    def run_script(self, concurrency):
+        self.running["max"] = 0
+        stream = StringIO()
+        feature = Parser().parse_features(SOURCE)
+        self.loop.run_until_complete(
+            aexecute_script(
+                feature,
+                self,
+                formatter=PlainTextFormatter(stream),
+                concurrency=concurrency,
+                suite_factory=self.create_suite,
+            )
+        )
+        return re.sub(r"\d+\.\d+s", "", stream.getvalue())
+
+    def create_suite(self):
+        suite = type(self)(self._testMethodName)
+        suite.events = self.events
+        suite.running = self.running
+        return suite
+
+    async def setUpScenario(self):
+        self.events.append("setUpScenario")
+        self.step_loops = getattr(self, "step_loops", [])
+        self.waited = None
+
+    async def tearDownScenario(self):
+        self.events.append("tearDownScenario")
+
+    async def step_I_wait_for_number(self, number):
+        r"I wait for (\d+)"
+        self.step_loops.append(asyncio.get_event_loop())
+        self.running["now"] += 1
+        self.running["max"] = max(self.running["max"], self.running["now"])
+        await asyncio.sleep(0.01)
+        self.running["now"] -= 1
+        self.waited = number
+
+    def step_I_have_waited_for_number(self, number):
+        r"I have waited for (\d+)"
+        self.events.append("waited {}".format(self.waited))
+        assert self.waited == number
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
+import asyncio
 from pathlib import Path
 from unittest import TestCase
 
 from morelia import verify
+from morelia.config import TOMLConfig
 from morelia.decorators import tags
+from morelia.parser import Parser, aexecute_script, execute_script
 
 features_dir = Path(__file__).parent / "features"
+fixtures_dir = Path(__file__).parent / "fixtures"
 
 
 @tags(["acceptance"])
@@ -88,3 +92,104 @@ class BackgroundTest(TestCase):
         assert (
             self.__scenarios_count >= self.__background_step_ran
         ), "Background step executed more then once for every scenario"
+
+
+@tags(["acceptance"])
+class BackgroundOnceTest(TestCase):
+    source = """
+        Feature: Background run once
+            Background:
+                Given shopping cart with apple
+
+            Scenario: adding pear
+                When I add pear
+                Then cart contains apple, pear
+
+            Scenario: adding plum
+                When I add plum
+                Then cart contains apple, plum
+    """
+
+    def setUp(self):
+        self.background_runs = 0
+
+    def test_runs_background_once_and_restores_its_state(self):
+        self.run_feature(self.source)
+        assert 1 == self.background_runs
+
+    def test_restores_state_with_suite_hooks(self):
+        self.snapshots = []
+        self.snapshot = lambda: self.snapshots.append("snapshot") or ["apple"]
+        self.restore = lambda state: setattr(self, "cart", list(state))
+        self.run_feature(self.source)
+        assert 1 == self.background_runs
+        assert ["snapshot"] == self.snapshots
+
+    def test_keeps_state_set_by_scenario_hooks(self):
+        self.hooks = []
+        self.setUpScenario = lambda: setattr(self, "connection", "open")
+        self.tearDownScenario = lambda: self.hooks.append(self.connection)
+        self.run_feature(self.source)
+        assert 1 == self.background_runs
+        assert ["open", "open"] == self.hooks
+
+    def test_runs_background_with_placeholders_before_every_scenario(self):
+        source = """
+            Feature: Background with placeholders
+                Background:
+                    Given shopping cart with <fruit>
+
+                Scenario: adding pear
+                    When I add pear
+                    Then cart contains apple, pear
+                        | fruit |
+                        | apple |
+
+                Scenario: adding plum
+                    When I add plum
+                    Then cart contains apple, plum
+                        | fruit |
+                        | apple |
+        """
+        self.run_feature(source)
+        assert 2 == self.background_runs
+
+    def test_warns_that_parallel_runners_ignore_it(self):
+        with self.assertWarnsRegex(UserWarning, "background_once"):
+            self.run_feature(self.source, workers=2, executor="thread")
+
+    def test_warns_that_asynchronous_execution_ignores_it(self):
+        feature = Parser().parse_features(self.source)
+        loop = asyncio.new_event_loop()
+        try:
+            with self.assertWarnsRegex(UserWarning, "background_once"):
+                loop.run_until_complete(
+                    aexecute_script(feature, self, config=self.get_config())
+                )
+        finally:
+            loop.close()
+        assert 2 == self.background_runs
+
+    def run_feature(self, source, **kwargs):
+        feature = Parser().parse_features(source)
+        execute_script(feature, self, config=self.get_config(), **kwargs)
+
+    def get_config(self):
+        return TOMLConfig(
+            "background_once", filename=fixtures_dir / "example_pyproject.toml"
+        )
+
+    def step_shopping_cart_with_fruit(self, fruit):
+        r"shopping cart with (\w+)"
+        self.background_runs += 1
+        self.cart = [fruit]
+
+    def step_I_add_fruit(self, fruit):
+        r"I add (\w+)"
+        if hasattr(self, "hooks"):
+            assert "open" == self.connection
+        self.cart.append(fruit)
+
+    def step_cart_contains_fruits(self, fruits):
+        r"cart contains (.+)"
+        assert fruits.split(", ") == self.cart
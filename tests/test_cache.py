@@ -0,0 +1,68 @@
+import tempfile
+from unittest import TestCase, mock
+
+from morelia import Text
+from morelia.cache import FeatureCache
+from morelia.decorators import tags
+from morelia.grammar import Feature, Scenario
+from morelia.parser import Parser
+
+SOURCE = """Feature: cached
+    Scenario: first
+        Given step
+"""
+
+
+@tags(["unit"])
+class FeatureCacheTest(TestCase):
+    def setUp(self):
+        self.cache = FeatureCache()
+
+    def test_returns_copy_of_parsed_feature(self):
+        feature = Parser(cache=self.cache).parse_features(SOURCE)
+        cached = Parser(cache=self.cache).parse_features(SOURCE)
+        assert isinstance(cached, Feature)
+        assert cached is not feature
+        assert isinstance(cached.steps[0], Scenario)
+        assert cached.steps[0].parent is cached
+        assert (1, 1) == (self.cache.hits, self.cache.misses)
+
+    def test_restores_parsed_nodes_of_cached_feature(self):
+        parser = Parser(cache=self.cache)
+        parser.parse_features(SOURCE)
+        parsed = [type(node) for node in parser.nodes]
+        parser = Parser(cache=self.cache)
+        cached = parser.parse_features(SOURCE)
+        assert parsed == [type(node) for node in parser.nodes]
+        assert cached is parser.nodes[0]
+
+    def test_sets_filename_of_cached_feature(self):
+        Parser(cache=self.cache).parse_features(SOURCE)
+        source = Text(SOURCE, "cached.feature")
+        cached = Parser(cache=self.cache).parse_features(source)
+        assert "cached.feature" == cached.get_filename()
+
+    def test_misses_changed_text_or_language(self):
+        Parser(cache=self.cache).parse_features(SOURCE)
+        assert self.cache.get(SOURCE + "\n", "en") is None
+        assert self.cache.get(SOURCE, "pl") is None
+
+    def test_misses_features_cached_by_other_grammar_version(self):
+        Parser(cache=self.cache).parse_features(SOURCE)
+        with mock.patch("morelia.cache.GRAMMAR_VERSION", -1):
+            assert self.cache.get(SOURCE, "en") is None
+
+    def test_stores_features_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Parser(cache=FeatureCache(directory)).parse_features(SOURCE)
+            cache = FeatureCache(directory)
+            cached = cache.get(SOURCE, "en")
+        assert "cached" == cached.predicate
+        assert 1 == cache.hits
+
+    def test_discards_least_recently_used_features(self):
+        self.cache.maxsize = 1
+        self.cache.put(SOURCE, "en", Feature("Feature: first"))
+        self.cache.put(SOURCE, "pl", Feature("Feature: second"))
+        assert 1 == len(self.cache)
+        assert self.cache.get(SOURCE, "en") is None
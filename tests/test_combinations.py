@@ -0,0 +1,105 @@
+import itertools
+from unittest import TestCase
+
+from morelia import verify
+from morelia.combinations import (
+    Combinations,
+    all_combinations,
+    pairwise_combinations,
+    random_combinations,
+)
+from morelia.decorators import tags
+
+
+@tags(["unit"])
+class CombinationsTestCase(TestCase):
+    def test_runs_all_combinations_by_default(self):
+        schedule = Combinations().schedule([2, 0, 3])
+        assert list(itertools.product(range(2), [0], range(3))) == list(schedule)
+
+    def test_selects_strategy_by_label(self):
+        combinations = Combinations()
+        assert "pairwise" == combinations.get_strategy_name(["wip", "pairwise"])
+        assert "random" == combinations.get_strategy_name(["random_combinations"])
+        assert "all" == combinations.get_strategy_name(["wip"])
+
+    def test_scenario_label_overrides_feature_label(self):
+        combinations = Combinations()
+        labels = ["all_combinations", "pairwise"]
+        assert "all" == combinations.get_strategy_name(labels)
+
+    def test_rejects_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            Combinations("everything")
+
+    def test_counts_combinations_of_every_strategy(self):
+        sizes = [3, 1, 4, 2, 3, 5]
+        combinations = Combinations(sample=7)
+        for labels in [[], ["pairwise"], ["random_combinations"]]:
+            with self.subTest(labels=labels):
+                expect = len(list(combinations.schedule(sizes, labels)))
+                assert expect == combinations.count(sizes, labels)
+        assert 100 == Combinations("random", sample=1000).count([10, 0, 10])
+
+    def test_pairwise_covers_all_pairs(self):
+        sizes = [3, 1, 4, 2, 3, 5]
+        schedule = list(pairwise_combinations(sizes))
+        assert len(schedule) < len(list(all_combinations(sizes)))
+        for first, second in itertools.combinations(range(len(sizes)), 2):
+            pairs = {(indices[first], indices[second]) for indices in schedule}
+            expected = set(itertools.product(range(sizes[first]), range(sizes[second])))
+            assert expected == pairs
+
+    def test_pairwise_with_two_tables_runs_all_combinations(self):
+        sizes = [3, 1, 4]
+        assert list(all_combinations(sizes)) == list(pairwise_combinations(sizes))
+
+    def test_random_combinations_are_repeatable(self):
+        sizes = [10, 10, 10, 10]
+        first = list(random_combinations(sizes, sample=5, seed=1))
+        assert first == list(random_combinations(sizes, sample=5, seed=1))
+        assert 5 == len(set(first))
+        assert first == sorted(first)
+        assert set(first) <= set(all_combinations(sizes))
+
+    def test_random_combinations_are_limited_by_all_combinations(self):
+        assert 6 == len(list(random_combinations([2, 3], sample=10)))
+
+
+@tags(["acceptance"])
+class PairwiseScenarioTest(TestCase):
+    def test_runs_pairwise_combinations_of_labeled_scenario(self):
+        self.combinations = []
+        verify(
+            """
+            Feature: combinations
+                @pairwise
+                Scenario: pairwise
+                    Given first <first>
+                        | first |
+                        | 1     |
+                        | 2     |
+                        | 3     |
+                    And second <second>
+                        | second |
+                        | 4      |
+                        | 5      |
+                        | 6      |
+                    And third <third>
+                        | third |
+                        | 7     |
+                        | 8     |
+                        | 9     |
+                    Then <first> and <second> and <third> are run
+            """,
+            self,
+        )
+        assert len(self.combinations) < 3 * 3 * 3
+        assert {("1", "4"), ("3", "6")} <= {c[:2] for c in self.combinations}
+
+    def step_table_value(self, name, value):
+        r"(first|second|third) (\d+)"
+
+    def step_combination_is_run(self, first, second, third):
+        r"(\d+) and (\d+) and (\d+) are run"
+        self.combinations.append((first, second, third))
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from morelia.cache import FeatureCache
 from morelia.config import TOMLConfig
 from morelia.formatters import (
     Buffered,
@@ -8,6 +9,7 @@ from morelia.formatters import (
     TerminalOutput,
     TextFormat,
 )
+from morelia.matchers import PersistentStepCache
 
 fixtures_dir = Path(__file__).parent / "fixtures"
 
@@ -30,3 +32,70 @@ def test_does_not_create_writers_when_config_files_does_not_exist():
     config = TOMLConfig("terminals", filename=fixtures_dir / "not_existing.toml")
     writers = config.get_writers()
     assert writers == []
+
+
+def test_creates_step_cache():
+    config = TOMLConfig("cached", filename=fixtures_dir / "example_pyproject.toml")
+    step_cache = config.get_step_cache()
+    assert step_cache is PersistentStepCache.for_directory(".morelia_cache")
+
+
+def test_does_not_create_step_cache_by_default():
+    config = TOMLConfig("default", filename=fixtures_dir / "example_pyproject.toml")
+    assert config.get_step_cache() is None
+
+
+def test_creates_feature_cache():
+    config = TOMLConfig("cached", filename=fixtures_dir / "example_pyproject.toml")
+    feature_cache = config.get_feature_cache()
+    assert feature_cache is FeatureCache.for_directory(".morelia_cache")
+
+
+def test_does_not_create_feature_cache_by_default():
+    config = TOMLConfig("default", filename=fixtures_dir / "example_pyproject.toml")
+    assert config.get_feature_cache() is None
+
+
+def test_creates_combinations():
+    config = TOMLConfig("sampled", filename=fixtures_dir / "example_pyproject.toml")
+    combinations = config.get_combinations()
+    assert combinations.get_strategy_name() == "random"
+    assert len(list(combinations.schedule([4, 0, 5]))) == 3
+
+
+def test_runs_all_combinations_by_default():
+    config = TOMLConfig("default", filename=fixtures_dir / "example_pyproject.toml")
+    combinations = config.get_combinations()
+    assert len(list(combinations.schedule([4, 0, 5]))) == 20
+
+
+def test_compiles_tag_expression():
+    config = TOMLConfig("tagged", filename=fixtures_dir / "example_pyproject.toml")
+    expression = config.get_tags()
+    assert expression(["smoke"])
+    assert not expression(["smoke", "wip"])
+
+
+def test_does_not_filter_tags_by_default():
+    config = TOMLConfig("default", filename=fixtures_dir / "example_pyproject.toml")
+    assert config.get_tags() is None
+
+
+def test_switches_dry_run_on():
+    config = TOMLConfig("precommit", filename=fixtures_dir / "example_pyproject.toml")
+    assert config.get_dry_run() is True
+
+
+def test_does_not_dry_run_by_default():
+    config = TOMLConfig("default", filename=fixtures_dir / "example_pyproject.toml")
+    assert config.get_dry_run() is False
+
+
+def test_stops_on_first_failure_by_default():
+    config = TOMLConfig("default", filename=fixtures_dir / "example_pyproject.toml")
+    assert config.get_max_failures() == 1
+
+
+def test_reads_max_failures():
+    config = TOMLConfig("failures", filename=fixtures_dir / "example_pyproject.toml")
+    assert config.get_max_failures() == 5
@@ -20,11 +20,28 @@ class ShouldSkipTestCase(unittest.TestCase):
             ("tag1 -tag3", False),
             ("tag1 tag2 -tag3", False),
             ("-tag1 -tag2 -tag3", True),
+            ("tag3 -tag1", True),
+            ("tag3 -tag4", False),
+            ("tag3 and not tag4", True),
+            ("tag1, -tag3", False),
         ]
         for pattern, expected in test_data:
             result = should_skip(tags_list, pattern)
             assert result == expected
 
+    def test_matches_tags_with_hyphen(self):
+        assert not should_skip(["my-tag"], "my-tag")
+        assert should_skip(["my-tag"], "other -my-tag")
+
+    def test_detects_expression_with_long_words_quickly(self):
+        pattern = "acceptance_regression_suite and (smoke or fast)"
+        assert not should_skip(["acceptance_regression_suite", "smoke"], pattern)
+        assert should_skip(["smoke"], "a" * 40 + "(smoke)")
+
+    def test_keeps_old_meaning_of_mixed_tags(self):
+        assert not should_skip(["tag2"], "tag3 -tag1")
+        assert should_skip(["tag2"], "tag3 and not tag1")
+
 
 @tags(["unit"])
 class TagsTestCase(unittest.TestCase):
@@ -0,0 +1,76 @@
+import unittest
+
+from morelia import verify
+from morelia.decorators import tags
+
+SOURCE = """
+Feature: dry run
+    Scenario: outline
+        Given user <name>
+        Then user is saved
+
+        | name  |
+        | alice |
+        | bob   |
+
+    Scenario: other
+        Given nothing
+"""
+
+
+@tags(["acceptance"])
+class DryRunTest(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+
+    def setUpFeature(self):
+        self.events.append("setUpFeature")  # pragma: nocover
+
+    def setUpScenario(self):
+        self.events.append("setUpScenario")  # pragma: nocover
+
+    def step_user_name(self, name):
+        r"user (\w+)"
+        self.events.append(name)  # pragma: nocover
+
+    def step_user_is_saved(self):
+        self.events.append("saved")  # pragma: nocover
+
+    def step_nothing(self):
+        self.events.append("nothing")  # pragma: nocover
+
+    def test_resolves_steps_without_running_them(self):
+        report = verify(SOURCE, self, dry_run=True)
+        assert report.ok
+        assert 3 == report.scenarios
+        assert 4 == report.steps
+        assert [] == self.events
+
+    def test_counts_only_selected_scenarios(self):
+        report = verify(SOURCE, self, scenario="other", dry_run=True)
+        assert 1 == report.scenarios
+
+    def test_reports_missing_steps(self):
+        with self.assertRaises(AssertionError) as context:
+            verify(SOURCE.replace("Given nothing", "Given typo"), self, dry_run=True)
+        assert "def given_typo(self):" in str(context.exception)
+        assert [] == self.events
+
+
+@tags(["acceptance"])
+class AmbiguousStepsTest(unittest.TestCase):
+    def step_user_name(self, name):
+        r"user (.+)"
+
+    def step_user_is_saved(self):
+        pass
+
+    def step_nothing(self):
+        pass
+
+    def test_reports_ambiguous_steps(self):
+        with self.assertRaises(AssertionError) as context:
+            verify(SOURCE, self, dry_run=True)
+        message = str(context.exception)
+        assert "Ambiguous steps" in message
+        assert "user is saved: step_user_name, step_user_is_saved" in message
@@ -0,0 +1,79 @@
+import asyncio
+import traceback
+import unittest
+
+from morelia import averify, verify
+from morelia.decorators import tags
+
+SOURCE = """
+Feature: failures
+    Scenario: checks
+        Given value <value>
+
+        | value |
+        | 1     |
+        | 2     |
+        | 3     |
+
+    Scenario: last
+        Given value 4
+"""
+
+
+@tags(["acceptance"])
+class FailureControlsTest(unittest.TestCase):
+    def setUp(self):
+        self.checked = []
+
+    def step_value(self, value):
+        r"value (\d+)"
+        self.checked.append(value)
+        assert value == "4", "unexpected value {}".format(value)
+
+    def step_exit(self):
+        raise SystemExit(3)
+
+    def test_stops_on_first_failure_by_default(self):
+        with self.assertRaises(AssertionError):
+            verify(SOURCE, self)
+        assert ["1"] == self.checked
+
+    def test_runs_all_scenarios_and_reports_all_failures(self):
+        with self.assertRaises(AssertionError) as context:
+            verify(SOURCE, self, continue_on_failure=True)
+        assert ["1", "2", "3", "4"] == self.checked
+        assert str(context.exception).startswith("unexpected value 1")
+        report = str(context.exception.__cause__)
+        for value in ["1", "2", "3"]:
+            assert "Given value {}".format(value) in report
+            assert "unexpected value {}".format(value) in report
+
+    def test_keeps_traceback_of_first_failure(self):
+        try:
+            verify(SOURCE, self, continue_on_failure=True)
+        except AssertionError as exc:
+            frames = traceback.extract_tb(exc.__traceback__)
+        assert "step_value" in [frame.name for frame in frames]
+
+    def test_exit_from_step_is_not_collected_as_failure(self):
+        source = "Feature: exit\n  Scenario: first\n    Given exit\n"
+        source += "  Scenario: second\n    Given value 4\n"
+        with self.assertRaises(SystemExit):
+            verify(source, self, continue_on_failure=True)
+        assert [] == self.checked
+
+    def test_stops_after_max_failures(self):
+        with self.assertRaises(AssertionError) as context:
+            verify(SOURCE, self, max_failures=2)
+        assert ["1", "2"] == self.checked
+        assert "unexpected value 3" not in str(context.exception.__cause__)
+
+    def test_fail_fast_overrides_other_controls(self):
+        with self.assertRaises(AssertionError):
+            verify(SOURCE, self, fail_fast=True, continue_on_failure=True)
+        assert ["1"] == self.checked
+
+    def test_continues_on_failure_on_event_loop(self):
+        with self.assertRaises(AssertionError):
+            asyncio.run(averify(SOURCE, self, continue_on_failure=True))
+        assert ["1", "2", "3", "4"] == self.checked
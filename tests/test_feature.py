@@ -26,6 +26,16 @@ class FeatureTest(TestCase):
         assert isinstance(step, Scenario)
         assert step.predicate == "starz upon tharz bucks"
 
+    def test_feature_with_description(self):
+        source = """Feature: described
+                   first line
+                   \t
+                   second line
+                   Scenario: described"""
+        step = Parser().parse_feature(source)[0]
+        assert step.predicate == "described\nfirst line\nsecond line"
+        assert step.source.count("\n") == 3
+
     def test_script_without_feature_defined(self):
         # TODO: allow for files which have at least one step defined
         source = "i be a newbie feature"
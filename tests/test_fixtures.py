@@ -0,0 +1,152 @@
+from unittest import TestCase
+
+from morelia.decorators import tags
+from morelia.exceptions import MoreliaError
+from morelia.fixtures import FixturePool, FixtureScope, fixture, get_fixtures
+from morelia.parser import Parser, execute_script
+
+SOURCE = """
+Feature: fixtures
+    Scenario: first
+        Given user <name>
+            | name  |
+            | alice |
+            | bob   |
+        Then database has users
+
+    Scenario: second
+        Given nothing
+"""
+
+
+@tags(["acceptance"])
+class FixturesTest(TestCase):
+    def setUp(self):
+        self.events = []
+
+    @fixture(scope="feature")
+    def database(self):
+        self.events.append("create database")
+        yield {}
+        self.events.append("drop database")
+
+    @fixture
+    def session(self, database):
+        self.events.append("open session")
+        yield database
+        self.events.append("close session")
+
+    def tearDownScenario(self):
+        self.events.append("tearDownScenario")
+
+    def tearDownFeature(self):
+        self.events.append("tearDownFeature")
+
+    def step_user_name(self, name, session):
+        r"user (\w+)"
+        session[name] = True
+
+    def step_database_has_users(self, database):
+        self.events.append("users {}".format(sorted(database)))
+
+    def step_nothing(self):
+        pass
+
+    def run_feature(self, **kwargs):
+        execute_script(Parser().parse_features(SOURCE), self, **kwargs)
+
+    def test_creates_fixtures_lazily_and_tears_them_down_in_order(self):
+        self.run_feature()
+        assert [
+            "create database",
+            "open session",
+            "users ['alice']",
+            "tearDownScenario",
+            "close session",
+            "open session",
+            "users ['alice', 'bob']",
+            "tearDownScenario",
+            "close session",
+            "tearDownScenario",
+            "tearDownFeature",
+            "drop database",
+        ] == self.events
+
+    def test_shares_pooled_fixtures_with_scenarios_run_in_threads(self):
+        self.run_feature(workers=2, executor="thread", suite_factory=lambda: self)
+        assert 1 <= self.events.count("create database") <= 2
+        assert self.events.count("create database") == self.events.count(
+            "drop database"
+        )
+        assert 2 == self.events.count("close session")
+        assert "drop database" == self.events[-1]
+
+
+@tags(["unit"])
+class FixturePoolTest(TestCase):
+    def setUp(self):
+        self.created = 0
+        self.pool = FixturePool()
+        self.session = FixturePool()
+
+    def open_scope(self):
+        """Return fixture scope of scenario sharing pools with other ones."""
+        return FixtureScope(self, self.pool, self.session)
+
+    @fixture(scope="feature")
+    def resource(self):
+        self.created += 1
+        return self.created
+
+    @fixture(scope="session")
+    def shared(self):
+        return "shared"
+
+    @fixture(scope="feature")
+    def invalid(self, local):
+        return local
+
+    @fixture
+    def local(self, shared):
+        return shared
+
+    @fixture(scope="feature")
+    def connection(self, resource):
+        return ("connection", resource)
+
+    def test_checks_out_new_instance_only_when_all_are_in_use(self):
+        first = self.open_scope()
+        second = self.open_scope()
+        assert 1 == first.get("resource")
+        assert 2 == second.get("resource")
+        first.close()
+        assert 1 == self.open_scope().get("resource")
+
+    def test_reuses_pooled_fixture_with_its_own_dependencies(self):
+        scope = self.open_scope()
+        assert ("connection", 1) == scope.get("connection")
+        scope.close()
+        first = self.open_scope()
+        second = self.open_scope()
+        resource = first.get("resource")
+        _, dependency = second.get("connection")
+        assert resource != dependency
+        assert dependency == second.get("resource")
+
+    def test_fixture_depends_on_wider_scope(self):
+        assert "shared" == self.open_scope().get("local")
+
+    def test_rejects_fixture_depending_on_narrower_scope(self):
+        with self.assertRaises(MoreliaError):
+            self.open_scope().get("invalid")
+
+    def test_finds_fixtures_declared_on_class(self):
+        fixtures = get_fixtures(FixturePoolTest)
+        assert ["connection", "invalid", "local", "resource", "shared"] == sorted(
+            fixtures
+        )
+        assert "session" == fixtures["shared"][1]
+
+    def test_rejects_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            fixture(scope="module")
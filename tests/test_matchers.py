@@ -1,14 +1,23 @@
 # -*- coding: utf-8 -*-
 
+import re
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch, sentinel
 
 from morelia.decorators import tags
 from morelia.matchers import (
     IStepMatcher,
     MethodNameStepMatcher,
+    MethodNameTable,
+    ParseDispatcher,
     ParseStepMatcher,
+    PersistentStepCache,
+    RegexpDispatcher,
     RegexpStepMatcher,
+    StepCache,
+    StepRegistry,
 )
 
 
@@ -168,6 +177,181 @@ class IStepMatcherGetAllStepMethodsTestCase(unittest.TestCase):
         assert result == step_methods
 
 
+class RegistrySuite:
+    def step_without_extras(self, arg):
+        r"step (.+)"
+
+    def step_with_extras(self, arg, _text, *, _labels):
+        pass
+
+    def not_a_step(self):
+        pass  # pragma: nocover
+
+
+@tags(["unit"])
+class StepRegistryTestCase(unittest.TestCase):
+    """ Test :py:class:`StepRegistry`. """
+
+    def test_should_share_registry_between_suite_instances(self):
+        """ Scenario: registry per class """
+        # Act
+        registry1 = StepRegistry.for_suite(RegistrySuite())
+        registry2 = StepRegistry.for_suite(RegistrySuite())
+        # Assert
+        assert registry1 is registry2
+        assert registry1.step_methods == ["step_with_extras", "step_without_extras"]
+
+    def test_should_compile_docstring_once(self):
+        """ Scenario: compiled docstring """
+        # Arrange
+        suite = RegistrySuite()
+        registry = StepRegistry.for_suite(suite)
+        # Act
+        regexp1 = registry.get_regexp(suite, "step_without_extras")
+        regexp2 = registry.get_regexp(suite, "step_without_extras")
+        # Assert
+        assert regexp1 is regexp2
+        assert regexp1.match("step 1")
+        assert registry.get_regexp(suite, "step_with_extras") is None
+
+    def test_should_return_call_plan(self):
+        """ Scenario: extra arguments """
+        # Arrange
+        suite = RegistrySuite()
+        registry = StepRegistry.for_suite(suite)
+        # Act
+        without_extras = registry.get_call_plan(suite.step_without_extras)
+        with_extras = registry.get_call_plan(suite.step_with_extras)
+        # Assert
+        assert without_extras == ()
+        assert with_extras == ("_text", "_labels")
+
+
+class CachedSuite:
+    def __init__(self, name):
+        self.name = name
+
+    def step_add(self, number):
+        r"add (?P<number>\d+)"
+
+
+@tags(["unit"])
+class StepCacheTestCase(unittest.TestCase):
+    """ Test :py:class:`StepCache`. """
+
+    def test_should_bind_cached_step_to_current_suite(self):
+        """ Scenario: cached step of other instance """
+        # Arrange
+        cache = StepCache()
+        first = RegexpStepMatcher(CachedSuite("first"))
+        second = RegexpStepMatcher(CachedSuite("second"))
+        first._cache = second._cache = cache
+        # Act
+        first.find("add 1", "add 1")[2]["extra"] = True
+        method, args, kwargs = second.find("add 1", "add 1")
+        # Assert
+        assert method.__self__.name == "second"
+        assert kwargs == {"number": "1"}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_should_cache_missing_steps(self):
+        """ Scenario: missing step """
+        # Arrange
+        cache = StepCache()
+        obj = RegexpStepMatcher(CachedSuite("first"))
+        obj._cache = cache
+        # Act
+        obj.find("subtract 1", "subtract 1")
+        result = obj.find("subtract 1", "subtract 1")
+        # Assert
+        assert result == (None, (), {})
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_should_discard_least_recently_used_entries(self):
+        """ Scenario: bounded cache """
+        # Arrange
+        obj = StepCache(maxsize=2)
+        obj.put("a", sentinel.a)
+        obj.put("b", sentinel.b)
+        obj.get("a")
+        # Act
+        obj.put("c", sentinel.c)
+        # Assert
+        assert len(obj) == 2
+        assert obj.get("b") is None
+        assert obj.get("a") == sentinel.a
+
+
+@tags(["unit"])
+class PersistentStepCacheTestCase(unittest.TestCase):
+    """ Test :py:class:`PersistentStepCache`. """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_matcher(self, suite):
+        matcher = RegexpStepMatcher(suite)
+        matcher._cache = StepCache()
+        cache = PersistentStepCache(self.directory.name)
+        return matcher.set_persistent_cache(cache), cache
+
+    def test_should_load_steps_saved_by_previous_run(self):
+        """ Scenario: cold start """
+        # Arrange
+        matcher, cache = self.create_matcher(CachedSuite("first"))
+        matcher.find("add 1", "add 1")
+        cache.save()
+        # Act
+        matcher, _ = self.create_matcher(CachedSuite("second"))
+        with patch.object(matcher, "match") as match:
+            method, args, kwargs = matcher.find("add 1", "add 1")
+        # Assert
+        match.assert_not_called()
+        assert method.__self__.name == "second"
+        assert kwargs == {"number": "1"}
+
+    def test_should_not_load_steps_when_docstring_changed(self):
+        """ Scenario: invalidated cache """
+        # Arrange
+        matcher, cache = self.create_matcher(self.create_suite(r"add (\d+)"))
+        matcher.find("add 1", "add 1")
+        cache.save()
+        # Act
+        matcher, _ = self.create_matcher(self.create_suite(r"add (\d)"))
+        with patch.object(matcher, "match") as match:
+            match.return_value = (None, (), {})
+            matcher.find("add 1", "add 1")
+        # Assert
+        match.assert_called_once()
+
+    def test_should_save_when_outdated_file_removed_by_other_worker(self):
+        """ Scenario: concurrent save """
+        # Arrange
+        matcher, cache = self.create_matcher(self.create_suite(r"add (\d+)"))
+        matcher.find("add 1", "add 1")
+        cache.save()
+        matcher, cache = self.create_matcher(self.create_suite(r"add (\d)"))
+        matcher.find("add 1", "add 1")
+        # Act
+        with patch.object(Path, "unlink", side_effect=FileNotFoundError):
+            cache.save()
+        # Assert
+        matcher, _ = self.create_matcher(self.create_suite(r"add (\d)"))
+        with patch.object(matcher, "match") as match:
+            matcher.find("add 1", "add 1")
+        match.assert_not_called()
+
+    def create_suite(self, docstring):
+        def step_add(self, number):
+            pass  # pragma: nocover
+
+        step_add.__doc__ = docstring
+        return type("Suite", (), {"step_add": step_add})()
+
+
 @tags(["unit"])
 class MethodNameStepMatcherMatchTestCase(unittest.TestCase):
     """ Test :py:meth:`MethodNameStepMatcher.match`. """
@@ -221,6 +405,41 @@ class MethodNameStepMatcherMatchTestCase(unittest.TestCase):
         assert result_method is None
 
 
+@tags(["unit"])
+class MethodNameTableMatchTestCase(unittest.TestCase):
+    """ Test :py:meth:`MethodNameTable.match`. """
+
+    def test_should_match_non_word_characters_with_optional_underscores(self):
+        """ Scenario: optional underscores """
+        # Arrange
+        obj = MethodNameTable(["step_I_press_add", "when_Iam_done", "then_a__b"])
+        test_data = [
+            ("I press add", "step_I_press_add"),
+            ("I press-add", "step_I_press_add"),
+            ("I'am done", "when_Iam_done"),
+            ("a. b", "then_a__b"),
+            ("a._b", "then_a__b"),
+            ("a b", None),
+            ("Ipress add", None),
+            ("I press add!", "step_I_press_add"),
+            ("I__press add", None),
+        ]
+        for predicate, expected in test_data:
+            # Act
+            result = obj.match(predicate)
+            # Assert
+            assert result == expected, predicate
+
+    def test_should_return_first_matching_method(self):
+        """ Scenario: many matching methods """
+        # Arrange
+        obj = MethodNameTable(["given_ab", "step_a_b", "other_a_b"])
+        # Act
+        result = obj.match("a b")
+        # Assert
+        assert result == "given_ab"
+
+
 @tags(["unit"])
 class MethodNameStepMatcherSuggestTestCase(unittest.TestCase):
     """ Test :py:meth:`MethodNameStepMatcher.suggest`. """
@@ -449,6 +668,69 @@ class DocStringStepMatcherSuggestTestCase(unittest.TestCase):
             assert suggest_docstring == docstring
 
 
+@tags(["unit"])
+class RegexpDispatcherMatchTestCase(unittest.TestCase):
+    """ Test :py:meth:`RegexpDispatcher.match`. """
+
+    def create_dispatcher(self, docstrings):
+        entries = [
+            ("step_%d" % idx, doc, re.compile("^" + doc + "$"))
+            for idx, doc in enumerate(docstrings)
+        ]
+        return RegexpDispatcher(entries)
+
+    def test_should_map_groups_to_matched_method(self):
+        """ Scenario: groups of joined docstrings """
+        # Arrange
+        obj = self.create_dispatcher([r"add (\d+) to (\d+)", r"(a)((b)c) (\w+)"])
+        # Act
+        result = obj.match("abc d")
+        # Assert
+        assert result == ("step_1", ("a", "bc", "b", "d"), {})
+
+    def test_should_map_named_groups_with_same_names(self):
+        """ Scenario: named groups repeated in docstrings """
+        # Arrange
+        obj = self.create_dispatcher([r"(?P<who>boys) (?P=who)", r"(?P<who>\w+) yard"])
+        # Act
+        result = obj.match("girls yard")
+        # Assert
+        assert result == ("step_1", (), {"who": "girls"})
+
+    def test_should_return_first_match(self):
+        """ Scenario: first match wins """
+        # Arrange
+        docstrings = [r"(\w+) (\w+)", r"(\w)\1 (\w+)", r"aa (\w+)"]
+        obj = self.create_dispatcher(docstrings)
+        # Act
+        result = obj.match("aa b")
+        # Assert
+        assert result == ("step_0", ("aa", "b"), {})
+        assert self.create_dispatcher(docstrings[1:]).match("aa b") == (
+            "step_0",
+            ("a", "b"),
+            {},
+        )
+
+    def test_should_return_none_if_not_matched(self):
+        """ Scenario: no match """
+        # Arrange
+        obj = self.create_dispatcher([r"foo|bar"])
+        # Act
+        result = obj.match("barz")
+        # Assert
+        assert result == (None, (), {})
+
+    def test_should_return_all_matches(self):
+        """ Scenario: all matching methods """
+        # Arrange
+        obj = self.create_dispatcher([r"(\w+) (\w+)", r"(\w)\1 (\w+)", r"foo"])
+        # Act
+        result = obj.match_all("aa b")
+        # Assert
+        assert result == ["step_0", "step_1"]
+
+
 @tags(["unit"])
 class ParseStepMatcherMatchTestCase(unittest.TestCase):
     """ Test :py:meth:`ParseStepMatcher.match`. """
@@ -568,6 +850,75 @@ class ParseStepMatcherMatchTestCase(unittest.TestCase):
         assert result_args == ("the",)
         assert result_kwargs == {"who": "boys"}
 
+    def test_should_convert_registered_type(self):
+        """ Scenario: custom type """
+        # Arrange
+        predicate = "add 2 to 3"
+        method = Mock(__doc__="add {:Number} to {:Number}")
+        methods = {"step_add": method}
+        suite = Mock(**methods)
+        obj = ParseStepMatcher(suite)
+        # Act
+        with patch.object(ParseStepMatcher, "_types", {}):
+            ParseStepMatcher.register_type("Number", int)
+            result_method, result_args, result_kwargs = obj.match(
+                predicate, predicate, methods.keys()
+            )
+        # Assert
+        assert result_method == method
+        assert result_args == (2, 3)
+
+
+@tags(["unit"])
+class ParseDispatcherMatchTestCase(unittest.TestCase):
+    """ Test :py:meth:`ParseDispatcher.match`. """
+
+    def test_should_return_match_with_most_fields(self):
+        """ Scenario: most captured fields wins """
+        # Arrange
+        entries = [
+            ("step_0", "I press add"),
+            ("step_1", "I {verb} {what}"),
+            ("step_2", "I {verb} add"),
+        ]
+        obj = ParseDispatcher(entries, {})
+        # Act
+        result = obj.match("i PRESS add")
+        # Assert
+        assert result == ("step_1", (), {"verb": "PRESS", "what": "add"})
+
+    def test_should_return_first_match_with_same_number_of_fields(self):
+        """ Scenario: tie """
+        # Arrange
+        entries = [("step_0", "{x}"), ("step_1", "the {{lit}} word {y}")]
+        obj = ParseDispatcher(entries, {})
+        # Act
+        result = obj.match("the {lit} word q")
+        # Assert
+        assert result == ("step_0", (), {"x": "the {lit} word q"})
+
+    def test_should_match_words_glued_to_fields(self):
+        """ Scenario: literal text next to field """
+        # Arrange
+        entries = [("step_0", 'I have {n}apples in "{where}"')]
+        obj = ParseDispatcher(entries, {})
+        # Act
+        result = obj.match('I have 3apples in "basket"')
+        # Assert
+        assert result == ("step_0", (), {"n": "3", "where": "basket"})
+
+    def test_should_not_parse_docstrings_with_missing_words(self):
+        """ Scenario: filtered by index """
+        # Arrange
+        entries = [("step_0", "I press {}"), ("step_1", "I push {}")]
+        obj = ParseDispatcher(entries, {})
+        # Act
+        with patch("parse.Parser.parse") as parse:
+            parse.return_value = None
+            obj.match("I push add")
+        # Assert
+        assert parse.call_count == 1
+
 
 @tags(["unit"])
 class ParseStepMatcherSuggestTestCase(unittest.TestCase):
@@ -0,0 +1,203 @@
+import asyncio
+import gc
+import os
+import re
+import tempfile
+import warnings
+from io import StringIO
+from unittest import TestCase, skipUnless
+
+from morelia.decorators import tags
+from morelia.formatters import PlainTextFormatter
+from morelia.matchers import RegexpStepMatcher
+from morelia.parallel import (
+    copy_suite,
+    get_scenario_instances,
+    get_suite_factory,
+    run_instances,
+)
+from morelia.parser import Parser, _create_matchers_chain, execute_script
+
+SOURCE = """
+Feature: parallel execution
+    Scenario: first
+        Given number <number>
+            | number | parity |
+            | 1      | odd    |
+            | 2      | even   |
+            | 3      | odd    |
+        Then number is <parity>
+
+    Scenario: second
+        Given number 4
+        Then number is even
+"""
+
+
+@tags(["acceptance"])
+class ParallelExecutionTest(TestCase):
+    def setUp(self):
+        self.feature = Parser().parse_features(SOURCE)
+        self.parities = ["even", "odd"]
+
+    def test_reports_results_in_serial_order(self):
+        serial = self.run_script(None)
+        self.feature = Parser().parse_features(SOURCE)
+        parallel = self.run_script(2)
+        assert serial == parallel
+
+    def test_raises_first_failure_with_report_of_all_failures(self):
+        feature = Parser().parse_features(SOURCE.replace("even", "odd"))
+        with self.assertRaises(AssertionError) as context:
+            execute_script(feature, self, workers=2)
+        report = str(context.exception.__cause__)
+        assert 2 == report.count("Then number is odd")
+        assert 2 == report.count("step_number_is_parity")
+
+    def test_runs_feature_setup_and_teardown_per_worker(self):
+        self.events = []
+        scenario_re = re.compile(".*")
+        instances = get_scenario_instances(self.feature, scenario_re)
+        results = run_instances(
+            self.feature,
+            lambda: self,
+            [RegexpStepMatcher],
+            _create_matchers_chain,
+            scenario_re,
+            list(enumerate(instances))[::2],
+        )
+        assert [0, 2] == [number for number, _, _ in results]
+        assert "setUpFeature" == self.events[0]
+        assert "tearDownFeature" == self.events[-1]
+        assert 2 == self.events.count("setUpScenario")
+
+    def test_runs_scenarios_in_threads_on_copies_of_suite(self):
+        serial = self.run_script(None)
+        self.events = []
+        del self.number
+        self.feature = Parser().parse_features(SOURCE)
+        threaded = self.run_script(3, executor="thread")
+        assert serial == threaded
+        assert ["setUpFeature", "tearDownFeature"] == self.events
+        assert not hasattr(self, "number")
+
+    def test_copies_of_suite_share_no_mutable_state(self):
+        self.events = ["setUpFeature"]
+        first = copy_suite(self)
+        second = copy_suite(self)
+        first.events.append("setUpScenario")
+        assert ["setUpFeature"] == self.events
+        assert ["setUpFeature"] == second.events
+        assert self._testMethodName == first._testMethodName
+
+    def test_sets_up_and_tears_down_test_case_created_in_worker(self):
+        factory = get_suite_factory(self)
+        suite = factory()
+        suite.addCleanup(suite.parities.clear)
+        assert ["even", "odd"] == suite.parities
+        factory.tear_down(suite)
+        assert [] == suite.parities
+
+    def test_copies_private_attributes_of_suite(self):
+        self._numbers = []
+        self.__seen = {}
+        first = copy_suite(self)
+        first._numbers.append(1)
+        first._ParallelExecutionTest__seen["first"] = True
+        assert [] == self._numbers
+        assert {} == self.__seen
+        assert self._outcome is first._outcome
+
+    def test_closes_event_loops_of_visitors_running_scenarios(self):
+        self.feature = Parser().parse_features(
+            SOURCE.replace("Then number is <parity>", "Then number is awaited")
+        )
+        scenario_re = re.compile(".*")
+        instances = get_scenario_instances(self.feature, scenario_re)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            self.run_script(2, executor="thread")
+            run_instances(
+                self.feature,
+                lambda: self,
+                [RegexpStepMatcher],
+                _create_matchers_chain,
+                scenario_re,
+                list(enumerate(instances)),
+            )
+            gc.collect()
+        assert [] == [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+    def test_raises_first_failure_from_threads(self):
+        feature = Parser().parse_features(SOURCE.replace("even", "odd"))
+        with self.assertRaises(AssertionError) as context:
+            execute_script(feature, self, workers=2, executor="thread")
+        report = str(context.exception.__cause__)
+        assert 2 == report.count("Then number is odd")
+        assert 2 == report.count("Feature: parallel execution")
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_runs_shared_steps_once_in_forked_processes(self):
+        source = SOURCE.replace(
+            "Scenario: first\n", "Scenario: first\n        Given expensive setup\n"
+        ).replace(
+            "Scenario: second\n", "Scenario: second\n        Given expensive setup\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            self.log_path = os.path.join(directory, "log")
+            self.feature = Parser().parse_features(source)
+            serial = self.run_script(None)
+            os.remove(self.log_path)
+            self.feature = Parser().parse_features(source)
+            forked = self.run_script(None, executor="fork")
+            with open(self.log_path) as log:
+                runs = log.read().split()
+        assert serial == forked
+        assert 4 == serial.count("Given expensive setup")
+        assert ["setup"] == runs
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_raises_first_failure_from_forked_processes(self):
+        feature = Parser().parse_features(SOURCE.replace("even", "odd"))
+        with self.assertRaises(AssertionError) as context:
+            execute_script(feature, self, executor="fork")
+        report = str(context.exception.__cause__)
+        assert 2 == report.count("Then number is odd")
+        assert "Scenario: second" in report
+
+    def run_script(self, workers, executor=None):
+        stream = StringIO()
+        formatter = PlainTextFormatter(stream)
+        execute_script(
+            self.feature,
+            self,
+            formatter=formatter,
+            workers=workers,
+            executor=executor,
+        )
+        return re.sub(r"\d+\.\d+s", "", stream.getvalue())
+
+    def setUpFeature(self):
+        self.events = getattr(self, "events", [])
+        self.events.append("setUpFeature")
+
+    def tearDownFeature(self):
+        self.events.append("tearDownFeature")
+
+    def setUpScenario(self):
+        self.events.append("setUpScenario")
+
+    def step_expensive_setup(self):
+        with open(self.log_path, "a") as log:
+            log.write("setup\n")
+
+    def step_number(self, number):
+        r"number (\d+)"
+        self.number = int(number)
+
+    async def step_number_is_awaited(self):
+        await asyncio.sleep(0)
+
+    def step_number_is_parity(self, parity):
+        r"number is (odd|even)"
+        assert self.parities[self.number % 2] == parity
@@ -1,7 +1,21 @@
+import io
+import tempfile
+from pathlib import Path
 from unittest import TestCase
 
 from morelia.decorators import tags
-from morelia.parser import DocStringParser, LabelParser, LanguageParser, LineSource
+from morelia.exceptions import FeatureSyntaxErrors, InvalidScenarioMatchingPattern
+from morelia.grammar import Comment, Given, Predecessors, Row, Scenario, Step
+from morelia.parser import (
+    DocStringParser,
+    LabelParser,
+    LanguageParser,
+    LineDispatcher,
+    LineSource,
+    Parser,
+    ScenarioFilter,
+    execute_script,
+)
 
 
 @tags(["unit"])
@@ -133,6 +147,113 @@ class LineProducerGetLineTestCase(TestCase):
             assert result == line
             assert obj.line_number == i + 1
 
+    def test_should_count_empty_lines(self):
+        """ Scenario: empty lines """
+        # Arrange
+        obj = LineSource("line1\n\n\nline2")
+        # Act
+        obj.get_line()
+        obj.get_line()
+        # Assert
+        assert obj.line_number == 4
+
+    def test_should_read_lines_pushed_back(self):
+        """ Scenario: pushed back lines """
+        # Arrange
+        obj = LineSource("line1\nline2\nline3")
+        obj.get_line()
+        obj.get_line()
+        # Act
+        obj.push_back([(1, "line1"), (2, "line2")])
+        result = [obj.get_line(), obj.get_line()]
+        # Assert
+        assert result == ["line1", "line2"]
+        assert obj.get_line() == "line3"
+        assert obj.line_number == 3
+
+    def test_should_read_lines_from_file_object(self):
+        """ Scenario: file objects """
+        for lines in [io.StringIO("line1\r\n\nline2\n"), io.BytesIO(b"line1\n\nline2")]:
+            # Arrange
+            obj = LineSource(lines)
+            # Act
+            result = [obj.get_line(), obj.get_line()]
+            # Assert
+            assert result == ["line1", "line2"]
+            self.assertRaises(StopIteration, obj.get_line)
+
+    def test_should_read_lines_on_demand(self):
+        """ Scenario: generator of lines """
+        # Arrange
+        read = []
+
+        def lines():
+            for line in ["line1", "", "line2"]:
+                read.append(line)
+                yield line
+
+        obj = LineSource(lines())
+        # Act
+        result = obj.get_line()
+        # Assert
+        assert result == "line1"
+        assert read == ["line1"]
+
+
+@tags(["unit"])
+class LineDispatcherClassifyTestCase(TestCase):
+    """ Test :py:meth:`LineDispatcher.classify`. """
+
+    def test_should_classify_lines(self):
+        """ Scenario: kinds of lines """
+        # Arrange
+        obj = LineDispatcher.for_language([Scenario, Given, Row, Comment], "en")
+        test_data = [
+            ("# language: pl", ("language", None)),
+            ("  @label", ("labels", None)),
+            ('  """', ("docstring", None)),
+            ("  Scenario Outline: name", ("node", Scenario)),
+            ("    Given step", ("node", Given)),
+            ("      | a |", ("node", Row)),
+            ("  # comment", ("node", Comment)),
+            ("    description", (None, None)),
+        ]
+        for line, expected in test_data:
+            # Act
+            result = obj.classify(line)
+            # Assert
+            assert result == expected
+
+    def test_should_use_keywords_of_language(self):
+        """ Scenario: translated keywords """
+        # Arrange
+        obj = LineDispatcher.for_language([Scenario, Given], "pl")
+        # Act
+        result = obj.classify("Zakładając, że krok")
+        # Assert
+        assert result == ("node", Given)
+        assert obj is LineDispatcher.for_language([Scenario, Given], "pl")
+
+
+@tags(["unit"])
+class PredecessorsFindLatestTestCase(TestCase):
+    """ Test :py:meth:`Predecessors.find_latest`. """
+
+    def test_should_return_latest_node_of_allowed_classes(self):
+        """ Scenario: latest of many classes """
+        # Arrange
+        obj = Predecessors()
+        step = Step("Step: first")
+        given = Given("Given second")
+        obj.append(step)
+        obj.append(given)
+        obj.append(Comment("# comment"))
+        # Act
+        result = obj.find_latest((Step,))
+        # Assert
+        assert result is given
+        assert obj.find_latest((Scenario,)) is None
+
 
 class DocStringParserParseTestCase(TestCase):
     """ Test :py:meth:`DocStringParser.parse`. """
@@ -177,3 +298,223 @@ class DocStringParserParseTestCase(TestCase):
             # Assert
             assert result
             assert obj.payload == expected
+
+
+SOURCE = """Feature: lazy parsing
+    Scenario: first
+        Given step
+    Scenario: second
+        Given step
+"""
+
+
+@tags(["unit"])
+class ParserLazyParsingTestCase(TestCase):
+    """ Test :py:meth:`Parser.parse_features` with lazy parsing. """
+
+    def setUp(self):
+        self.read = []
+
+    def lines(self, source=SOURCE):
+        for line in source.split("\n"):
+            self.read.append(line)
+            yield line
+
+    def step_step(self):
+        self.steps_run_when_read = len(self.read)
+
+    def test_should_parse_only_header(self):
+        """ Scenario: feature header """
+        # Arrange
+        obj = Parser()
+        # Act
+        feature = obj.parse_features(self.lines(), lazy=True)
+        # Assert
+        assert feature.predicate == "lazy parsing"
+        assert not feature.parsed
+        assert len(self.read) == 1
+
+    def test_should_run_first_scenario_before_reading_rest(self):
+        """ Scenario: execution while parsing """
+        # Arrange
+        feature = Parser().parse_features(self.lines(), lazy=True)
+        # Act
+        execute_script(feature, self, scenario="first")
+        # Assert
+        assert self.steps_run_when_read == 4
+        assert feature.parsed
+        assert [node.predicate for node in feature.steps] == ["first", "second"]
+
+    def test_should_report_feature_without_scenarios_when_parsed(self):
+        """ Scenario: syntax error found lazily """
+        # Arrange
+        feature = Parser().parse_features(self.lines("Feature: empty"), lazy=True)
+        # Act
+        # Assert
+        self.assertRaises(SyntaxError, feature.parse_remaining)
+
+
+@tags(["unit"])
+class ParserParseManyTestCase(TestCase):
+    """ Test :py:meth:`Parser.parse_many`. """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        for name in ["a", "b", "c"]:
+            source = SOURCE.replace("lazy parsing", name)
+            (self.path / "{}.feature".format(name)).write_text(source)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_should_parse_features_in_directory(self):
+        """ Scenario: directory """
+        # Arrange
+        obj = Parser()
+        # Act
+        result = obj.parse_many(self.path, workers=2)
+        # Assert
+        assert [feature.predicate for feature in result] == ["a", "b", "c"]
+        assert result[0].filename == str(self.path / "a.feature")
+        assert result[2].steps[1].steps[0].parent is result[2].steps[1]
+
+    def test_should_parse_features_matching_pattern(self):
+        """ Scenario: glob pattern """
+        # Arrange
+        obj = Parser()
+        # Act
+        result = obj.parse_many([str(self.path / "[ab].feature")], workers=1)
+        # Assert
+        assert [feature.predicate for feature in result] == ["a", "b"]
+
+    def test_should_report_all_syntax_errors(self):
+        """ Scenario: many invalid features """
+        # Arrange
+        (self.path / "b.feature").write_text("Feature: b")
+        (self.path / "c.feature").write_text("no feature")
+        obj = Parser()
+        # Act
+        with self.assertRaises(FeatureSyntaxErrors) as context:
+            obj.parse_many(self.path, workers=2)
+        # Assert
+        errors = context.exception.errors
+        assert [error.filename for error in errors] == [
+            str(self.path / "b.feature"),
+            str(self.path / "c.feature"),
+        ]
+        assert "Feature without Scenario(s)" in str(context.exception)
+
+
+@tags(["unit"])
+class ParserReuseTestCase(TestCase):
+    """ Test reusing :py:class:`Parser`. """
+
+    def test_should_discard_nodes_of_previous_feature(self):
+        """ Scenario: parse twice """
+        # Arrange
+        obj = Parser()
+        obj.parse_features("# language: pl\nWłaściwość: pierwsza\nScenariusz: s\n")
+        # Act
+        result = obj.parse_features(SOURCE)
+        # Assert
+        assert result.predicate == "lazy parsing"
+        assert obj.nodes[0] is result
+        assert len(obj.nodes) == 5
+
+
+FILTERED_SOURCE = """Feature: filtering
+    Background:
+        Given background
+    @slow
+    Scenario: first
+        Given step
+            \"\"\"
+            Scenario: inside docstring
+            \"\"\"
+        @table
+        Examples:
+            | a |
+            | 1 |
+
+    Scenario: second
+        Given step
+
+        Then step
+    Scenario: third
+        Given step
+"""
+
+
+@tags(["unit"])
+class ParserScenarioFilterTestCase(TestCase):
+    """ Test :py:meth:`Parser.parse_features` with :py:class:`ScenarioFilter`. """
+
+    def parse(self, **kwargs):
+        parser = Parser(scenario_filter=ScenarioFilter(**kwargs))
+        feature = parser.parse_features(FILTERED_SOURCE)
+        return feature, parser.nodes
+
+    def test_should_skip_scenarios_not_matching_name(self):
+        """ Scenario: filter by name """
+        # Arrange
+        # Act
+        feature, nodes = self.parse(name="sec")
+        # Assert
+        assert [node.predicate for node in feature.steps] == ["", "second"]
+        assert len(nodes) == 6
+
+    def test_should_select_scenario_containing_line(self):
+        """ Scenario: filter by line """
+        for line, expected in [
+            (5, "first"),
+            (12, "first"),
+            (17, "second"),
+            (19, "third"),
+        ]:
+            # Arrange
+            # Act
+            feature, _ = self.parse(lines=[line])
+            # Assert
+            assert [node.predicate for node in feature.steps[1:]] == [expected]
+            assert (
+                feature.steps[1].line_number
+                == FILTERED_SOURCE.split("\n").index("    Scenario: " + expected) + 1
+            )
+
+    def test_should_keep_labels_of_replayed_scenario(self):
+        """ Scenario: labels of scenario selected by line """
+        # Arrange
+        # Act
+        feature, _ = self.parse(lines=[11])
+        # Assert
+        scenario = feature.steps[1]
+        assert scenario.get_labels() == ["slow"]
+        assert scenario.steps[1].get_labels() == ["table", "slow"]
+
+    def test_should_skip_scenarios_not_matching_labels(self):
+        """ Scenario: filter by labels """
+        # Arrange
+        # Act
+        feature, _ = self.parse(labels=lambda labels: "slow" not in labels)
+        # Assert
+        assert [node.predicate for node in feature.steps] == ["", "second", "third"]
+
+    def test_should_not_report_feature_without_selected_scenarios(self):
+        """ Scenario: no scenario selected """
+        # Arrange
+        # Act
+        feature, _ = self.parse(name="none")
+        # Assert
+        assert len(feature.steps) == 1
+
+    def test_should_report_lines_selecting_no_scenario(self):
+        """ Scenario: no scenario at line """
+        for lazy in [False, True]:
+            # Arrange
+            parser = Parser(scenario_filter=ScenarioFilter(lines=[2]))
+            # Act
+            with self.assertRaises(InvalidScenarioMatchingPattern) as context:
+                parser.parse_features(FILTERED_SOURCE, lazy=lazy).parse_remaining()
+            # Assert
+            assert "line(s) 2" in str(context.exception)
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 import re
 from unittest import TestCase
+from unittest.mock import patch
 
 from morelia import verify
+from morelia.combinations import Combinations, all_combinations
 from morelia.decorators import tags
-from morelia.grammar import Row, _permute_indices
+from morelia.grammar import Row
 from morelia.matchers import MethodNameStepMatcher, RegexpStepMatcher
 from morelia.parser import Parser
+from morelia.sharding import Sharding
 from morelia.visitors import TestVisitor
 
 
@@ -35,33 +38,33 @@ class RowTest(TestCase):
         dims = scenario.count_Row_dimensions()
         assert [2, 0, 3] == dims
 
-    def test_permutate(self):
-        expect = [
-            (0, 0, 0),
-            (0, 0, 1),
-            (0, 0, 2),
-            (0, 1, 0),
-            (0, 1, 1),
-            (0, 1, 2),
-            (0, 2, 0),
-            (0, 2, 1),
-            (0, 2, 2),
-            (0, 3, 0),
-            (0, 3, 1),
-            (0, 3, 2),
-        ]
-        assert expect == _permute_indices([0, 4, 3])
-        expect = [(0, 0, 0)]
-        assert expect == _permute_indices([1, 1, 1])
-        expect = [(0, 0, 0), (0, 0, 1)]
-        assert expect == _permute_indices([1, 1, 2])
-
     def test_permute_schedule(self):
-        expect = _permute_indices([2, 0, 3])  # NOTE:  by rights, 0 should be -1
+        expect = list(all_combinations([2, 1, 3]))
         self.assemble_scene_table("Step you betcha\n")
         scenario = self.table_scene.steps[0]
         schedule = scenario.permute_schedule()
-        assert expect == schedule
+        assert expect == list(schedule)
+
+    def test_count_permutations(self):
+        self.assemble_scene_table("Step you betcha\n")
+        scenario = self.table_scene.steps[0]
+        assert 6 == scenario.count_permutations()
+
+    def test_count_permutations_without_enumerating_them(self):
+        self.assemble_scene_table("Step you betcha\n")
+        scenario = self.table_scene.steps[0]
+        with patch.object(Combinations, "schedule") as schedule:
+            assert 6 == scenario.count_permutations()
+        schedule.assert_not_called()
+
+    def test_count_permutations_chosen_for_shard(self):
+        self.assemble_scene_table("Step you betcha\n")
+        self.table_scene.combinations = Combinations("random", sample=4)
+        self.table_scene.sharding = Sharding(0, 2)
+        scenario = self.table_scene.steps[0]
+        expect = len(list(scenario.permute_schedule()))
+        assert expect == scenario.count_permutations()
+        assert 4 == scenario.count_permutations(sharded=False)
 
     def test_evaluate_permuted_schedule(self):
         self.assemble_scene_table("Step flesh is weak\n")
@@ -75,6 +78,42 @@ class RowTest(TestCase):
         assert "hotel" == self.got_party_zone
         assert "jail" == self.got_crunk
 
+    def test_get_row_values(self):
+        self.assemble_scene_table()
+        given = self.table_scene.steps[0].steps[0]
+        assert [{"zone": "beach"}, {"zone": "hotel"}] == given.get_row_values()
+
+    def test_interpolated_predicates(self):
+        self.assemble_scene_table("Step <zone> and <crunk> and <unknown>\n")
+        step = self.table_scene.steps[0].steps[1]
+        assert [
+            "beach and work and <unknown>",
+            "beach and mall and <unknown>",
+            "beach and jail and <unknown>",
+            "hotel and work and <unknown>",
+            "hotel and mall and <unknown>",
+            "hotel and jail and <unknown>",
+        ] == step.get_interpolated_predicates()
+
+    def test_interpolated_predicate_follows_row_indices(self):
+        self.assemble_scene_table("Step <crunk> and <zone>\n")
+        scenario = self.table_scene.steps[0]
+        step = scenario.steps[1]
+        scenario.row_indices = [1, 0, 2]
+        assert "jail and hotel" == step.interpolated_predicate()
+        scenario.row_indices = [0, 0, 1]
+        assert "mall and beach" == step.interpolated_predicate()
+
+    def test_scenario_instances_keep_own_row_indices(self):
+        self.assemble_scene_table("Step <crunk> and <zone>\n")
+        scenario = self.table_scene.steps[0]
+        first = scenario.get_instance((1, 0, 2))
+        second = scenario.get_instance((0, 0, 1))
+        assert "jail and hotel" == first.steps[1].interpolated_predicate()
+        assert "mall and beach" == second.steps[1].interpolated_predicate()
+        assert [0] == scenario.row_indices
+        assert scenario.steps[1].parent is scenario
+
     def test_Rows_find_step_parents(self):
         self.assemble_scene_table()
         given, then, = self.table_scene.steps[0].steps
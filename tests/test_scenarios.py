@@ -67,6 +67,10 @@ class RegexSpecifiedScenariosTest(TestCase):
         verify(self.filename, self, scenario=matching_pattern)
         assert ["first", "fourth"] == self.executed
 
+    def test_should_only_run_scenarios_at_given_lines(self):
+        verify("{}:7:16".format(self.filename), self)
+        assert ["first", "fourth"] == self.executed
+
     def test_fail_informatively_on_bad_scenario_regex_deprecated(self):
         with self.assertRaises(InvalidScenarioMatchingPattern):
             run(self.filename, self, scenario="\\")
@@ -0,0 +1,112 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from morelia import verify
+from morelia.config import TOMLConfig
+from morelia.decorators import tags
+from morelia.parser import Parser
+from morelia.sharding import Sharding, get_instance_id
+
+SOURCE = """
+Feature: sharded
+    Scenario: outline
+        Given value <value>
+
+        | value |
+        | 1     |
+        | 2     |
+        | 3     |
+        | 4     |
+        | 5     |
+        | 6     |
+
+    Scenario: single
+        Given value 7
+"""
+
+IDS = ["<stdin>::outline[{}]".format(idx) for idx in range(6)] + ["<stdin>::single"]
+
+
+def get_ids(feature, sharding):
+    feature.sharding = sharding
+    ids = []
+    for scenario in feature.steps:
+        scenario.prepare()
+        ids.extend(
+            get_instance_id(scenario, row_indices)
+            for row_indices in scenario.permute_schedule()
+        )
+    return ids
+
+
+@tags(["unit"])
+class ShardingTest(unittest.TestCase):
+    def setUp(self):
+        self.feature = Parser().parse_features(SOURCE)
+
+    def test_partitions_instances_between_shards(self):
+        shards = [get_ids(self.feature, Sharding(index, 3)) for index in range(3)]
+        assert sorted(IDS) == sorted(sum(shards, []))
+        assert shards == [get_ids(self.feature, Sharding(idx, 3)) for idx in range(3)]
+
+    def test_balances_shards_by_durations(self):
+        timings = dict.fromkeys(IDS, 1.0)
+        timings["<stdin>::single"] = 6.0
+        shards = [
+            get_ids(self.feature, Sharding(index, 2, timings)) for index in range(2)
+        ]
+        assert [["<stdin>::single"], IDS[:6]] == sorted(shards, key=len)
+
+    def test_can_be_pickled_after_use(self):
+        sharding = Sharding(0, 3, {})
+        ids = get_ids(self.feature, sharding)
+        assert ids == get_ids(self.feature, pickle.loads(pickle.dumps(sharding)))
+
+    def test_rejects_index_out_of_range(self):
+        with self.assertRaises(ValueError):
+            Sharding(3, 3)
+
+    def test_ignores_missing_timing_file(self):
+        assert Sharding.load_timings("not_existing.json") is None
+
+
+@tags(["acceptance"])
+class ShardedVerifyTest(unittest.TestCase):
+    def setUp(self):
+        self.values = []
+
+    def step_value(self, value):
+        r"value (\d+)"
+        self.values.append(value)
+
+    def test_runs_every_instance_on_one_shard(self):
+        values = []
+        for index in range(3):
+            environ = {"MORELIA_SHARD_INDEX": str(index), "MORELIA_SHARD_COUNT": "3"}
+            with patch.dict(os.environ, environ):
+                verify(SOURCE, self)
+            values.append(self.values)
+            self.values = []
+        assert [str(value) for value in range(1, 8)] == sorted(sum(values, []))
+
+    def test_reads_sharding_from_config(self):
+        with tempfile.TemporaryDirectory() as directory:
+            timings = Path(directory) / "timings.json"
+            timings.write_text(json.dumps({"<stdin>::single": 2.0}))
+            config = Path(directory) / "config.toml"
+            config.write_text(
+                "[tool.morelia.default]\n"
+                "shard_index=1\nshard_count=2\n"
+                'shard_timings="{}"\n'.format(timings.as_posix())
+            )
+            sharding = TOMLConfig(filename=str(config)).get_sharding()
+        assert (1, 2, {"<stdin>::single": 2.0}) == (
+            sharding.index,
+            sharding.count,
+            sharding.timings,
+        )
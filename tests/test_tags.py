@@ -0,0 +1,86 @@
+import unittest
+
+from morelia import verify
+from morelia.decorators import tags
+from morelia.exceptions import InvalidTagExpression
+from morelia.tags import compile_tag_expression
+
+SOURCE = """
+@web
+Feature: tagged scenarios
+    @smoke
+    Scenario: fast check
+        Given scenario "fast check" is run
+
+    @smoke @slow
+    Scenario: slow check
+        Given scenario "slow check" is run
+
+    Scenario: untagged check
+        Given scenario "untagged check" is run
+"""
+
+
+@tags(["unit"])
+class TagExpressionTest(unittest.TestCase):
+    def test_evaluates_boolean_operators(self):
+        labels = ["smoke", "web"]
+        test_data = [
+            ("", True),
+            ("@smoke", True),
+            ("smoke and web", True),
+            ("@smoke and @slow", False),
+            ("@slow or @web", True),
+            ("not @slow", True),
+            ("not (@smoke or @slow)", False),
+            ("@slow or @smoke and not @wip", True),
+            ("(@slow or @smoke) and not @web", False),
+            ("smoke,-web", False),
+            ("smoke -slow", True),
+        ]
+        for expression, expected in test_data:
+            with self.subTest(expression=expression):
+                assert expected == compile_tag_expression(expression)(labels)
+
+    def test_reads_hyphen_inside_label_as_part_of_its_name(self):
+        assert compile_tag_expression("my-tag")(["my-tag"])
+        assert not compile_tag_expression("-my-tag")(["my-tag"])
+        assert compile_tag_expression("@my-tag and -slow")(["my-tag"])
+
+    def test_compiles_expression_once(self):
+        expression = compile_tag_expression("@smoke and not @slow")
+        assert expression is compile_tag_expression("@smoke and not @slow")
+
+    def test_rejects_invalid_expressions(self):
+        for expression in ["(@smoke", "@smoke or", "and @smoke", "@smoke )", "$"]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(InvalidTagExpression):
+                    compile_tag_expression(expression)
+
+
+@tags(["acceptance"])
+class TaggedScenariosTest(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+
+    def setUpFeature(self):
+        self.events.append("setUpFeature")
+
+    def setUpScenario(self):
+        self.events.append("setUpScenario")
+
+    def step_scenario_is_run(self, name):
+        r'scenario "([^"]+)" is run'
+        self.events.append(name)
+
+    def test_runs_only_scenarios_matching_expression(self):
+        verify(SOURCE, self, tags="@smoke and not @slow")
+        assert ["setUpFeature", "setUpScenario", "fast check"] == self.events
+
+    def test_matches_labels_inherited_from_feature(self):
+        verify(SOURCE, self, tags="@web and not @smoke")
+        assert "untagged check" == self.events[-1]
+
+    def test_does_not_run_hooks_when_no_scenario_matches(self):
+        verify(SOURCE, self, tags="@wip")
+        assert [] == self.events
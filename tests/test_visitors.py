@@ -4,7 +4,8 @@ from unittest.mock import Mock, sentinel
 
 from morelia.decorators import tags
 from morelia.grammar import Step
-from morelia.visitors import TestVisitor
+from morelia.parser import Parser
+from morelia.visitors import ExecutionPlan, TestVisitor
 
 
 @tags(["unit"])
@@ -18,3 +19,75 @@ class TestVisitorVisitTestCase(unittest.TestCase):
         node.find_method.side_effect = [SystemExit]
         with self.assertRaises(SystemExit):
             visitor.visit_step(node)
+
+
+@tags(["unit"])
+class ExecutionPlanTestCase(unittest.TestCase):
+    """ Test :py:class:`ExecutionPlan`. """
+
+    def setUp(self):
+        self.feature = Parser().parse_features(
+            """
+            Feature: plan
+                Background:
+                    Given background step
+                Scenario: outline
+                    When I add <a>
+                        | a |
+                        | 1 |
+                        | 2 |
+                    And I multiply by <b>
+                        | b |
+                        | 3 |
+                        | 4 |
+                        | 5 |
+                    Then missing step
+                Scenario: skipped
+                    Then other step
+            """
+        )
+        self.matcher = Mock()
+        self.matcher.find.side_effect = self.find
+        self.matcher.suggest.side_effect = lambda predicate, prefix: (
+            predicate,
+            predicate,
+            "",
+        )
+
+    def find(self, predicate, augmented_predicate):
+        if predicate == "missing step":
+            return None, (), {}
+        return sentinel.method, (augmented_predicate,), {}
+
+    def test_should_resolve_every_distinct_predicate_once(self):
+        """ Scenario: unique predicates """
+        # Arrange
+        obj = ExecutionPlan(self.matcher)
+        # Act
+        obj.compile(self.feature, re.compile("outline"))
+        # Assert
+        resolved = [call[0][1] for call in self.matcher.find.call_args_list]
+        assert resolved == [
+            "background step",
+            "I add 1",
+            "I add 2",
+            "I multiply by 3",
+            "I multiply by 4",
+            "I multiply by 5",
+            "missing step",
+        ]
+        assert list(obj.get_not_matched_steps()) == ["missing step"]
+
+    def test_should_return_resolved_method_for_current_row(self):
+        """ Scenario: find method """
+        # Arrange
+        obj = ExecutionPlan(self.matcher)
+        obj.compile(self.feature, re.compile("outline"))
+        scenario = self.feature.steps[1]
+        scenario.row_indices = [0, 1, 2, 0]
+        self.matcher.find.reset_mock()
+        # Act
+        result = obj.find_method(scenario.steps[2])
+        # Assert
+        assert result == (sentinel.method, ("I multiply by 5",), {})
+        self.matcher.find.assert_not_called()